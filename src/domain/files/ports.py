@@ -1,7 +1,5 @@
 from abc import ABC, abstractmethod
 
-from domain.users.models import User
-
 from .models import SavedFile, UploadingFile
 
 
@@ -14,4 +12,4 @@ class FilesPort(ABC):
     def validate_uploading(self, file: UploadingFile) -> None: ...
 
     @abstractmethod
-    def get_default(self, user: User) -> SavedFile: ...
+    def get_default(self, username: str) -> SavedFile: ...
@@ -1,4 +1,7 @@
+import re
+
 from domain.users.exceptions import UserNotFound
+from domain.users.models import PHONE_PATTERN
 from domain.users.ports import UsersPort
 
 from .ports import CodesStoragePort, NotificationSenderPort
@@ -6,19 +9,33 @@ from .ports import CodesStoragePort, NotificationSenderPort
 
 class SendVerificationCodeHandler:
 
-    def __init__(self, sender: NotificationSenderPort, users_port: UsersPort, codes_storage_port: CodesStoragePort):
-        self._sender = sender
+    def __init__(
+        self,
+        email_sender: NotificationSenderPort,
+        sms_sender: NotificationSenderPort,
+        users_port: UsersPort,
+        codes_storage_port: CodesStoragePort,
+    ):
+        self._email_sender = email_sender
+        self._sms_sender = sms_sender
         self._users_port = users_port
         self._codes_storage_port = codes_storage_port
 
-    async def execute(self, email_or_phone: str, check_user_existing: bool = False) -> None:
+    async def execute(
+        self, email_or_phone: str, check_user_existing: bool = False, client_ip: str | None = None
+    ) -> None:
         if check_user_existing:
             user = await self._users_port.get_by_email_or_phone(email_or_phone)
             if not user:
                 raise UserNotFound("user not found")
 
-        code = await self._codes_storage_port.generate_verification_code(email_or_phone)
-        await self._sender.send_code(email_or_phone, code)
+        code = await self._codes_storage_port.generate_verification_code(email_or_phone, client_ip)
+        sender = self._sms_sender if re.match(PHONE_PATTERN, email_or_phone) else self._email_sender
+        try:
+            await sender.send_code(email_or_phone, code)
+        except Exception:
+            await self._codes_storage_port.release_verification_code(email_or_phone, code)
+            raise
 
 
 class VerifyCodeHandler:
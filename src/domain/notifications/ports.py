@@ -4,11 +4,14 @@ from abc import ABC, abstractmethod
 class CodesStoragePort(ABC):
 
     @abstractmethod
-    async def generate_verification_code(self, email_or_phone: str) -> str: ...
+    async def generate_verification_code(self, email_or_phone: str, client_ip: str | None = None) -> str: ...
 
     @abstractmethod
     async def validate_verification_code(self, email_or_phone: str, code: str) -> None: ...
 
+    @abstractmethod
+    async def release_verification_code(self, email_or_phone: str, code: str) -> None: ...
+
 
 class NotificationSenderPort(ABC):
 
@@ -20,3 +20,12 @@ class IncorrectPasswordException(BaseUserException): ...
 
 
 class UserAlreadyExists(BaseUserException): ...
+
+
+class UserChangesHistoryExpired(BaseUserException): ...
+
+
+class UserChangesSubscriberLagged(BaseUserException): ...
+
+
+class IncorrectUserChangeId(BaseUserException): ...
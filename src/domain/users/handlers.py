@@ -1,8 +1,9 @@
-from typing import Literal
+from contextlib import aclosing
+from typing import AsyncGenerator, Literal
 
 from domain.files.models import SavedFile, UploadingFile
 from domain.files.ports import FilesPort
-from domain.general.models import PaginatedResponse
+from domain.permissions.models import Permission
 from domain.sessions.exceptions import IncorrectTokenException
 from domain.sessions.models import AuthSessionOperations, Session, TokenPairData
 from domain.sessions.ports import SessionsStoragePort, TokensPort
@@ -12,8 +13,8 @@ from .exceptions import (
     SearchUserIncorrectParameters,
     UserNotFound,
 )
-from .models import UpdateData, User
-from .ports import UserEventsPort, UsersPort
+from .models import UpdateData, User, UserChange, UserProjection, UserVersion
+from .ports import UserChangesPort, UserEventsPort, UsersPort
 
 
 class GetUserHandler:
@@ -43,7 +44,7 @@ class GetUserHandler:
             raise UserNotFound
 
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return user
 
@@ -65,7 +66,7 @@ class GetUserByTokenHandler:
             raise IncorrectTokenException("incorrect token")
 
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return user
 
@@ -98,7 +99,7 @@ class GetUserByRefreshTokenHandler:
             raise IncorrectTokenException("Incorrect token")
 
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return user
 
@@ -113,11 +114,115 @@ class GetUsersByIdsHandler:
         users = await self._users_port.get_by_ids(ids)
         for user in users:
             if not user.get_avatar():
-                user.set_avatar(self._files_port.get_default(user))
+                user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return users
 
 
+class GetUsersProjectionsByIdsHandler:
+
+    def __init__(self, users_port: UsersPort, files_port: FilesPort) -> None:
+        self._users_port = users_port
+        self._files_port = files_port
+
+    async def execute(self, ids: list[int], fields: list[str]) -> list[UserProjection]:
+        users = await self._users_port.get_projections_by_ids(ids, fields)
+        if "avatar" in fields:
+            for user in users:
+                if not user.get_avatar():
+                    user.set_avatar(self._files_port.get_default(user.get_username()))
+
+        return users
+
+
+class GetUserVersionHandler:
+
+    def __init__(self, users_port: UsersPort) -> None:
+        self._users_port = users_port
+
+    async def execute(
+        self, id_: int | None = None, username: str | None = None, email: str | None = None
+    ) -> UserVersion:
+        if id_:
+            versions = await self._users_port.get_versions_by_ids([id_])
+            version = versions[0] if versions else None
+        elif username:
+            version = await self._users_port.get_version_by_username(username)
+        elif email:
+            version = await self._users_port.get_version_by_email(email)
+        else:
+            raise SearchUserIncorrectParameters("incorrect parameters: you need to specify id|username|email")
+
+        if not version:
+            raise UserNotFound
+
+        return version
+
+
+class GetUsersVersionsHandler:
+
+    def __init__(self, users_port: UsersPort) -> None:
+        self._users_port = users_port
+
+    async def execute(self, ids: list[int]) -> list[UserVersion]:
+        return await self._users_port.get_versions_by_ids(ids)
+
+
+class StreamUsersByIdsHandler:
+
+    def __init__(self, users_port: UsersPort, files_port: FilesPort) -> None:
+        self._users_port = users_port
+        self._files_port = files_port
+
+    async def execute(self, ids: list[int]) -> AsyncGenerator[User, None]:
+        async with aclosing(self._users_port.stream_by_ids(ids)) as users:
+            async for user in users:
+                if not user.get_avatar():
+                    user.set_avatar(self._files_port.get_default(user.get_username()))
+
+                yield user
+
+
+class StreamUsersProjectionsByIdsHandler:
+
+    def __init__(self, users_port: UsersPort, files_port: FilesPort) -> None:
+        self._users_port = users_port
+        self._files_port = files_port
+
+    async def execute(self, ids: list[int], fields: list[str]) -> AsyncGenerator[UserProjection, None]:
+        async with aclosing(self._users_port.stream_projections_by_ids(ids, fields)) as users:
+            async for user in users:
+                if "avatar" in fields and not user.get_avatar():
+                    user.set_avatar(self._files_port.get_default(user.get_username()))
+
+                yield user
+
+
+class GetUsersPermissionsHandler:
+
+    def __init__(self, users_port: UsersPort) -> None:
+        self._users_port = users_port
+
+    async def execute(self, ids: list[int]) -> dict[int, list[Permission]]:
+        return await self._users_port.get_permissions_by_ids(ids)
+
+
+class SubscribeUsersChangesHandler:
+
+    def __init__(self, user_changes_port: UserChangesPort, files_port: FilesPort) -> None:
+        self._user_changes_port = user_changes_port
+        self._files_port = files_port
+
+    async def execute(self, ids: list[int], after: str | None = None) -> AsyncGenerator[UserChange, None]:
+        async with aclosing(self._user_changes_port.subscribe(ids, after)) as changes:
+            async for change in changes:
+                user = change.get_user()
+                if not user.get_avatar():
+                    user.set_avatar(self._files_port.get_default(user.get_username()))
+
+                yield change
+
+
 class ConfirmFieldHandler:
 
     def __init__(self, users_port: UsersPort, files_port: FilesPort) -> None:
@@ -136,7 +241,7 @@ class ConfirmFieldHandler:
 
         saved_user = await self._users_port.save(user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return saved_user
 
@@ -172,7 +277,7 @@ class UpdateUserHandler:
         saved_user = await self._users_port.save(user)
         await self._user_events_port.send_user_changed(saved_user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return saved_user
 
@@ -197,7 +302,7 @@ class UpdateAvatarHandler:
             raise IncorrectTokenException("incorrect token")
 
         if not new_avatar:
-            default_avatar = self._files_port.get_default(user)
+            default_avatar = self._files_port.get_default(user.get_username())
             user.set_avatar(default_avatar)
         else:
             self._files_port.validate_uploading(new_avatar)
@@ -218,7 +323,7 @@ class UpdateAvatarHandler:
 
         saved_user = await self._users_port.save(user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         await self._user_events_port.send_user_changed(saved_user)
         return saved_user
@@ -246,7 +351,7 @@ class UpdatePasswordHandler:
         user.set_password(new_password)
         saved_user = await self._users_port.save(user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         return saved_user
 
@@ -282,7 +387,7 @@ class UpdateEmailHandler:
         user.set_email(new_email)
         saved_user = await self._users_port.save(user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         await self._user_events_port.send_user_changed(saved_user)
         return saved_user
@@ -319,7 +424,7 @@ class UpdatePhoneHandler:
         user.set_phone(new_phone)
         saved_user = await self._users_port.save(user)
         if not user.get_avatar():
-            user.set_avatar(self._files_port.get_default(user))
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
         await self._user_events_port.send_user_changed(saved_user)
         return saved_user
@@ -360,10 +465,12 @@ class SearchUsersHandler:
         self._tokens_port = tokens_port
         self._files_port = files_port
 
-    async def execute(self, query: str, page: int, per_page: int, token: str) -> PaginatedResponse[User]:
+    async def execute(self, query: str, page: int, per_page: int, token: str) -> AsyncGenerator[User, None]:
         await self._validate_token(token)
-        users = await self._search_users(query, page, per_page)
-        return users
+        async with aclosing(self._users_port.stream_search_users(query, page, per_page)) as users:
+            async for user in users:
+                self._setup_user_avatar(user)
+                yield user
 
     async def _validate_token(self, token: str) -> None:
         user_id = await self._get_user_id_from_token(token)
@@ -381,16 +488,15 @@ class SearchUsersHandler:
         if not user:
             raise IncorrectTokenException("incorrect token")
 
-    async def _search_users(self, query: str, page: int, per_page: int) -> PaginatedResponse[User]:
-        users = await self._search_raw_users_data(query, page, per_page)
-        await self._setup_users_avatars(users.get_data())
-        return users
+    def _setup_user_avatar(self, user: User) -> None:
+        if not user.get_avatar():
+            user.set_avatar(self._files_port.get_default(user.get_username()))
 
-    async def _search_raw_users_data(self, query: str, page: int, per_page: int) -> PaginatedResponse[User]:
-        users = await self._users_port.search_users(query, page, per_page)
-        return users
 
-    async def _setup_users_avatars(self, users: list[User]) -> None:
-        for user in users:
-            if not user.get_avatar():
-                user.set_avatar(self._files_port.get_default(user))
+class CountSearchUsersHandler:
+
+    def __init__(self, users_port: UsersPort):
+        self._users_port = users_port
+
+    async def execute(self, query: str) -> int:
+        return await self._users_port.count_search_users(query)
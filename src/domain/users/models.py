@@ -1,5 +1,6 @@
 import re
 from datetime import datetime
+from typing import Any
 
 from email_validator import EmailNotValidError, validate_email
 from passlib.context import CryptContext
@@ -28,7 +29,9 @@ class User:
     _phone: str | None
     _email: str | None
     _status: str | None
-    _permissions: list[Permission]
+    _permissions: list[Permission] | None
+    _version: int
+    _changed_fields: set[str]
 
     def __init__(
         self,
@@ -46,6 +49,7 @@ class User:
         email: str | None = None,
         status: str | None = None,
         permissions: list[Permission] | None = None,
+        version: int = 1,
     ) -> None:
         self._id = id_
         self._username = username
@@ -60,7 +64,9 @@ class User:
         self._phone = phone
         self._email = email
         self._status = status
-        self._permissions = permissions if permissions else []
+        self._permissions = permissions
+        self._version = version
+        self._changed_fields = set()
 
     def get_id(self) -> int:
         return self._id
@@ -76,6 +82,7 @@ class User:
             self._password = password
 
         self._password = password_context.hash(password)
+        self._changed_fields.add("password")
 
     def validate_password(self, password: str) -> bool:
         return password_context.verify(password, self._password)
@@ -85,21 +92,25 @@ class User:
 
     def set_first_name(self, first_name: str) -> None:
         self._first_name = first_name
+        self._changed_fields.add("first_name")
 
     def get_last_name(self) -> str:
         return self._last_name
 
     def set_last_name(self, last_name: str) -> None:
         self._last_name = last_name
+        self._changed_fields.add("last_name")
 
     def get_email_confirmed(self) -> bool:
         return self._email_confirmed
 
     def confirm_email(self) -> None:
         self._email_confirmed = True
+        self._changed_fields.add("email_confirmed")
 
     def confirm_phone(self) -> None:
         self._phone_confirmed = True
+        self._changed_fields.add("phone_confirmed")
 
     def get_phone_confirmed(self) -> bool:
         return self._phone_confirmed
@@ -107,11 +118,15 @@ class User:
     def get_last_seen(self) -> datetime:
         return self._last_seen
 
+    def get_version(self) -> int:
+        return self._version
+
     def get_middle_name(self) -> str | None:
         return self._middle_name
 
     def set_middle_name(self, middle_name: str) -> None:
         self._middle_name = middle_name
+        self._changed_fields.add("middle_name")
 
     def get_full_name(self) -> str:
         if self._middle_name:
@@ -124,6 +139,7 @@ class User:
 
     def set_avatar(self, file: SavedFile) -> None:
         self._avatar = file
+        self._changed_fields.add("avatar")
 
     def get_phone(self) -> str | None:
         return self._phone
@@ -133,6 +149,7 @@ class User:
             raise IncorrectPhoneNumber("incorrect phone number")
 
         self._phone = phone
+        self._changed_fields.add("phone")
 
     def get_email(self) -> str | None:
         return self._email
@@ -144,33 +161,49 @@ class User:
             raise IncorrectEmail("incorrect email")
 
         self._email = email
+        self._changed_fields.add("email")
 
     def get_status(self) -> str | None:
         return self._status
 
     def set_status(self, status: str) -> None:
         self._status = status
+        self._changed_fields.add("status")
 
     def get_permissions(self) -> list[Permission]:
-        return self._permissions
+        return self._permissions if self._permissions is not None else []
+
+    def permissions_loaded(self) -> bool:
+        return self._permissions is not None
 
     def add_permission(self, permission: Permission) -> None:
-        if permission in self._permissions:
+        permissions = self.get_permissions()
+        if permission in permissions:
             return
 
-        self._permissions.append(permission)
+        self._permissions = [*permissions, permission]
+        self._changed_fields.add("permissions")
 
     def set_permissions(self, permissions: list[Permission]) -> None:
         self._permissions = permissions
+        self._changed_fields.add("permissions")
 
     def remove_permission(self, permission: Permission) -> None:
-        if permission not in self._permissions:
+        permissions = self.get_permissions()
+        if permission not in permissions:
             return
 
-        self._permissions.remove(permission)
+        self._permissions = [p for p in permissions if p != permission]
+        self._changed_fields.add("permissions")
+
+    def get_changed_fields(self) -> set[str]:
+        return set(self._changed_fields)
+
+    def set_changed_fields(self, fields: set[str]) -> None:
+        self._changed_fields = set(fields)
 
     def has_permission(self, permission: Permission) -> bool:
-        return permission in self._permissions
+        return permission in self.get_permissions()
 
     def __repr__(self) -> str:
         data = {
@@ -187,6 +220,59 @@ class User:
             "email": self._email,
             "status": self._status,
             "permissions": self._permissions,
+            "version": self._version,
+        }
+        return f"{self.__class__.__name__}{data}"
+
+
+class UserProjection:
+    # a user read through a field mask: only the requested fields are present in values
+    _id: int
+    _username: str
+    _values: dict[str, Any]
+
+    def __init__(self, id_: int, username: str, values: dict[str, Any]):
+        self._id = id_
+        self._username = username
+        self._values = values
+
+    def get_id(self) -> int:
+        return self._id
+
+    def get_username(self) -> str:
+        return self._username
+
+    def get_values(self) -> dict[str, Any]:
+        return self._values
+
+    def get_avatar(self) -> SavedFile | None:
+        return self._values.get("avatar")
+
+    def set_avatar(self, avatar: SavedFile) -> None:
+        self._values["avatar"] = avatar
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}{{'id': {self._id}, 'fields': {sorted(self._values)}}}"
+
+
+class UserVersion:
+    _user_id: int
+    _version: int
+
+    def __init__(self, user_id: int, version: int):
+        self._user_id = user_id
+        self._version = version
+
+    def get_user_id(self) -> int:
+        return self._user_id
+
+    def get_version(self) -> int:
+        return self._version
+
+    def __repr__(self) -> str:
+        data = {
+            "user_id": self._user_id,
+            "version": self._version,
         }
         return f"{self.__class__.__name__}{data}"
 
@@ -229,3 +315,25 @@ class UpdateData:
             "status": self._status,
         }
         return f"{self.__class__.__name__}{data}"
+
+
+class UserChange:
+    _event_id: str
+    _user: User
+
+    def __init__(self, event_id: str, user: User):
+        self._event_id = event_id
+        self._user = user
+
+    def get_event_id(self) -> str:
+        return self._event_id
+
+    def get_user(self) -> User:
+        return self._user
+
+    def __repr__(self) -> str:
+        data = {
+            "event_id": self._event_id,
+            "user": self._user,
+        }
+        return f"{self.__class__.__name__}{data}"
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import AsyncGenerator
 
-from domain.general.models import PaginatedResponse
+from domain.permissions.models import Permission
 
-from .models import User
+from .models import User, UserChange, UserProjection, UserVersion
 
 
 class UsersPort(ABC):
@@ -25,11 +26,38 @@ class UsersPort(ABC):
     @abstractmethod
     async def get_by_ids(self, ids: list[int]) -> list[User]: ...
 
+    @abstractmethod
+    async def get_projections_by_ids(self, ids: list[int], fields: list[str]) -> list[UserProjection]: ...
+
+    @abstractmethod
+    def stream_by_ids(self, ids: list[int]) -> AsyncGenerator[User, None]: ...
+
+    @abstractmethod
+    def stream_projections_by_ids(self, ids: list[int], fields: list[str]) -> AsyncGenerator[UserProjection, None]: ...
+
     @abstractmethod
     async def get_by_phone(self, phone: str) -> User | None: ...
 
     @abstractmethod
-    async def search_users(self, query: str, page: int = 1, per_page: int = 100) -> PaginatedResponse[User]: ...
+    async def get_versions_by_ids(self, ids: list[int]) -> list[UserVersion]: ...
+
+    @abstractmethod
+    async def get_version_by_username(self, username: str) -> UserVersion | None: ...
+
+    @abstractmethod
+    async def get_version_by_email(self, email: str) -> UserVersion | None: ...
+
+    @abstractmethod
+    def stream_search_users(self, query: str, page: int = 1, per_page: int = 100) -> AsyncGenerator[User, None]: ...
+
+    @abstractmethod
+    def stream_all(self, after_id: int = 0, chunk_size: int = 1000) -> AsyncGenerator[User, None]: ...
+
+    @abstractmethod
+    async def count_search_users(self, query: str) -> int: ...
+
+    @abstractmethod
+    async def get_permissions_by_ids(self, ids: list[int]) -> dict[int, list[Permission]]: ...
 
     @abstractmethod
     async def save(self, user: User) -> User: ...
@@ -42,3 +70,9 @@ class UserEventsPort:
 
     @abstractmethod
     async def send_user_changed(self, user: User) -> None: ...
+
+
+class UserChangesPort(ABC):
+
+    @abstractmethod
+    def subscribe(self, ids: list[int], after: str | None = None) -> AsyncGenerator[UserChange, None]: ...
@@ -1,6 +1,5 @@
 import datetime
 import json
-from logging import getLogger
 from typing import Literal
 
 from jose import JWTError, jwt
@@ -15,36 +14,6 @@ REFRESH_TOKEN_EXP_DELTA = datetime.timedelta(days=30)
 
 ALGORITHM = "HS256"
 
-logger = getLogger("uvicorn.error")
-
-
-class TokensLoggingAdapter(TokensPort):
-
-    def __init__(self, adapter: TokensPort):
-        self._adapter = adapter
-
-    def create_token(self, user: User, type: Literal["access", "refresh"]) -> str:
-        logger.info(f"creating token: {user=} {type=}")
-        try:
-            token = self._adapter.create_token(user, type)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.info(f"created token: {token=}")
-        return token
-
-    async def decode_token(self, token: str) -> int:
-        logger.info(f"decoding token: {token=}")
-        try:
-            user_id = await self._adapter.decode_token(token)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.info(f"decoded token user id: {user_id=}")
-        return user_id
-
 
 class TokensAdapter(TokensPort):
 
@@ -0,0 +1,127 @@
+import hashlib
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from graphql import FieldNode, GraphQLError, OperationDefinitionNode, OperationType, parse
+from redis.asyncio.client import Redis
+
+from infrastructure.memory_storage.versions import UsersVersionsStorage
+
+CACHEABLE_FIELDS = frozenset({"user", "usersByIds", "searchUsers"})
+
+
+class CacheDependencies:
+
+    def __init__(self) -> None:
+        self._user_ids: set[int] = set()
+        self._all_users = False
+        self._resolved_fields = 0
+
+    def add_users(self, ids: list[int]) -> None:
+        self._user_ids.update(ids)
+        self._resolved_fields += 1
+
+    def add_all_users(self) -> None:
+        self._all_users = True
+        self._resolved_fields += 1
+
+    def get_user_ids(self) -> list[int]:
+        return sorted(self._user_ids)
+
+    def get_all_users(self) -> bool:
+        return self._all_users
+
+    def get_resolved_fields(self) -> int:
+        return self._resolved_fields
+
+
+@lru_cache(maxsize=512)
+def count_cacheable_fields(query: str, operation_name: str | None = None) -> int:
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return 0
+
+    operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+    if operation_name:
+        operations = [o for o in operations if o.name and o.name.value == operation_name]
+
+    if len(operations) != 1 or operations[0].operation != OperationType.QUERY:
+        return 0
+
+    fields_count = 0
+    for selection in operations[0].selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return 0
+
+        if selection.name.value == "__typename":
+            continue
+
+        if selection.name.value not in CACHEABLE_FIELDS:
+            return 0
+
+        fields_count += 1
+
+    return fields_count
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+
+    etag_value = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag_value for tag in if_none_match.split(","))
+
+
+class HttpCache:
+
+    def __init__(self, db: Redis, versions_storage: UsersVersionsStorage, ttl_seconds: int):
+        self._db = db
+        self._versions_storage = versions_storage
+        self._ttl_seconds = ttl_seconds
+
+    def get_cache_key(
+        self, query: str, operation_name: str | None, variables: dict[str, Any] | None, principal: int
+    ) -> str:
+        payload = orjson.dumps([query, operation_name, variables, principal], option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def _get_entry_key(self, cache_key: str) -> str:
+        return f"http_cache:{cache_key}"
+
+    def _generate_etag(
+        self, cache_key: str, user_ids: list[int], versions: list[int], all_users: bool, global_version: int
+    ) -> str:
+        parts = [cache_key, *(f"{user_id}:{version}" for user_id, version in zip(user_ids, versions))]
+        if all_users:
+            parts.append(f"*:{global_version}")
+
+        digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+        return f'W/"{digest}"'
+
+    async def get_etag(self, cache_key: str) -> str | None:
+        entry = await self._db.get(self._get_entry_key(cache_key))
+        if not entry:
+            return None
+
+        dependencies = orjson.loads(entry)
+        versions, global_version = await self._versions_storage.get_versions_and_global(dependencies["users"])
+        return self._generate_etag(
+            cache_key, dependencies["users"], versions, dependencies["all_users"], global_version
+        )
+
+    async def get_snapshot(self) -> int:
+        return await self._versions_storage.get_global_version()
+
+    async def save(self, cache_key: str, dependencies: CacheDependencies, snapshot: int) -> str | None:
+        user_ids = dependencies.get_user_ids()
+        versions, global_version = await self._versions_storage.get_versions_and_global(user_ids)
+        # every user write bumps the global version, so if it moved since the snapshot taken before the
+        # query ran, the response may contain data older than these versions and must not be tagged
+        if global_version != snapshot:
+            return None
+
+        entry = orjson.dumps({"users": user_ids, "all_users": dependencies.get_all_users()})
+        await self._db.setex(self._get_entry_key(cache_key), self._ttl_seconds, entry)
+        return self._generate_etag(cache_key, user_ids, versions, dependencies.get_all_users(), global_version)
@@ -1,10 +1,12 @@
 from typing import Annotated
 
-from fastapi import Depends, Security
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import Depends
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.requests import HTTPConnection
 from strawberry.fastapi import BaseContext
 
-oauth2_scheme = HTTPBearer(auto_error=False)
+from .cache import CacheDependencies
+from .loaders import use_permissions_loader, use_search_users_count_loader
 
 
 class CustomContext(BaseContext):
@@ -12,14 +14,26 @@ class CustomContext(BaseContext):
     def __init__(
         self,
         token: str | None,
+        client_ip: str | None = None,
     ):
         self.token = token
+        self.client_ip = client_ip
+        self.cache_dependencies = CacheDependencies()
+        self.permissions_loader = use_permissions_loader()
+        self.search_users_count_loader = use_search_users_count_loader()
 
+    def clear_loaders(self) -> None:
+        self.permissions_loader.clear_all()
+        self.search_users_count_loader.clear_all()
 
-def use_custom_context(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(oauth2_scheme)],
-) -> CustomContext:
-    return CustomContext(credentials.credentials if credentials else None)
+
+def use_custom_context(connection: HTTPConnection) -> CustomContext:
+    client_ip = connection.client.host if connection.client else None
+    scheme, credentials = get_authorization_scheme_param(connection.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not credentials:
+        return CustomContext(None, client_ip)
+
+    return CustomContext(credentials, client_ip)
 
 
 async def get_context(context: Annotated[CustomContext, Depends(use_custom_context)]) -> CustomContext:
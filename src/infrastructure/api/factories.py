@@ -107,7 +107,6 @@ class UserApiFactory:
             phone_confirmed=user.get_phone_confirmed(),
             last_seen=user.get_last_seen(),
             avatar=avatar_response,
-            permissions=[PermissionApiFactory.response_from_domain(p) for p in user.get_permissions()],
         )
 
 
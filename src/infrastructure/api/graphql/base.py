@@ -1,5 +1,6 @@
 import logging
-from typing import TypeAlias
+from contextlib import aclosing
+from typing import AsyncGenerator, TypeAlias
 
 import strawberry
 from sqlalchemy import Boolean
@@ -14,6 +15,7 @@ from domain.sessions.models import AuthSessionOperations as DomainAuthSessionOpe
 from domain.users.exceptions import (
     IncorrectPasswordException,
     UserAlreadyExists,
+    UserChangesSubscriberLagged,
     UserNotFound,
 )
 from infrastructure.api.factories import (
@@ -30,6 +32,7 @@ from infrastructure.database.exceptions import IncorrectFileSignature
 from infrastructure.dependencies import (
     use_authenticate_handler,
     use_codes_storage_adapter,
+    use_email_sender,
     use_files_adapter,
     use_generate_auth_session_handler,
     use_get_user_by_token_handler,
@@ -43,12 +46,15 @@ from infrastructure.dependencies import (
     use_search_users_handler,
     use_send_verification_code_handler,
     use_sessions_storage_adapter,
+    use_sms_sender,
+    use_subscribe_users_changes_handler,
     use_tokens_adapter,
     use_update_avatar_handler,
     use_update_email_handler,
     use_update_me_handler,
     use_update_password_handler,
     use_update_phone_handler,
+    use_user_changes_adapter,
     use_user_events_adapter,
     use_users_adapter,
     use_validate_token_handler,
@@ -58,8 +64,10 @@ from infrastructure.memory_storage.exceptions import (
     IncorrectAuthenticationSession,
     IncorrectVerificationCode,
     VerificationAttemptsExpired,
+    VerificationCodeRecentlySent,
+    VerificationCodesLimitExceeded,
 )
-from infrastructure.senders.email import EmailSender, LoggingEmailSender
+from infrastructure.senders.exceptions import NotificationsQueueFull
 
 from ..dependencies import CustomContext
 from .graph_types import (
@@ -126,10 +134,12 @@ class Query:
                 get_user_handler = use_get_user_handler(use_users_adapter(s), use_files_adapter(s))
                 user = await get_user_handler.execute(id, username, email)
                 await s.commit()
+                info.context.cache_dependencies.add_users([user.get_id()])
                 return UserApiFactory.response_from_domain(user)
         except IncorrectTokenException:
             return ErrorResponse(message="Incorrect token")
         except UserNotFound:
+            info.context.cache_dependencies.add_all_users()
             return ErrorResponse(message="User not found")
         except Exception:
             return ErrorResponse(message="Internal server error")
@@ -148,6 +158,7 @@ class Query:
                 get_users_by_ids_handler = use_get_users_by_ids_handler(use_users_adapter(s), use_files_adapter(s))
                 users = await get_users_by_ids_handler.execute(ids)
                 await s.commit()
+                info.context.cache_dependencies.add_users(ids)
                 return UsersArrayResponse(users=[UserApiFactory.response_from_domain(user) for user in users])
         except IncorrectTokenException:
             return ErrorResponse(message="Incorrect token")
@@ -158,19 +169,32 @@ class Query:
     async def search_users(
         self, info: CustomInfo, query: str, page: int = 1, per_page: int = 100
     ) -> PaginatedUsersResponse | ErrorResponse:
+        """Return the whole page at once.
+
+        Rows are streamed from the database, but the page is collected into a list before responding.
+        Clients that want rows as they arrive use the `searchUsers` subscription.
+        """
         if not info.context.token:
             return ErrorResponse(message="Token required")
 
+        page = page or 1
+        per_page = per_page or 100
         try:
             async with db_session() as s:
                 handler = use_search_users_handler(use_users_adapter(s), use_tokens_adapter(), use_files_adapter(s))
-                paginated_users = await handler.execute(query, page, per_page, info.context.token)
-                return PaginatedUsersResponse(
-                    page=paginated_users.get_page(),
-                    num_pages=paginated_users.get_pages_count(),
-                    per_page=paginated_users.get_per_page(),
-                    data=[UserApiFactory.response_from_domain(u) for u in paginated_users.get_data()],
-                )
+                users = [
+                    UserApiFactory.response_from_domain(u)
+                    async for u in handler.execute(query, page, per_page, info.context.token)
+                ]
+                if not users and page > 1:
+                    page = 1
+                    users = [
+                        UserApiFactory.response_from_domain(u)
+                        async for u in handler.execute(query, page, per_page, info.context.token)
+                    ]
+
+                info.context.cache_dependencies.add_all_users()
+                return PaginatedUsersResponse(page=page, per_page=per_page, data=users, query=query)
         except IncorrectTokenException:
             return ErrorResponse(message="Incorrect token")
         except Exception:
@@ -200,6 +224,7 @@ class Mutation:
     @strawberry.mutation
     async def send_verification_code(
         self,
+        info: CustomInfo,
         phone: str | None = None,
         email: str | None = None,
         check_user_existing: bool = False,
@@ -209,18 +234,22 @@ class Mutation:
 
         try:
             async with db_session() as s:
-                sender = LoggingEmailSender(EmailSender())
                 send_verification_code_handler = use_send_verification_code_handler(
-                    sender, use_users_adapter(s), use_codes_storage_adapter()
+                    use_email_sender(), use_sms_sender(), use_users_adapter(s), use_codes_storage_adapter()
                 )
                 await send_verification_code_handler.execute(
                     email if email else phone,  # pyright: ignore[reportArgumentType]
                     check_user_existing,
+                    info.context.client_ip,
                 )
                 await s.commit()
                 return VerificationSended(sended=True)
         except UserNotFound:
             return ErrorResponse(message="User not found")
+        except (VerificationCodeRecentlySent, VerificationCodesLimitExceeded) as e:
+            return ErrorResponse(message=str(e).capitalize())
+        except NotificationsQueueFull:
+            return ErrorResponse(message="Too many verification codes are being sent, retry later")
         except Exception:
             return ErrorResponse(message="Internal server error")
 
@@ -254,7 +283,7 @@ class Mutation:
                     use_users_adapter(s),
                     use_tokens_adapter(),
                     use_files_adapter(s),
-                    use_user_events_adapter(),
+                    use_user_events_adapter(s),
                 )
                 auth_data_domain = AuthDataApiFactory.domain_from_request(auth_data)
                 tokens = await authenticate_handler.execute(session, verification_source.value, auth_data_domain)
@@ -282,7 +311,7 @@ class Mutation:
                 handler = use_update_me_handler(
                     use_users_adapter(s),
                     use_tokens_adapter(),
-                    use_user_events_adapter(),
+                    use_user_events_adapter(s),
                     use_files_adapter(s),
                 )
                 update_data_domain = UpdateDataApiFactory.domain_from_request(update_data)
@@ -306,7 +335,7 @@ class Mutation:
                 handler = use_update_avatar_handler(
                     use_users_adapter(s),
                     use_tokens_adapter(),
-                    use_user_events_adapter(),
+                    use_user_events_adapter(s),
                     use_files_adapter(s),
                 )
                 new_avatar_domain = UploadingFileApiFactory.domain_from_request(new_avatar) if new_avatar else None
@@ -381,7 +410,7 @@ class Mutation:
                     use_sessions_storage_adapter(),
                     use_users_adapter(s),
                     use_tokens_adapter(),
-                    use_user_events_adapter(),
+                    use_user_events_adapter(s),
                     use_files_adapter(s),
                 )
                 user = await handler.execute(
@@ -407,7 +436,7 @@ class Mutation:
                     use_sessions_storage_adapter(),
                     use_users_adapter(s),
                     use_tokens_adapter(),
-                    use_user_events_adapter(),
+                    use_user_events_adapter(s),
                     use_files_adapter(s),
                 )
                 user = await handler.execute(
@@ -487,3 +516,65 @@ class Mutation:
             return BooleanResponse(result=is_token_valid)
         except Exception:
             return ErrorResponse(message="Internal server error")
+
+
+@strawberry.type
+class Subscription:
+
+    @strawberry.subscription
+    async def user_changed(self, info: CustomInfo, ids: list[int]) -> AsyncGenerator[User | ErrorResponse, None]:
+        if not info.context.token:
+            yield ErrorResponse(message="Token required")
+            return
+
+        try:
+            async with db_session() as s:
+                handler = use_get_user_by_token_handler(
+                    use_users_adapter(s), use_tokens_adapter(), use_files_adapter(s)
+                )
+                await handler.execute(info.context.token)
+
+            # changes come from redis and the files adapter only builds default avatars,
+            # so this session never checks out a connection
+            subscribe_handler = use_subscribe_users_changes_handler(
+                use_user_changes_adapter(), use_files_adapter(db_session())
+            )
+            async with aclosing(subscribe_handler.execute(ids)) as changes:
+                async for change in changes:
+                    info.context.clear_loaders()
+                    yield UserApiFactory.response_from_domain(change.get_user())
+        except IncorrectTokenException:
+            yield ErrorResponse(message="Incorrect token")
+        except UserChangesSubscriberLagged:
+            yield ErrorResponse(message="Too many undelivered changes, resubscribe")
+        except Exception:
+            yield ErrorResponse(message="Internal server error")
+
+    @strawberry.subscription
+    async def search_users(
+        self, info: CustomInfo, query: str, page: int = 1, per_page: int = 100
+    ) -> AsyncGenerator[User | ErrorResponse, None]:
+        if not info.context.token:
+            yield ErrorResponse(message="Token required")
+            return
+
+        page = page or 1
+        per_page = per_page or 100
+        try:
+            async with db_session() as s:
+                handler = use_search_users_handler(use_users_adapter(s), use_tokens_adapter(), use_files_adapter(s))
+                # an empty page past the first one falls back to the first page, as searchUsers query does
+                for current_page in (page, 1) if page > 1 else (page,):
+                    found = False
+                    async with aclosing(handler.execute(query, current_page, per_page, info.context.token)) as users:
+                        async for user in users:
+                            found = True
+                            info.context.clear_loaders()
+                            yield UserApiFactory.response_from_domain(user)
+
+                    if found:
+                        break
+        except IncorrectTokenException:
+            yield ErrorResponse(message="Incorrect token")
+        except Exception:
+            yield ErrorResponse(message="Internal server error")
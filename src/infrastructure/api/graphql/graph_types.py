@@ -1,8 +1,10 @@
+import math
 from datetime import datetime
 from enum import Enum
 
 import email_validator
 import strawberry
+from strawberry.types import Info
 
 EmailStr = strawberry.scalar(
     str,
@@ -121,7 +123,10 @@ class User:
     phone_confirmed: bool
     last_seen: datetime
     avatar: UploadedFile | None = None
-    permissions: list[Permission] = strawberry.field(default_factory=list)
+
+    @strawberry.field
+    async def permissions(self, info: Info) -> list[Permission]:
+        return await info.context.permissions_loader.load(self.id)
 
 
 @strawberry.type
@@ -176,9 +181,14 @@ class Tokens:
 @strawberry.type
 class PaginatedUsersResponse:
     page: int
-    num_pages: int
     per_page: int
     data: list[User]
+    query: strawberry.Private[str]
+
+    @strawberry.field
+    async def num_pages(self, info: Info) -> int:
+        users_count = await info.context.search_users_count_loader.load(self.query)
+        return math.ceil(users_count / self.per_page)
 
 
 @strawberry.input
@@ -0,0 +1,33 @@
+from strawberry.dataloader import DataLoader
+
+from infrastructure.database.base import session as db_session
+from infrastructure.dependencies import (
+    use_count_search_users_handler,
+    use_get_users_permissions_handler,
+    use_users_adapter,
+)
+
+from .factories import PermissionApiFactory
+from .graphql.graph_types import Permission
+
+
+async def load_users_permissions(ids: list[int]) -> list[list[Permission]]:
+    async with db_session() as s:
+        handler = use_get_users_permissions_handler(use_users_adapter(s))
+        permissions = await handler.execute(ids)
+
+    return [[PermissionApiFactory.response_from_domain(p) for p in permissions.get(user_id, [])] for user_id in ids]
+
+
+def use_permissions_loader() -> DataLoader[int, list[Permission]]:
+    return DataLoader(load_fn=load_users_permissions)
+
+
+async def load_search_users_counts(queries: list[str]) -> list[int]:
+    async with db_session() as s:
+        handler = use_count_search_users_handler(use_users_adapter(s))
+        return [await handler.execute(query) for query in queries]
+
+
+def use_search_users_count_loader() -> DataLoader[str, int]:
+    return DataLoader(load_fn=load_search_users_counts)
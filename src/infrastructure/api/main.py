@@ -3,16 +3,25 @@ import logging
 
 import sentry_sdk
 import strawberry
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from infrastructure.dependencies import use_users_versions_storage
 from infrastructure.grpc_server.server import start_server
+from infrastructure.memory_storage.base import redis_db
+from infrastructure.rabbit_publisher.background import background_publisher
+from infrastructure.rabbit_publisher.coalescer import user_changes_coalescer
 from infrastructure.rabbit_publisher.publisher import connection
+from infrastructure.senders.queue import email_notifications, sms_notifications
+from infrastructure.senders.sms import sms_provider
+from infrastructure.senders.smtp import smtp_pool
 from infrastructure.settings import settings
 
+from .cache import HttpCache
 from .dependencies import get_context
-from .graphql.base import Mutation, Query
+from .graphql.base import Mutation, Query, Subscription
+from .router import CachedGraphQLRouter
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -20,10 +29,11 @@ logger.debug(f"Initing sentry for dsn: {settings.sentry_link}. Environment: {set
 if settings.sentry_link:
     sentry_sdk.init(settings.sentry_link, environment=settings.run_mode, enable_tracing=True)
 
-schema_v1 = strawberry.Schema(Query, Mutation)
+schema_v1 = strawberry.Schema(Query, Mutation, Subscription)
 
-graphql_app_v1 = GraphQLRouter(
+graphql_app_v1 = CachedGraphQLRouter(
     schema_v1,
+    http_cache=HttpCache(redis_db, use_users_versions_storage(), settings.http_cache_ttl_seconds),
     context_getter=get_context,
     graphiql=False if settings.run_mode == "prod" else True,
 )
@@ -41,8 +51,26 @@ app.add_middleware(
 app.include_router(graphql_app_v1, prefix="/api/v1/users")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.on_event("startup")
 async def on_startup():
-    loop = asyncio.get_running_loop()
-    asyncio.run_coroutine_threadsafe(start_server(), loop)
+    if settings.grpc_embedded:
+        loop = asyncio.get_running_loop()
+        asyncio.run_coroutine_threadsafe(start_server(), loop)
+
     await connection.connect()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await user_changes_coalescer.flush()
+    await background_publisher.stop(settings.publisher_shutdown_timeout_seconds)
+    await connection.close()
+    await email_notifications.stop(settings.notifications_shutdown_timeout_seconds)
+    await sms_notifications.stop(settings.notifications_shutdown_timeout_seconds)
+    await sms_provider.close()
+    smtp_pool.close()
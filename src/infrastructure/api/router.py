@@ -0,0 +1,83 @@
+import json
+from logging import getLogger
+
+from starlette.requests import Request
+from starlette.responses import Response
+from strawberry import UNSET
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http.exceptions import HTTPException
+
+from infrastructure.dependencies import use_tokens_adapter
+
+from .cache import HttpCache, count_cacheable_fields, etag_matches
+from .dependencies import CustomContext
+
+logger = getLogger("uvicorn.error")
+
+
+class CachedGraphQLRouter(GraphQLRouter[CustomContext, None]):
+
+    def __init__(self, *args, http_cache: HttpCache, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._http_cache = http_cache
+
+    async def _get_cache_key(self, request: Request, context: CustomContext) -> tuple[str, int] | None:
+        if not context.token:
+            return None
+
+        content_type = request.headers.get("Content-Type", "")
+        if request.method != "GET" and "application/json" not in content_type:
+            return None
+
+        try:
+            request_data = await self.parse_http_body(self.request_adapter_class(request))
+        except (HTTPException, json.JSONDecodeError):
+            return None
+
+        if not request_data.query:
+            return None
+
+        fields_count = count_cacheable_fields(request_data.query, request_data.operation_name)
+        if not fields_count:
+            return None
+
+        principal = await use_tokens_adapter().decode_token(context.token)
+        if not principal:
+            return None
+
+        cache_key = self._http_cache.get_cache_key(
+            request_data.query, request_data.operation_name, request_data.variables, principal
+        )
+        return cache_key, fields_count
+
+    def _not_modified(self, etag: str) -> Response:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    async def run(self, request: Request, context: CustomContext | None = UNSET, root_value: None = UNSET) -> Response:
+        if not context or not (cache_key_data := await self._get_cache_key(request, context)):
+            return await super().run(request, context, root_value)
+
+        cache_key, fields_count = cache_key_data
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            etag = await self._http_cache.get_etag(cache_key)
+            if etag and etag_matches(if_none_match, etag):
+                logger.debug(f"serving not modified response: {cache_key=} {etag=}")
+                return self._not_modified(etag)
+
+        snapshot = await self._http_cache.get_snapshot()
+        response = await super().run(request, context, root_value)
+        dependencies = context.cache_dependencies
+        if response.status_code != 200 or dependencies.get_resolved_fields() != fields_count:
+            return response
+
+        etag = await self._http_cache.save(cache_key, dependencies, snapshot)
+        if not etag:
+            return response
+
+        if if_none_match and etag_matches(if_none_match, etag):
+            return self._not_modified(etag)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
@@ -1,136 +1,43 @@
 import hashlib
 import hmac
-import math
-from logging import getLogger
+from typing import AsyncGenerator
 from urllib.parse import urljoin
 
 from sqlalchemy import ColumnElement, Select, delete, insert, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, joinedload, load_only, noload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 from sqlalchemy.sql.dml import ReturningUpdate
 from sqlalchemy.sql.functions import concat, count
 
 from domain.files.models import SavedFile, UploadingFile, UploadingFileMeta
 from domain.files.ports import FilesPort
-from domain.general.models import PaginatedResponse
 from domain.permissions.models import Permission
 from domain.users.exceptions import UserAlreadyExists
-from domain.users.models import User
+from domain.users.models import User, UserProjection, UserVersion
 from domain.users.ports import UsersPort
 from infrastructure.database.exceptions import IncorrectFileSignature
 from infrastructure.settings import settings
 
-from .factories import SavedFileFactory, UserFactory
+from .factories import PermissionFactory, SavedFileFactory, UserFactory
 from .models import Permission as PermissionModel
 from .models import User as UserModel
 from .models import UserAvatar, user_permission
 
-logger = getLogger("uvicorn.error")
-
-
-class UsersLoggingAdapter(UsersPort):
-
-    def __init__(self, adapter: UsersPort):
-        self._adapter = adapter
-
-    async def get_by_phone_or_username(self, phone_or_username: str) -> User | None:
-        logger.debug(f"fetching user by: {phone_or_username=}")
-        try:
-            user = await self._adapter.get_by_phone_or_username(phone_or_username)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def get_by_email_or_phone(self, email_or_phone: str) -> User | None:
-        logger.debug(f"fetching user by: {email_or_phone=}")
-        try:
-            user = await self._adapter.get_by_email_or_phone(email_or_phone)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def get_by_id(self, user_id: int) -> User | None:
-        logger.debug(f"fetching user by: {user_id=}")
-        try:
-            user = await self._adapter.get_by_id(user_id)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def get_by_username(self, username: str) -> User | None:
-        logger.debug(f"fetching user by: {username=}")
-        try:
-            user = await self._adapter.get_by_username(username)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def get_by_email(self, email: str) -> User | None:
-        logger.debug(f"fetching user by: {email=}")
-        try:
-            user = await self._adapter.get_by_email(email)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def get_by_ids(self, ids: list[int]) -> list[User]:
-        logger.debug(f"fetching users by ids: {ids=}")
-        try:
-            users = await self._adapter.get_by_ids(ids)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched users: {users=}")
-        return users
-
-    async def get_by_phone(self, phone: str) -> User | None:
-        logger.debug(f"fetching user by: {phone=}")
-        try:
-            user = await self._adapter.get_by_phone(phone)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched user: {user=}")
-        return user
-
-    async def save(self, user: User) -> User:
-        logger.debug(f"saving user: {user=}")
-        try:
-            saved_user = await self._adapter.save(user)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"saved user: {saved_user=}")
-        return saved_user
-
-    async def search_users(self, query: str, page: int = 1, per_page: int = 100) -> PaginatedResponse[User]:
-        logger.debug(f"searching users: {query=} {page=} {per_page=}")
-        try:
-            users = await self._adapter.search_users(query, page, per_page)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"founded users length: {len(users.get_data())}")
-        return users
+USER_FIELDS_COLUMNS: dict[str, list[InstrumentedAttribute]] = {
+    "username": [UserModel.username],
+    "phone": [UserModel.phone],
+    "email": [UserModel.email],
+    "first_name": [UserModel.first_name],
+    "last_name": [UserModel.last_name],
+    "middle_name": [UserModel.middle_name],
+    "status": [UserModel.status],
+    "email_confirmed": [UserModel.email_confirmed],
+    "phone_confirmed": [UserModel.phone_confirmed],
+    "avatar": [UserModel.avatar_id],
+    "version": [UserModel.version],
+}
 
 
 class UsersAdapter(UsersPort):
@@ -169,16 +76,86 @@ class UsersAdapter(UsersPort):
         stmt = select(UserModel).where(UserModel.email == email)
         return await self._get_user_by_stmt(stmt)
 
+    def _get_projection_options(self, fields: list[str]) -> list[ORMOption]:
+        # username is always loaded, default avatars are built from it
+        columns = [UserModel.id, UserModel.username]
+        for field in fields:
+            columns.extend(USER_FIELDS_COLUMNS.get(field, []))
+
+        options: list[ORMOption] = [load_only(*columns)]
+        if "avatar" not in fields:
+            options.append(noload(UserModel.avatar))
+
+        return options
+
     async def get_by_ids(self, ids: list[int]) -> list[User]:
         stmt = select(UserModel).where(UserModel.id.in_(ids))
         result = await self._session.execute(stmt)
         db_users = result.scalars().all()
         return [UserFactory.domain_from_orm(u) for u in db_users]
 
+    async def get_projections_by_ids(self, ids: list[int], fields: list[str]) -> list[UserProjection]:
+        stmt = select(UserModel).where(UserModel.id.in_(ids)).options(*self._get_projection_options(fields))
+        result = await self._session.execute(stmt)
+        db_users = result.scalars().all()
+        return [UserFactory.projection_from_orm(u, fields) for u in db_users]
+
+    def _get_stream_by_ids_stmt(self, ids: list[int]) -> Select[tuple[UserModel]]:
+        return (
+            select(UserModel)
+            .where(UserModel.id.in_(ids))
+            .execution_options(yield_per=settings.database_stream_chunk_size)
+        )
+
+    async def stream_by_ids(self, ids: list[int]) -> AsyncGenerator[User, None]:
+        result = await self._session.stream_scalars(self._get_stream_by_ids_stmt(ids))
+        async for user in result:
+            yield UserFactory.domain_from_orm(user)
+
+    async def stream_projections_by_ids(
+        self, ids: list[int], fields: list[str]
+    ) -> AsyncGenerator[UserProjection, None]:
+        stmt = self._get_stream_by_ids_stmt(ids).options(*self._get_projection_options(fields))
+        result = await self._session.stream_scalars(stmt)
+        async for user in result:
+            yield UserFactory.projection_from_orm(user, fields)
+
     async def get_by_phone(self, phone: str) -> User | None:
         stmt = select(UserModel).where(UserModel.phone == phone)
         return await self._get_user_by_stmt(stmt)
 
+    async def get_versions_by_ids(self, ids: list[int]) -> list[UserVersion]:
+        stmt = select(UserModel.id, UserModel.version).where(UserModel.id.in_(ids))
+        result = await self._session.execute(stmt)
+        return [UserVersion(user_id, version) for user_id, version in result.all()]
+
+    async def _get_version_by_stmt(self, stmt: Select[tuple[int, int]]) -> UserVersion | None:
+        result = await self._session.execute(stmt)
+        row = result.first()
+        return UserVersion(row.id, row.version) if row else None
+
+    async def get_version_by_username(self, username: str) -> UserVersion | None:
+        stmt = select(UserModel.id, UserModel.version).where(UserModel.username == username)
+        return await self._get_version_by_stmt(stmt)
+
+    async def get_version_by_email(self, email: str) -> UserVersion | None:
+        stmt = select(UserModel.id, UserModel.version).where(UserModel.email == email)
+        return await self._get_version_by_stmt(stmt)
+
+    async def get_permissions_by_ids(self, ids: list[int]) -> dict[int, list[Permission]]:
+        stmt = (
+            select(user_permission.c.user_id, PermissionModel)
+            .join(PermissionModel, PermissionModel.id == user_permission.c.permission_id)
+            .where(user_permission.c.user_id.in_(ids))
+            .options(joinedload(PermissionModel.category))
+        )
+        result = await self._session.execute(stmt)
+        permissions: dict[int, list[Permission]] = {user_id: [] for user_id in ids}
+        for user_id, permission in result.all():
+            permissions[user_id].append(PermissionFactory.domain_from_orm(permission))
+
+        return permissions
+
     async def _save_avatar(self, avatar: SavedFile) -> int:
         avatar_dict = SavedFileFactory.dict_from_domain(avatar)
         stmt = insert(UserAvatar).returning(UserAvatar.id).values(**avatar_dict)
@@ -209,7 +186,12 @@ class UsersAdapter(UsersPort):
     async def _create_or_update_user(self, user: User, saved_avatar_id: int | None) -> int:
         stmt_data = UserFactory.dict_from_domain(user, saved_avatar_id)
         if user.get_id():
-            stmt = update(UserModel).returning(UserModel.id).where(UserModel.id == user.get_id()).values(**stmt_data)
+            stmt = (
+                update(UserModel)
+                .returning(UserModel.id)
+                .where(UserModel.id == user.get_id())
+                .values(**stmt_data, version=UserModel.version + 1)
+            )
         else:
             stmt = insert(UserModel).returning(UserModel.id).values(stmt_data)
 
@@ -225,9 +207,18 @@ class UsersAdapter(UsersPort):
         avatar = user.get_avatar()
         saved_avatar_id = await self._get_or_save_avatar(avatar)
         saved_user_id = await self._create_or_update_user(user, saved_avatar_id)
-        await self._update_user_permissions(saved_user_id, user.get_permissions())
-        saved_user = await self._get_user_by_stmt(select(UserModel).where(UserModel.id == saved_user_id))
+        if user.permissions_loaded():
+            await self._update_user_permissions(saved_user_id, user.get_permissions())
+
+        stmt = (
+            select(UserModel)
+            .where(UserModel.id == saved_user_id)
+            .options(selectinload(UserModel.permissions))
+            .execution_options(populate_existing=True)
+        )
+        saved_user = await self._get_user_by_stmt(stmt)
         assert saved_user, "error saving user"
+        saved_user.set_changed_fields(user.get_changed_fields())
         return saved_user
 
     async def _get_count_for_query(self, whereclause: ColumnElement[bool]) -> int:
@@ -236,80 +227,41 @@ class UsersAdapter(UsersPort):
         count_scalar = count_result.scalar_one()
         return count_scalar
 
-    async def _get_pagination_result(
-        self, whereclause: ColumnElement[bool], offset: int, limit: int
-    ) -> list[UserModel]:
-        result_stmt = select(UserModel).where(whereclause).offset(offset).limit(limit)
-        print(result_stmt.compile(compile_kwargs={"literal_binds": True}))
-        result = await self._session.execute(result_stmt)
-        result_users = result.scalars().all()
-        return list(result_users)
-
-    async def _paginate_query(
-        self, whereclause: ColumnElement[bool], page: int = 1, per_page: int = 100
-    ) -> PaginatedResponse[User]:
-        per_page = per_page or self._default_per_page
-        page = page or self._default_page
-        count_value = await self._get_count_for_query(whereclause)
-        pages_count = math.ceil(count_value / per_page)
-        if page > pages_count:
-            page = self._default_page
-
-        result_users = await self._get_pagination_result(whereclause, (page - 1) * per_page, per_page)
-        users_models = [UserFactory.domain_from_orm(user) for user in result_users]
-        return PaginatedResponse(
-            page,
-            per_page,
-            pages_count,
-            count_value,
-            users_models,
-        )
-
-    async def search_users(self, query: str, page: int = 1, per_page: int = 100) -> PaginatedResponse[User]:
-        whereclause = or_(
+    def _get_search_whereclause(self, query: str) -> ColumnElement[bool]:
+        return or_(
             UserModel.username.icontains(query),
             concat(UserModel.first_name, " ", UserModel.last_name, " ", UserModel.middle_name).icontains(query),
         )
-        result_users = await self._paginate_query(whereclause, page, per_page)
-        return result_users
-
-
-class FilesLoggingAdapter(FilesPort):
-
-    def __init__(self, adapter: FilesPort):
-        self._adapter = adapter
-
-    async def save(self, file: SavedFile) -> SavedFile:
-        logger.debug(f"saving file: {file=}")
-        try:
-            saved_file = await self._adapter.save(file)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"saved file: {saved_file=}")
-        return saved_file
 
-    def validate_uploading(self, file: UploadingFile) -> None:
-        logger.debug(f"validating file: {file=}")
-        try:
-            self._adapter.validate_uploading(file)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"file validated: {file=}")
-
-    def get_default(self, user: User) -> SavedFile:
-        logger.debug(f"fetching default avatar for user: {user=}")
-        try:
-            default_file = self._adapter.get_default(user)
-        except Exception as e:
-            logger.exception(e)
-            raise
+    async def stream_search_users(self, query: str, page: int = 1, per_page: int = 100) -> AsyncGenerator[User, None]:
+        per_page = per_page or self._default_per_page
+        page = page or self._default_page
+        stmt = (
+            select(UserModel)
+            .where(self._get_search_whereclause(query))
+            .order_by(UserModel.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .execution_options(yield_per=settings.database_stream_chunk_size)
+        )
+        result = await self._session.stream_scalars(stmt)
+        async for user in result:
+            yield UserFactory.domain_from_orm(user)
+
+    async def stream_all(self, after_id: int = 0, chunk_size: int = 1000) -> AsyncGenerator[User, None]:
+        stmt = (
+            select(UserModel)
+            .where(UserModel.id > after_id)
+            .order_by(UserModel.id)
+            .options(selectinload(UserModel.permissions))
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self._session.stream_scalars(stmt)
+        async for user in result:
+            yield UserFactory.domain_from_orm(user)
 
-        logger.debug(f"fetched default avatar: {default_file=}")
-        return default_file
+    async def count_search_users(self, query: str) -> int:
+        return await self._get_count_for_query(self._get_search_whereclause(query))
 
 
 class FilesAdapter(FilesPort):
@@ -342,9 +294,9 @@ class FilesAdapter(FilesPort):
         if converted := file.get_converted():
             self._validate_file_meta(converted)
 
-    def get_default(self, user: User) -> SavedFile:
-        default_url = urljoin(settings.avatar_service_url, f"?squares=8&size=128&word={user.get_username()}")
-        default_filename = f"{user.get_username()}.svg"
+    def get_default(self, username: str) -> SavedFile:
+        default_url = urljoin(settings.avatar_service_url, f"?squares=8&size=128&word={username}")
+        default_filename = f"{username}.svg"
         return SavedFile(
             id_=0,
             original_url=default_url,
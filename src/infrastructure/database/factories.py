@@ -1,14 +1,29 @@
 from typing import Any
 
+from sqlalchemy import inspect
+
 from domain.files.models import SavedFile
 from domain.permissions.models import Permission, PermissionCategory
-from domain.users.models import User
+from domain.users.models import User, UserProjection
 
 from .models import Permission as PermissionModel
 from .models import PermissionCategory as PermissionCategoryModel
 from .models import User as UserModel
 from .models import UserAvatar
 
+PROJECTED_USER_FIELDS = (
+    "username",
+    "phone",
+    "email",
+    "first_name",
+    "last_name",
+    "middle_name",
+    "status",
+    "email_confirmed",
+    "phone_confirmed",
+    "version",
+)
+
 
 class SavedFileFactory:
 
@@ -57,6 +72,11 @@ class UserFactory:
 
     @staticmethod
     def domain_from_orm(user: UserModel) -> User:
+        if "permissions" not in inspect(user).unloaded:
+            permissions = [PermissionFactory.domain_from_orm(p) for p in user.permissions]
+        else:
+            permissions = None
+
         return User(
             id_=user.id,
             username=user.username,
@@ -71,9 +91,18 @@ class UserFactory:
             phone=user.phone,
             email=user.email,
             status=user.status,
-            permissions=[PermissionFactory.domain_from_orm(p) for p in user.permissions],
+            permissions=permissions,
+            version=user.version,
         )
 
+    @staticmethod
+    def projection_from_orm(user: UserModel, fields: list[str]) -> UserProjection:
+        values: dict[str, Any] = {field: getattr(user, field) for field in fields if field in PROJECTED_USER_FIELDS}
+        if "avatar" in fields:
+            values["avatar"] = SavedFileFactory.domain_from_orm(user.avatar) if user.avatar else None
+
+        return UserProjection(id_=user.id, username=user.username, values=values)
+
     @staticmethod
     def dict_from_domain(user: User, avatar_id: int | None = None) -> dict[str, Any]:
         return {
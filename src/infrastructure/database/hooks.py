@@ -0,0 +1,44 @@
+import asyncio
+from logging import getLogger
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+logger = getLogger("uvicorn.error")
+
+AFTER_COMMIT_CALLBACKS_KEY = "after_commit_callbacks"
+
+_callbacks_tasks: set[asyncio.Task] = set()
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    sync_session = session.sync_session
+    if not event.contains(sync_session, "after_commit", _on_commit):
+        event.listen(sync_session, "after_commit", _on_commit)
+        event.listen(sync_session, "after_soft_rollback", _on_rollback)
+
+    sync_session.info.setdefault(AFTER_COMMIT_CALLBACKS_KEY, []).append(callback)
+
+
+def _on_commit(session: Session) -> None:
+    callbacks = session.info.pop(AFTER_COMMIT_CALLBACKS_KEY, None)
+    if not callbacks:
+        return
+
+    task = asyncio.get_running_loop().create_task(_run_callbacks(callbacks))
+    _callbacks_tasks.add(task)
+    task.add_done_callback(_callbacks_tasks.discard)
+
+
+def _on_rollback(session: Session, previous_transaction: SessionTransaction) -> None:
+    session.info.pop(AFTER_COMMIT_CALLBACKS_KEY, None)
+
+
+async def _run_callbacks(callbacks: list[Callable[[], Awaitable[None]]]) -> None:
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            logger.exception(e)
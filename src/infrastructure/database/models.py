@@ -1,7 +1,7 @@
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, LargeBinary, Table, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import TIMESTAMP
 
@@ -49,6 +49,11 @@ class Permission(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_id_version", "id", postgresql_include=["version"]),
+        Index("ix_users_username_version", "username", postgresql_include=["id", "version"]),
+        Index("ix_users_email_version", "email", postgresql_include=["id", "version"]),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -68,5 +73,20 @@ class User(Base):
         default=datetime.now().astimezone(ZoneInfo("UTC")),
     )
     permissions: Mapped[list[Permission]] = relationship(
-        secondary=user_permission, back_populates="users", lazy="selectin"
+        secondary=user_permission, back_populates="users", lazy="raise"
+    )
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_user_id", "user_id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column()
+    user_id: Mapped[int | None] = mapped_column(nullable=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    content_type: Mapped[str] = mapped_column(default="application/json", server_default="application/json")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=lambda: datetime.now(ZoneInfo("UTC")), server_default=func.now()
     )
@@ -16,39 +16,53 @@ from domain.sessions.handlers import (
 )
 from domain.sessions.ports import SessionsStoragePort, TokensPort
 from domain.users.handlers import (
+    CountSearchUsersHandler,
     GetUserByRefreshTokenHandler,
     GetUserByTokenHandler,
     GetUserHandler,
     GetUsersByIdsHandler,
+    GetUsersPermissionsHandler,
+    GetUsersProjectionsByIdsHandler,
+    GetUsersVersionsHandler,
+    GetUserVersionHandler,
     ResetPasswordHandler,
     SearchUsersHandler,
+    StreamUsersByIdsHandler,
+    StreamUsersProjectionsByIdsHandler,
+    SubscribeUsersChangesHandler,
     UpdateAvatarHandler,
     UpdateEmailHandler,
     UpdatePasswordHandler,
     UpdatePhoneHandler,
     UpdateUserHandler,
 )
-from domain.users.ports import UserEventsPort, UsersPort
-from infrastructure.api.adapters import TokensAdapter, TokensLoggingAdapter
-from infrastructure.database.adapters import (
-    FilesAdapter,
-    FilesLoggingAdapter,
-    UsersAdapter,
-    UsersLoggingAdapter,
-)
+from domain.users.ports import UserChangesPort, UserEventsPort, UsersPort
+from infrastructure.api.adapters import TokensAdapter
+from infrastructure.database.adapters import FilesAdapter, UsersAdapter
 from infrastructure.database.base import session
+from infrastructure.grpc_server.cache import UserResponsesCache, user_responses_cache
+from infrastructure.instrumentation import instrument
 from infrastructure.memory_storage.adapters import (
     CodesStorageAdapter,
-    CodesStorageLoggingAdapter,
     SessionsStorageAdapter,
-    SessionsStorageLoggingAdapter,
+    UserChangesAdapter,
+    UserEventsRedisAdapter,
+    UsersVersionsAdapter,
 )
 from infrastructure.memory_storage.base import redis_db
+from infrastructure.memory_storage.broadcaster import users_changes_broadcaster
+from infrastructure.memory_storage.versions import UsersVersionsStorage, users_versions_storage
 from infrastructure.rabbit_publisher.adapters import (
-    UserEventsAdapter,
-    UserEventsLoggingAdapter,
+    UserEventsAfterCommitAdapter,
+    UserEventsCoalescingAdapter,
+    UserEventsOutboxAdapter,
+    UserEventsQueueAdapter,
 )
-from infrastructure.rabbit_publisher.publisher import connection
+from infrastructure.rabbit_publisher.background import background_publisher
+from infrastructure.rabbit_publisher.coalescer import user_changes_coalescer
+from infrastructure.rabbit_publisher.serializers import UserEventSerializer, get_user_event_serializer
+from infrastructure.senders.queue import email_notifications, sms_notifications
+from infrastructure.settings import settings
 
 
 async def use_session() -> AsyncGenerator[AsyncSession, None]:
@@ -58,33 +72,107 @@ async def use_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 def use_users_adapter(session: AsyncSession) -> UsersPort:
-    return UsersLoggingAdapter(UsersAdapter(session))
+    return instrument(UsersVersionsAdapter(UsersAdapter(session), use_users_versions_storage(), session), "users")
+
+
+def use_users_versions_storage() -> UsersVersionsStorage:
+    return users_versions_storage
+
+
+def use_user_responses_cache() -> UserResponsesCache:
+    return user_responses_cache
 
 
 def use_tokens_adapter() -> TokensPort:
-    return TokensLoggingAdapter(TokensAdapter())
+    return instrument(TokensAdapter(), "tokens", redact_results=("create_token",))
 
 
 def use_codes_storage_adapter() -> CodesStoragePort:
-    return CodesStorageLoggingAdapter(CodesStorageAdapter(redis_db))
+    return instrument(CodesStorageAdapter(redis_db), "codes_storage", redact_results=("generate_verification_code",))
 
 
 def use_sessions_storage_adapter() -> SessionsStoragePort:
-    return SessionsStorageLoggingAdapter(SessionsStorageAdapter(redis_db))
+    return instrument(SessionsStorageAdapter(redis_db), "sessions_storage")
 
 
 def use_files_adapter(session: AsyncSession) -> FilesPort:
-    return FilesLoggingAdapter(FilesAdapter(session))
+    return instrument(FilesAdapter(session), "files")
+
+
+def use_user_events_adapter(session: AsyncSession) -> UserEventsPort:
+    if settings.publisher_outbox_enabled:
+        return instrument(
+            UserEventsOutboxAdapter(
+                session,
+                use_user_event_serializer(),
+                UserEventsAfterCommitAdapter(UserEventsRedisAdapter(users_changes_broadcaster), session),
+            ),
+            "user_events",
+        )
+
+    return instrument(
+        UserEventsAfterCommitAdapter(
+            UserEventsRedisAdapter(
+                users_changes_broadcaster,
+                UserEventsCoalescingAdapter(
+                    UserEventsQueueAdapter(background_publisher, use_user_event_serializer()),
+                    user_changes_coalescer,
+                ),
+            ),
+            session,
+        ),
+        "user_events",
+    )
+
+
+def use_user_event_serializer() -> UserEventSerializer:
+    return get_user_event_serializer(settings.publisher_event_encoding, settings.publisher_user_changed_events)
 
 
-def use_user_events_adapter() -> UserEventsPort:
-    return UserEventsLoggingAdapter(UserEventsAdapter(connection))
+def use_email_sender() -> NotificationSenderPort:
+    return email_notifications
+
+
+def use_sms_sender() -> NotificationSenderPort:
+    return sms_notifications
+
+
+def use_user_changes_adapter() -> UserChangesPort:
+    return UserChangesAdapter(users_changes_broadcaster)
 
 
 def use_get_users_by_ids_handler(users_port: UsersPort, files_port: FilesPort) -> GetUsersByIdsHandler:
     return GetUsersByIdsHandler(users_port, files_port)
 
 
+def use_get_users_projections_by_ids_handler(
+    users_port: UsersPort, files_port: FilesPort
+) -> GetUsersProjectionsByIdsHandler:
+    return GetUsersProjectionsByIdsHandler(users_port, files_port)
+
+
+def use_stream_users_by_ids_handler(users_port: UsersPort, files_port: FilesPort) -> StreamUsersByIdsHandler:
+    return StreamUsersByIdsHandler(users_port, files_port)
+
+
+def use_stream_users_projections_by_ids_handler(
+    users_port: UsersPort, files_port: FilesPort
+) -> StreamUsersProjectionsByIdsHandler:
+    return StreamUsersProjectionsByIdsHandler(users_port, files_port)
+
+
+def use_get_user_version_handler(users_port: UsersPort) -> GetUserVersionHandler:
+    return GetUserVersionHandler(users_port)
+
+
+def use_get_users_versions_handler(users_port: UsersPort) -> GetUsersVersionsHandler:
+    return GetUsersVersionsHandler(users_port)
+
+
+def use_get_users_permissions_handler(users_port: UsersPort) -> GetUsersPermissionsHandler:
+    return GetUsersPermissionsHandler(users_port)
+
+
 def use_get_user_handler(
     users_port: UsersPort,
     files_port: FilesPort,
@@ -131,11 +219,12 @@ def use_authenticate_handler(
 
 
 def use_send_verification_code_handler(
-    sender: NotificationSenderPort,
+    email_sender: NotificationSenderPort,
+    sms_sender: NotificationSenderPort,
     users_port: UsersPort,
     codes_storage_port: CodesStoragePort,
 ) -> SendVerificationCodeHandler:
-    return SendVerificationCodeHandler(sender, users_port, codes_storage_port)
+    return SendVerificationCodeHandler(email_sender, sms_sender, users_port, codes_storage_port)
 
 
 def use_verify_code_handler(codes_storage_port: CodesStoragePort) -> VerifyCodeHandler:
@@ -247,3 +336,14 @@ def use_search_users_handler(
         tokens_port,
         files_port,
     )
+
+
+def use_subscribe_users_changes_handler(
+    user_changes_port: UserChangesPort,
+    files_port: FilesPort,
+) -> SubscribeUsersChangesHandler:
+    return SubscribeUsersChangesHandler(user_changes_port, files_port)
+
+
+def use_count_search_users_handler(users_port: UsersPort) -> CountSearchUsersHandler:
+    return CountSearchUsersHandler(users_port)
@@ -0,0 +1,75 @@
+from redis.asyncio.client import Redis
+
+from domain.users.models import User, UserVersion
+from infrastructure.memory_storage.base import redis_db
+from infrastructure.memory_storage.versions import (
+    USER_VERSION_KEY_PREFIX,
+    UsersVersionsStorage,
+    users_versions_storage,
+)
+from infrastructure.settings import settings
+
+from .factories import UserProtoFactory
+
+USER_RESPONSE_KEY_PREFIX = "users:responses:"
+
+GET_BY_ID_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+return redis.call('GET', ARGV[1] .. version)
+"""
+
+GET_BY_USERNAME_SCRIPT = """
+local mapping = redis.call('GET', KEYS[1])
+if not mapping then
+    return false
+end
+local user_id, version = string.match(mapping, '(%d+):(%d+)')
+local current_version = redis.call('GET', ARGV[1] .. user_id) or '0'
+if current_version ~= version then
+    return false
+end
+return redis.call('GET', ARGV[2] .. user_id .. ':' .. version)
+"""
+
+
+class UserResponsesCache:
+
+    def __init__(self, db: Redis, versions_storage: UsersVersionsStorage, ttl_seconds: int):
+        self._db = db
+        self._versions_storage = versions_storage
+        self._ttl_seconds = ttl_seconds
+        self._get_by_id_script = db.register_script(GET_BY_ID_SCRIPT)
+        self._get_by_username_script = db.register_script(GET_BY_USERNAME_SCRIPT)
+
+    def _get_response_key(self, user_id: int, version: int) -> str:
+        return f"{USER_RESPONSE_KEY_PREFIX}{user_id}:{version}"
+
+    def _get_username_key(self, username: str) -> str:
+        return f"{USER_RESPONSE_KEY_PREFIX}usernames:{username}"
+
+    async def get_by_id(self, user_id: int) -> bytes | None:
+        return await self._get_by_id_script(
+            keys=[self._versions_storage.get_user_version_key(user_id)], args=[f"{USER_RESPONSE_KEY_PREFIX}{user_id}:"]
+        )
+
+    async def get_by_username(self, username: str) -> bytes | None:
+        return await self._get_by_username_script(
+            keys=[self._get_username_key(username)],
+            args=[USER_VERSION_KEY_PREFIX, USER_RESPONSE_KEY_PREFIX],
+        )
+
+    async def save(self, user: User) -> bytes:
+        version = user.get_version()
+        response = UserProtoFactory.proto_from_domain(user).SerializeToString()
+        async with self._db.pipeline(transaction=False) as pipe:
+            pipe.setex(self._get_response_key(user.get_id(), version), self._ttl_seconds, response)
+            pipe.setex(self._get_username_key(user.get_username()), self._ttl_seconds, f"{user.get_id()}:{version}")
+            await pipe.execute()
+
+        await self._versions_storage.remember(UserVersion(user.get_id(), version))
+        return response
+
+
+user_responses_cache = UserResponsesCache(
+    redis_db, users_versions_storage, settings.grpc_user_responses_cache_ttl_seconds
+)
@@ -0,0 +1,7 @@
+from infrastructure.exceptions import BaseInfrastructureException
+
+
+class BaseGrpcException(BaseInfrastructureException): ...
+
+
+class IncorrectFieldMask(BaseGrpcException): ...
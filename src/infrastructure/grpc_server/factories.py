@@ -1,5 +1,7 @@
+from google.protobuf.field_mask_pb2 import FieldMask
+
 from domain.files.models import SavedFile
-from domain.users.models import User
+from domain.users.models import User, UserChange, UserProjection, UserVersion
 
 from .usersprotobuf import users_pb2
 
@@ -37,4 +39,45 @@ class UserProtoFactory:
             email_confirmed=user.get_email_confirmed(),
             phone_confirmed=user.get_phone_confirmed(),
             avatar=avatar_proto,
+            version=user.get_version(),
+        )
+
+    @staticmethod
+    def masked_proto_from_bytes(response: bytes, fields: FieldMask) -> users_pb2.UserResponse:
+        return UserProtoFactory.masked_proto(users_pb2.UserResponse.FromString(response), fields)
+
+    @staticmethod
+    def partial_proto_from_domain(user: User, fields: list[str]) -> users_pb2.UserResponse:
+        paths = [field for field in fields if field in users_pb2.UserResponse.DESCRIPTOR.fields_by_name]
+        return UserProtoFactory.masked_proto(UserProtoFactory.proto_from_domain(user), FieldMask(paths=paths))
+
+    @staticmethod
+    def masked_proto(user: users_pb2.UserResponse, fields: FieldMask) -> users_pb2.UserResponse:
+        masked = users_pb2.UserResponse(id=user.id)
+        fields.MergeMessage(user, masked)
+        return masked
+
+    @staticmethod
+    def proto_from_projection(user: UserProjection) -> users_pb2.UserResponse:
+        data = user.get_values().copy()
+        if avatar := data.pop("avatar", None):
+            data["avatar"] = SavedFileProtoFactory.proto_from_domain(avatar)
+
+        return users_pb2.UserResponse(id=user.get_id(), **data)
+
+
+class UserVersionProtoFactory:
+
+    @staticmethod
+    def not_modified_from_domain(version: UserVersion) -> users_pb2.UserResponse:
+        return users_pb2.UserResponse(id=version.get_user_id(), version=version.get_version(), not_modified=True)
+
+
+class UserChangeProtoFactory:
+
+    @staticmethod
+    def proto_from_domain(change: UserChange) -> users_pb2.UserChangeResponse:
+        return users_pb2.UserChangeResponse(
+            event_id=change.get_event_id(),
+            user=UserProtoFactory.proto_from_domain(change.get_user()),
         )
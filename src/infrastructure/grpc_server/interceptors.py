@@ -0,0 +1,228 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from logging import getLogger
+from typing import Any, AsyncIterator, Awaitable, Callable, Type
+
+import grpc
+from grpc import aio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from domain.sessions.exceptions import IncorrectTokenException
+from domain.users.exceptions import (
+    IncorrectUserChangeId,
+    UserChangesHistoryExpired,
+    UserChangesSubscriberLagged,
+    UserNotFound,
+)
+from infrastructure.grpc_server.exceptions import IncorrectFieldMask
+from infrastructure.metrics import GRPC_SERVER_HANDLING_SECONDS, GRPC_SERVER_IN_FLIGHT
+
+logger = getLogger("uvicorn.error")
+
+UnaryBehavior = Callable[[Any, aio.ServicerContext], Awaitable[Any]]
+StreamBehavior = Callable[[Any, aio.ServicerContext], AsyncIterator[Any]]
+
+EXCEPTIONS_STATUSES: dict[Type[Exception], tuple[grpc.StatusCode, str]] = {
+    UserNotFound: (grpc.StatusCode.NOT_FOUND, "User not found"),
+    IncorrectTokenException: (grpc.StatusCode.UNAUTHENTICATED, "Incorrect token"),
+    IncorrectFieldMask: (grpc.StatusCode.INVALID_ARGUMENT, "Incorrect field mask"),
+    UserChangesHistoryExpired: (
+        grpc.StatusCode.OUT_OF_RANGE,
+        "Changes history expired, refetch users and watch without last_event_id",
+    ),
+    UserChangesSubscriberLagged: (
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        "Too many undelivered changes, watch again with the last received last_event_id",
+    ),
+    IncorrectUserChangeId: (grpc.StatusCode.INVALID_ARGUMENT, "Incorrect last_event_id"),
+}
+
+request_session: ContextVar[AsyncSession] = ContextVar("request_session")
+
+
+def use_request_session() -> AsyncSession:
+    return request_session.get()
+
+
+class BehaviorInterceptor(aio.ServerInterceptor):
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, grpc.RpcMethodHandler | None] = {}
+
+    async def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], Awaitable[grpc.RpcMethodHandler]],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+        method = handler_call_details.method
+        if method in self._handlers:
+            return self._handlers[method]
+
+        handler = self._wrap_handler(await continuation(handler_call_details), method)
+        self._handlers[method] = handler
+        return handler
+
+    def _wrap_handler(self, handler: grpc.RpcMethodHandler | None, method: str) -> grpc.RpcMethodHandler | None:
+        if handler is None:
+            return None
+
+        if handler.unary_unary:
+            return grpc.unary_unary_rpc_method_handler(
+                self.wrap_unary(handler.unary_unary, method),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        if handler.unary_stream:
+            return grpc.unary_stream_rpc_method_handler(
+                self.wrap_stream(handler.unary_stream, method),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        return handler
+
+    def wrap_unary(self, behavior: UnaryBehavior, method: str) -> UnaryBehavior:
+        return behavior
+
+    def wrap_stream(self, behavior: StreamBehavior, method: str) -> StreamBehavior:
+        return behavior
+
+
+class SerializedResponsesInterceptor(BehaviorInterceptor):
+
+    def _wrap_handler(self, handler: grpc.RpcMethodHandler | None, method: str) -> grpc.RpcMethodHandler | None:
+        if handler is None or not handler.unary_unary or not handler.response_serializer:
+            return handler
+
+        serializer = handler.response_serializer
+
+        def serialize(response) -> bytes:
+            return response if isinstance(response, bytes) else serializer(response)
+
+        return grpc.unary_unary_rpc_method_handler(
+            handler.unary_unary,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=serialize,
+        )
+
+
+class ExceptionsInterceptor(BehaviorInterceptor):
+
+    def __init__(self, statuses: dict[Type[Exception], tuple[grpc.StatusCode, str]]) -> None:
+        super().__init__()
+        self._statuses = statuses
+
+    def _get_status(self, exception: Exception) -> tuple[grpc.StatusCode, str]:
+        for exception_type in type(exception).__mro__:
+            if status := self._statuses.get(exception_type):
+                return status
+
+        logger.exception(exception)
+        return grpc.StatusCode.INTERNAL, "Internal server error"
+
+    def wrap_unary(self, behavior: UnaryBehavior, method: str) -> UnaryBehavior:
+
+        async def wrapper(request, context: aio.ServicerContext):
+            try:
+                return await behavior(request, context)
+            except aio.AbortError:
+                raise
+            except Exception as e:
+                await context.abort(*self._get_status(e))
+
+        return wrapper
+
+    def wrap_stream(self, behavior: StreamBehavior, method: str) -> StreamBehavior:
+
+        async def wrapper(request, context: aio.ServicerContext):
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            except aio.AbortError:
+                raise
+            except Exception as e:
+                await context.abort(*self._get_status(e))
+
+        return wrapper
+
+
+class SessionInterceptor(BehaviorInterceptor):
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        super().__init__()
+        self._session_maker = session_maker
+
+    def wrap_unary(self, behavior: UnaryBehavior, method: str) -> UnaryBehavior:
+
+        async def wrapper(request, context: aio.ServicerContext):
+            async with self._session_maker() as session:
+                token = request_session.set(session)
+                try:
+                    response = await behavior(request, context)
+                    await session.commit()
+                    return response
+                finally:
+                    request_session.reset(token)
+
+        return wrapper
+
+    def wrap_stream(self, behavior: StreamBehavior, method: str) -> StreamBehavior:
+
+        async def wrapper(request, context: aio.ServicerContext):
+            async with self._session_maker() as session:
+                token = request_session.set(session)
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+
+                    await session.commit()
+                finally:
+                    request_session.reset(token)
+
+        return wrapper
+
+
+class MetricsInterceptor(BehaviorInterceptor):
+
+    def _observe(self, method: str, code: grpc.StatusCode | None, started_at: float) -> None:
+        code_name = (code or grpc.StatusCode.OK).name
+        GRPC_SERVER_HANDLING_SECONDS.labels(method, code_name).observe(time.perf_counter() - started_at)
+
+    def wrap_unary(self, behavior: UnaryBehavior, method: str) -> UnaryBehavior:
+        in_flight = GRPC_SERVER_IN_FLIGHT.labels(method)
+
+        async def wrapper(request, context: aio.ServicerContext):
+            started_at = time.perf_counter()
+            in_flight.inc()
+            code = None
+            try:
+                return await behavior(request, context)
+            except asyncio.CancelledError:
+                code = grpc.StatusCode.CANCELLED
+                raise
+            finally:
+                in_flight.dec()
+                self._observe(method, code or context.code(), started_at)
+
+        return wrapper
+
+    def wrap_stream(self, behavior: StreamBehavior, method: str) -> StreamBehavior:
+        in_flight = GRPC_SERVER_IN_FLIGHT.labels(method)
+
+        async def wrapper(request, context: aio.ServicerContext):
+            started_at = time.perf_counter()
+            in_flight.inc()
+            code = None
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            except asyncio.CancelledError:
+                code = grpc.StatusCode.CANCELLED
+                raise
+            finally:
+                in_flight.dec()
+                self._observe(method, code or context.code(), started_at)
+
+        return wrapper
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import multiprocessing
+import signal
+
+import sentry_sdk
+from prometheus_client import start_http_server
+
+from infrastructure.rabbit_publisher.background import background_publisher
+from infrastructure.rabbit_publisher.coalescer import user_changes_coalescer
+from infrastructure.rabbit_publisher.publisher import connection
+from infrastructure.settings import settings
+
+from .server import create_server
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def serve() -> None:
+    if settings.sentry_link:
+        sentry_sdk.init(settings.sentry_link, environment=settings.run_mode, enable_tracing=True)
+
+    server = create_server()
+    await server.start()
+    logger.info(f"grpc server started on {settings.grpc_host}:{settings.grpc_port}")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    await stop_event.wait()
+    logger.info(f"draining grpc server: grace={settings.grpc_shutdown_grace_seconds}s")
+    await server.stop(settings.grpc_shutdown_grace_seconds)
+    await user_changes_coalescer.flush()
+    await background_publisher.stop(settings.publisher_shutdown_timeout_seconds)
+    await connection.close()
+
+
+def run_worker(worker_index: int = 0) -> None:
+    logging.basicConfig(level=logging.DEBUG if settings.run_mode == "dev" else logging.INFO)
+    if settings.grpc_metrics_port:
+        start_http_server(settings.grpc_metrics_port + worker_index)
+
+    asyncio.run(serve())
+
+
+def main() -> None:
+    if settings.grpc_workers <= 1:
+        run_worker()
+        return
+
+    workers = [multiprocessing.Process(target=run_worker, args=(index,)) for index in range(settings.grpc_workers)]
+    for worker in workers:
+        worker.start()
+
+    def stop_workers(signum, frame):
+        for worker in workers:
+            if worker.is_alive() and worker.pid:
+                worker.terminate()
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,135 +1,241 @@
-from typing import Type
+from contextlib import aclosing
+from typing import AsyncIterator
 
 import grpc
 from grpc import aio
 
-from domain.sessions.exceptions import IncorrectTokenException
-from domain.users.exceptions import UserNotFound
-from infrastructure.database.exceptions import SessionNotFetchedException
+from infrastructure.database.base import session
 from infrastructure.dependencies import (
     use_files_adapter,
     use_get_user_by_refresh_token_handler,
     use_get_user_by_token_handler,
     use_get_user_handler,
+    use_get_user_version_handler,
     use_get_users_by_ids_handler,
-    use_session,
+    use_get_users_projections_by_ids_handler,
+    use_get_users_versions_handler,
     use_sessions_storage_adapter,
+    use_stream_users_by_ids_handler,
+    use_stream_users_projections_by_ids_handler,
+    use_subscribe_users_changes_handler,
     use_tokens_adapter,
+    use_user_changes_adapter,
+    use_user_responses_cache,
     use_users_adapter,
 )
-from infrastructure.grpc_server.factories import UserProtoFactory
-
+from infrastructure.grpc_server.factories import (
+    UserChangeProtoFactory,
+    UserProtoFactory,
+    UserVersionProtoFactory,
+)
+from infrastructure.settings import settings
+
+from .exceptions import IncorrectFieldMask
+from .interceptors import (
+    EXCEPTIONS_STATUSES,
+    ExceptionsInterceptor,
+    MetricsInterceptor,
+    SerializedResponsesInterceptor,
+    SessionInterceptor,
+    use_request_session,
+)
 from .usersprotobuf import users_pb2, users_pb2_grpc
 
 
-def handle_exception(exception: Type[Exception], status_code: grpc.StatusCode, details: str):
+def get_mask_fields(request) -> list[str] | None:
+    if not request.HasField("fields"):
+        return None
 
-    def decorator(func):
+    if not request.fields.IsValidForDescriptor(users_pb2.UserResponse.DESCRIPTOR):
+        raise IncorrectFieldMask(f"incorrect field mask: {request.fields.paths}")
 
-        async def wrapper(self, request, context):
-            try:
-                return await func(self, request, context)
-            except exception as e:
-                context.set_code(status_code)
-                context.set_details(details)
-                raise
+    return sorted({path.split(".")[0] for path in request.fields.paths})
 
-        return wrapper
 
-    return decorator
+def mask_response(response: bytes, request, fields: list[str] | None) -> bytes | users_pb2.UserResponse:
+    if fields is None:
+        return response
 
+    return UserProtoFactory.masked_proto_from_bytes(response, request.fields)
+
+
+async def get_not_modified(request, **lookup) -> users_pb2.UserResponse | None:
+    if not request.HasField("known_version"):
+        return None
+
+    handler = use_get_user_version_handler(use_users_adapter(use_request_session()))
+    version = await handler.execute(**lookup)
+    if version.get_version() != request.known_version:
+        return None
+
+    return UserVersionProtoFactory.not_modified_from_domain(version)
 
-class Users:
 
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
+async def split_not_modified(request) -> tuple[list[int], list[users_pb2.UserResponse]]:
+    ids = list(request.ids)
+    if not request.known_versions:
+        return ids, []
+
+    handler = use_get_users_versions_handler(use_users_adapter(use_request_session()))
+    versions = await handler.execute(ids)
+    not_modified = [v for v in versions if request.known_versions.get(v.get_user_id()) == v.get_version()]
+    not_modified_ids = {v.get_user_id() for v in not_modified}
+    return (
+        [user_id for user_id in ids if user_id not in not_modified_ids],
+        [UserVersionProtoFactory.not_modified_from_domain(v) for v in not_modified],
     )
-    @handle_exception(exception=UserNotFound, status_code=grpc.StatusCode.NOT_FOUND, details="User not found")
-    async def GetUserById(self, request: users_pb2.GetUserByIdRequest, context) -> users_pb2.UserResponse:
-        async for session in use_session():
+
+
+class Users:
+
+    async def GetUserById(self, request: users_pb2.GetUserByIdRequest, context) -> bytes | users_pb2.UserResponse:
+        fields = get_mask_fields(request)
+        if not_modified := await get_not_modified(request, id_=request.id):
+            return not_modified
+
+        cache = use_user_responses_cache()
+        response = await cache.get_by_id(request.id)
+        if not response:
+            session = use_request_session()
             handler = use_get_user_handler(use_users_adapter(session), use_files_adapter(session))
             user = await handler.execute(id_=request.id)
-            return UserProtoFactory.proto_from_domain(user)
+            response = await cache.save(user)
 
-        raise SessionNotFetchedException("error fetching session")
+        return mask_response(response, request, fields)
 
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
-    )
     async def GetUsersByIds(self, request: users_pb2.GetUsersByIdsRequest, context) -> users_pb2.UsersArrayResponse:
-        async for session in use_session():
-            handler = use_get_users_by_ids_handler(use_users_adapter(session), use_files_adapter(session))
-            users = await handler.execute(list(request.ids))
-            return users_pb2.UsersArrayResponse(users=[UserProtoFactory.proto_from_domain(user) for user in users])
+        fields = get_mask_fields(request)
+        ids, not_modified = await split_not_modified(request)
+        if not ids:
+            return users_pb2.UsersArrayResponse(users=not_modified)
 
-        raise SessionNotFetchedException("error fetching session")
-
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
-    )
-    @handle_exception(exception=UserNotFound, status_code=grpc.StatusCode.NOT_FOUND, details="User not found")
-    async def GetUserByUsername(self, request: users_pb2.GetUserByUsernameRequest, context) -> users_pb2.UserResponse:
-        async for session in use_session():
+        session = use_request_session()
+        if fields is None:
+            handler = use_get_users_by_ids_handler(use_users_adapter(session), use_files_adapter(session))
+            users = [UserProtoFactory.proto_from_domain(user) for user in await handler.execute(ids)]
+        else:
+            handler = use_get_users_projections_by_ids_handler(use_users_adapter(session), use_files_adapter(session))
+            users = [UserProtoFactory.proto_from_projection(user) for user in await handler.execute(ids, fields)]
+
+        return users_pb2.UsersArrayResponse(users=[*not_modified, *users])
+
+    async def StreamUsersByIds(
+        self, request: users_pb2.GetUsersByIdsRequest, context
+    ) -> AsyncIterator[users_pb2.UserResponse]:
+        fields = get_mask_fields(request)
+        ids, not_modified = await split_not_modified(request)
+        for response in not_modified:
+            yield response
+
+        if not ids:
+            return
+
+        session = use_request_session()
+        if fields is None:
+            handler = use_stream_users_by_ids_handler(use_users_adapter(session), use_files_adapter(session))
+            async with aclosing(handler.execute(ids)) as users:
+                async for user in users:
+                    yield UserProtoFactory.proto_from_domain(user)
+        else:
+            projections_handler = use_stream_users_projections_by_ids_handler(
+                use_users_adapter(session), use_files_adapter(session)
+            )
+            async with aclosing(projections_handler.execute(ids, fields)) as projections:
+                async for projection in projections:
+                    yield UserProtoFactory.proto_from_projection(projection)
+
+    async def WatchUsers(
+        self, request: users_pb2.WatchUsersRequest, context
+    ) -> AsyncIterator[users_pb2.UserChangeResponse]:
+        last_event_id = request.last_event_id if request.HasField("last_event_id") else None
+        session = use_request_session()
+        handler = use_subscribe_users_changes_handler(use_user_changes_adapter(), use_files_adapter(session))
+        async with aclosing(handler.execute(list(request.ids), last_event_id)) as changes:
+            async for change in changes:
+                yield UserChangeProtoFactory.proto_from_domain(change)
+
+    async def GetUserByUsername(
+        self, request: users_pb2.GetUserByUsernameRequest, context
+    ) -> bytes | users_pb2.UserResponse:
+        fields = get_mask_fields(request)
+        if not_modified := await get_not_modified(request, username=request.username):
+            return not_modified
+
+        cache = use_user_responses_cache()
+        response = await cache.get_by_username(request.username)
+        if not response:
+            session = use_request_session()
             handler = use_get_user_handler(use_users_adapter(session), use_files_adapter(session))
             user = await handler.execute(username=request.username)
-            return UserProtoFactory.proto_from_domain(user)
+            response = await cache.save(user)
 
-        raise SessionNotFetchedException("error fetching session")
+        return mask_response(response, request, fields)
 
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
-    )
-    @handle_exception(exception=UserNotFound, status_code=grpc.StatusCode.NOT_FOUND, details="User not found")
     async def GetUserByEmail(self, request: users_pb2.GetUserByEmailRequest, context) -> users_pb2.UserResponse:
-        async for session in use_session():
-            handler = use_get_user_handler(use_users_adapter(session), use_files_adapter(session))
-            user = await handler.execute(email=request.email)
-            return UserProtoFactory.proto_from_domain(user)
+        fields = get_mask_fields(request)
+        if not_modified := await get_not_modified(request, email=request.email):
+            return not_modified
 
-        raise SessionNotFetchedException("error fetching session")
+        session = use_request_session()
+        handler = use_get_user_handler(use_users_adapter(session), use_files_adapter(session))
+        user = await handler.execute(email=request.email)
+        response = UserProtoFactory.proto_from_domain(user)
+        return response if fields is None else UserProtoFactory.masked_proto(response, request.fields)
 
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
-    )
-    @handle_exception(exception=UserNotFound, status_code=grpc.StatusCode.NOT_FOUND, details="User not found")
     async def GetUserByToken(self, request: users_pb2.GetUserByTokenRequest, context) -> users_pb2.UserResponse:
-        async for session in use_session():
-            handler = use_get_user_by_token_handler(
-                use_users_adapter(session), use_tokens_adapter(), use_files_adapter(session)
-            )
-            user = await handler.execute(request.token)
-            return UserProtoFactory.proto_from_domain(user)
+        session = use_request_session()
+        handler = use_get_user_by_token_handler(
+            use_users_adapter(session), use_tokens_adapter(), use_files_adapter(session)
+        )
+        user = await handler.execute(request.token)
+        return UserProtoFactory.proto_from_domain(user)
 
-        raise SessionNotFetchedException("error fetching session")
-
-    @handle_exception(exception=Exception, status_code=grpc.StatusCode.INTERNAL, details="Internal server error")
-    @handle_exception(
-        exception=IncorrectTokenException, status_code=grpc.StatusCode.UNAUTHENTICATED, details="Incorrect token"
-    )
-    @handle_exception(exception=UserNotFound, status_code=grpc.StatusCode.NOT_FOUND, details="User not found")
     async def GetUserByRefreshToken(self, request: users_pb2.GetUserByTokenRequest, context) -> users_pb2.UserResponse:
-        async for session in use_session():
-            handler = use_get_user_by_refresh_token_handler(
-                use_users_adapter(session),
-                use_tokens_adapter(),
-                use_sessions_storage_adapter(),
-                use_files_adapter(session),
-            )
-            user = await handler.execute(request.token)
-            return UserProtoFactory.proto_from_domain(user)
-
-        raise SessionNotFetchedException("error fetching session")
+        session = use_request_session()
+        handler = use_get_user_by_refresh_token_handler(
+            use_users_adapter(session),
+            use_tokens_adapter(),
+            use_sessions_storage_adapter(),
+            use_files_adapter(session),
+        )
+        user = await handler.execute(request.token)
+        return UserProtoFactory.proto_from_domain(user)
+
+
+def get_interceptors() -> list[aio.ServerInterceptor]:
+    return [
+        MetricsInterceptor(),
+        ExceptionsInterceptor(EXCEPTIONS_STATUSES),
+        SessionInterceptor(session),
+        SerializedResponsesInterceptor(),
+    ]
+
+
+def get_server_options() -> list[tuple[str, int]]:
+    return [
+        ("grpc.so_reuseport", 1),
+        ("grpc.keepalive_time_ms", settings.grpc_keepalive_time_ms),
+        ("grpc.keepalive_timeout_ms", settings.grpc_keepalive_timeout_ms),
+        ("grpc.keepalive_permit_without_calls", int(settings.grpc_keepalive_permit_without_calls)),
+        ("grpc.http2.min_ping_interval_without_data_ms", settings.grpc_min_ping_interval_ms),
+        ("grpc.max_receive_message_length", settings.grpc_max_receive_message_length),
+        ("grpc.max_send_message_length", settings.grpc_max_send_message_length),
+    ]
+
+
+def create_server() -> aio.Server:
+    server = aio.server(
+        interceptors=get_interceptors(),
+        options=get_server_options(),
+        maximum_concurrent_rpcs=settings.grpc_max_concurrent_rpcs,
+        compression=grpc.Compression.Gzip if settings.grpc_gzip_compression else None,
+    )
+    users_pb2_grpc.add_UsersServicer_to_server(Users(), server)
+    server.add_insecure_port(f"{settings.grpc_host}:{settings.grpc_port}")
+    return server
 
 
 async def start_server():
-    server = aio.server()
-    users_pb2_grpc.add_UsersServicer_to_server(Users(), server)
-    listen_addr = "[::]:9090"
-    server.add_insecure_port(listen_addr)
+    server = create_server()
     await server.start()
     await server.wait_for_termination()
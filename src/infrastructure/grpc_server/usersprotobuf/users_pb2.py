@@ -12,31 +12,47 @@ from google.protobuf.internal import builder as _builder
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0busers.proto\x12\rusersprotobuf\"\xa2\x01\n\tSavedFile\x12\x14\n\x0coriginal_url\x18\x01 \x01(\t\x12\x19\n\x11original_filename\x18\x02 \x01(\t\x12\x1a\n\rconverted_url\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x1f\n\x12\x63onverted_filename\x18\x04 \x01(\tH\x01\x88\x01\x01\x42\x10\n\x0e_converted_urlB\x15\n\x13_converted_filename\"\xc5\x02\n\x0cUserResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x12\n\x05phone\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x12\n\x05\x65mail\x18\x04 \x01(\tH\x01\x88\x01\x01\x12\x12\n\nfirst_name\x18\x05 \x01(\t\x12\x11\n\tlast_name\x18\x06 \x01(\t\x12\x18\n\x0bmiddle_name\x18\x07 \x01(\tH\x02\x88\x01\x01\x12\x13\n\x06status\x18\x08 \x01(\tH\x03\x88\x01\x01\x12\x17\n\x0f\x65mail_confirmed\x18\t \x01(\x08\x12\x17\n\x0fphone_confirmed\x18\n \x01(\x08\x12-\n\x06\x61vatar\x18\x0b \x01(\x0b\x32\x18.usersprotobuf.SavedFileH\x04\x88\x01\x01\x42\x08\n\x06_phoneB\x08\n\x06_emailB\x0e\n\x0c_middle_nameB\t\n\x07_statusB\t\n\x07_avatar\" \n\x12GetUserByIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\",\n\x18GetUserByUsernameRequest\x12\x10\n\x08username\x18\x01 \x01(\t\"&\n\x15GetUserByEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"&\n\x15GetUserByTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"#\n\x14GetUsersByIdsRequest\x12\x0b\n\x03ids\x18\x01 \x03(\x05\"@\n\x12UsersArrayResponse\x12*\n\x05users\x18\x01 \x03(\x0b\x32\x1b.usersprotobuf.UserResponse2\x9c\x04\n\x05Users\x12O\n\x0bGetUserById\x12!.usersprotobuf.GetUserByIdRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12Y\n\rGetUsersByIds\x12#.usersprotobuf.GetUsersByIdsRequest\x1a!.usersprotobuf.UsersArrayResponse\"\x00\x12[\n\x11GetUserByUsername\x12\'.usersprotobuf.GetUserByUsernameRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12U\n\x0eGetUserByEmail\x12$.usersprotobuf.GetUserByEmailRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12U\n\x0eGetUserByToken\x12$.usersprotobuf.GetUserByTokenRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12\\\n\x15GetUserByRefreshToken\x12$.usersprotobuf.GetUserByTokenRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0busers.proto\x12\rusersprotobuf\x1a google/protobuf/field_mask.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"\xa2\x01\n\tSavedFile\x12\x14\n\x0coriginal_url\x18\x01 \x01(\t\x12\x19\n\x11original_filename\x18\x02 \x01(\t\x12\x1a\n\rconverted_url\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x1f\n\x12\x63onverted_filename\x18\x04 \x01(\tH\x01\x88\x01\x01\x42\x10\n\x0e_converted_urlB\x15\n\x13_converted_filename\"\xec\x02\n\x0cUserResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x12\n\x05phone\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x12\n\x05\x65mail\x18\x04 \x01(\tH\x01\x88\x01\x01\x12\x12\n\nfirst_name\x18\x05 \x01(\t\x12\x11\n\tlast_name\x18\x06 \x01(\t\x12\x18\n\x0bmiddle_name\x18\x07 \x01(\tH\x02\x88\x01\x01\x12\x13\n\x06status\x18\x08 \x01(\tH\x03\x88\x01\x01\x12\x17\n\x0f\x65mail_confirmed\x18\t \x01(\x08\x12\x17\n\x0fphone_confirmed\x18\n \x01(\x08\x12-\n\x06\x61vatar\x18\x0b \x01(\x0b\x32\x18.usersprotobuf.SavedFileH\x04\x88\x01\x01\x12\x0f\n\x07version\x18\x0c \x01(\x03\x12\x14\n\x0cnot_modified\x18\r \x01(\x08\x42\x08\n\x06_phoneB\x08\n\x06_emailB\x0e\n\x0c_middle_nameB\t\n\x07_statusB\t\n\x07_avatar\"5\n\x17\x45ventPermissionCategory\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"y\n\x0f\x45ventPermission\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12=\n\x08\x63\x61tegory\x18\x03 \x01(\x0b\x32&.usersprotobuf.EventPermissionCategoryH\x00\x88\x01\x01\x42\x0b\n\t_category\"\xf1\x01\n\tUserEvent\x12\x12\n\nevent_type\x18\x01 \x01(\t\x12\x16\n\x0eincluded_users\x18\x02 \x03(\x05\x12)\n\x04user\x18\x03 \x01(\x0b\x32\x1b.usersprotobuf.UserResponse\x12\x32\n\tlast_seen\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x00\x88\x01\x01\x12\x33\n\x0bpermissions\x18\x05 \x03(\x0b\x32\x1e.usersprotobuf.EventPermission\x12\x16\n\x0e\x63hanged_fields\x18\x06 \x03(\tB\x0c\n\n_last_seen\"\x8a\x01\n\x12GetUserByIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12/\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMaskH\x00\x88\x01\x01\x12\x1a\n\rknown_version\x18\x03 \x01(\x03H\x01\x88\x01\x01\x42\t\n\x07_fieldsB\x10\n\x0e_known_version\"\x96\x01\n\x18GetUserByUsernameRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12/\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMaskH\x00\x88\x01\x01\x12\x1a\n\rknown_version\x18\x03 \x01(\x03H\x01\x88\x01\x01\x42\t\n\x07_fieldsB\x10\n\x0e_known_version\"\x90\x01\n\x15GetUserByEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12/\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMaskH\x00\x88\x01\x01\x12\x1a\n\rknown_version\x18\x03 \x01(\x03H\x01\x88\x01\x01\x42\t\n\x07_fieldsB\x10\n\x0e_known_version\"&\n\x15GetUserByTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\xe5\x01\n\x14GetUsersByIdsRequest\x12\x0b\n\x03ids\x18\x01 \x03(\x05\x12/\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMaskH\x00\x88\x01\x01\x12N\n\x0eknown_versions\x18\x03 \x03(\x0b\x32\x36.usersprotobuf.GetUsersByIdsRequest.KnownVersionsEntry\x1a\x34\n\x12KnownVersionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\x42\t\n\x07_fields\"@\n\x12UsersArrayResponse\x12*\n\x05users\x18\x01 \x03(\x0b\x32\x1b.usersprotobuf.UserResponse\"N\n\x11WatchUsersRequest\x12\x0b\n\x03ids\x18\x01 \x03(\x05\x12\x1a\n\rlast_event_id\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\x10\n\x0e_last_event_id\"Q\n\x12UserChangeResponse\x12\x10\n\x08\x65vent_id\x18\x01 \x01(\t\x12)\n\x04user\x18\x02 \x01(\x0b\x32\x1b.usersprotobuf.UserResponse2\xcd\x05\n\x05Users\x12O\n\x0bGetUserById\x12!.usersprotobuf.GetUserByIdRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12Y\n\rGetUsersByIds\x12#.usersprotobuf.GetUsersByIdsRequest\x1a!.usersprotobuf.UsersArrayResponse\"\x00\x12X\n\x10StreamUsersByIds\x12#.usersprotobuf.GetUsersByIdsRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x30\x01\x12U\n\nWatchUsers\x12 .usersprotobuf.WatchUsersRequest\x1a!.usersprotobuf.UserChangeResponse\"\x00\x30\x01\x12[\n\x11GetUserByUsername\x12\'.usersprotobuf.GetUserByUsernameRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12U\n\x0eGetUserByEmail\x12$.usersprotobuf.GetUserByEmailRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12U\n\x0eGetUserByToken\x12$.usersprotobuf.GetUserByTokenRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x12\\\n\x15GetUserByRefreshToken\x12$.usersprotobuf.GetUserByTokenRequest\x1a\x1b.usersprotobuf.UserResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'users_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_SAVEDFILE']._serialized_start=31
-  _globals['_SAVEDFILE']._serialized_end=193
-  _globals['_USERRESPONSE']._serialized_start=196
-  _globals['_USERRESPONSE']._serialized_end=521
-  _globals['_GETUSERBYIDREQUEST']._serialized_start=523
-  _globals['_GETUSERBYIDREQUEST']._serialized_end=555
-  _globals['_GETUSERBYUSERNAMEREQUEST']._serialized_start=557
-  _globals['_GETUSERBYUSERNAMEREQUEST']._serialized_end=601
-  _globals['_GETUSERBYEMAILREQUEST']._serialized_start=603
-  _globals['_GETUSERBYEMAILREQUEST']._serialized_end=641
-  _globals['_GETUSERBYTOKENREQUEST']._serialized_start=643
-  _globals['_GETUSERBYTOKENREQUEST']._serialized_end=681
-  _globals['_GETUSERSBYIDSREQUEST']._serialized_start=683
-  _globals['_GETUSERSBYIDSREQUEST']._serialized_end=718
-  _globals['_USERSARRAYRESPONSE']._serialized_start=720
-  _globals['_USERSARRAYRESPONSE']._serialized_end=784
-  _globals['_USERS']._serialized_start=787
-  _globals['_USERS']._serialized_end=1327
+  _globals['_GETUSERSBYIDSREQUEST_KNOWNVERSIONSENTRY']._options = None
+  _globals['_GETUSERSBYIDSREQUEST_KNOWNVERSIONSENTRY']._serialized_options = b'8\001'
+  _globals['_SAVEDFILE']._serialized_start=98
+  _globals['_SAVEDFILE']._serialized_end=260
+  _globals['_USERRESPONSE']._serialized_start=263
+  _globals['_USERRESPONSE']._serialized_end=627
+  _globals['_EVENTPERMISSIONCATEGORY']._serialized_start=629
+  _globals['_EVENTPERMISSIONCATEGORY']._serialized_end=682
+  _globals['_EVENTPERMISSION']._serialized_start=684
+  _globals['_EVENTPERMISSION']._serialized_end=805
+  _globals['_USEREVENT']._serialized_start=808
+  _globals['_USEREVENT']._serialized_end=1049
+  _globals['_GETUSERBYIDREQUEST']._serialized_start=1052
+  _globals['_GETUSERBYIDREQUEST']._serialized_end=1190
+  _globals['_GETUSERBYUSERNAMEREQUEST']._serialized_start=1193
+  _globals['_GETUSERBYUSERNAMEREQUEST']._serialized_end=1343
+  _globals['_GETUSERBYEMAILREQUEST']._serialized_start=1346
+  _globals['_GETUSERBYEMAILREQUEST']._serialized_end=1490
+  _globals['_GETUSERBYTOKENREQUEST']._serialized_start=1492
+  _globals['_GETUSERBYTOKENREQUEST']._serialized_end=1530
+  _globals['_GETUSERSBYIDSREQUEST']._serialized_start=1533
+  _globals['_GETUSERSBYIDSREQUEST']._serialized_end=1762
+  _globals['_GETUSERSBYIDSREQUEST_KNOWNVERSIONSENTRY']._serialized_start=1699
+  _globals['_GETUSERSBYIDSREQUEST_KNOWNVERSIONSENTRY']._serialized_end=1751
+  _globals['_USERSARRAYRESPONSE']._serialized_start=1764
+  _globals['_USERSARRAYRESPONSE']._serialized_end=1828
+  _globals['_WATCHUSERSREQUEST']._serialized_start=1830
+  _globals['_WATCHUSERSREQUEST']._serialized_end=1908
+  _globals['_USERCHANGERESPONSE']._serialized_start=1910
+  _globals['_USERCHANGERESPONSE']._serialized_end=1991
+  _globals['_USERS']._serialized_start=1994
+  _globals['_USERS']._serialized_end=2711
 # @@protoc_insertion_point(module_scope)
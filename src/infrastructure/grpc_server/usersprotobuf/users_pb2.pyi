@@ -1,3 +1,5 @@
+from google.protobuf import field_mask_pb2 as _field_mask_pb2
+from google.protobuf import timestamp_pb2 as _timestamp_pb2
 from google.protobuf.internal import containers as _containers
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
@@ -18,7 +20,7 @@ class SavedFile(_message.Message):
     def __init__(self, original_url: _Optional[str] = ..., original_filename: _Optional[str] = ..., converted_url: _Optional[str] = ..., converted_filename: _Optional[str] = ...) -> None: ...
 
 class UserResponse(_message.Message):
-    __slots__ = ("id", "username", "phone", "email", "first_name", "last_name", "middle_name", "status", "email_confirmed", "phone_confirmed", "avatar")
+    __slots__ = ("id", "username", "phone", "email", "first_name", "last_name", "middle_name", "status", "email_confirmed", "phone_confirmed", "avatar", "version", "not_modified")
     ID_FIELD_NUMBER: _ClassVar[int]
     USERNAME_FIELD_NUMBER: _ClassVar[int]
     PHONE_FIELD_NUMBER: _ClassVar[int]
@@ -30,6 +32,8 @@ class UserResponse(_message.Message):
     EMAIL_CONFIRMED_FIELD_NUMBER: _ClassVar[int]
     PHONE_CONFIRMED_FIELD_NUMBER: _ClassVar[int]
     AVATAR_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    NOT_MODIFIED_FIELD_NUMBER: _ClassVar[int]
     id: int
     username: str
     phone: str
@@ -41,25 +45,73 @@ class UserResponse(_message.Message):
     email_confirmed: bool
     phone_confirmed: bool
     avatar: SavedFile
-    def __init__(self, id: _Optional[int] = ..., username: _Optional[str] = ..., phone: _Optional[str] = ..., email: _Optional[str] = ..., first_name: _Optional[str] = ..., last_name: _Optional[str] = ..., middle_name: _Optional[str] = ..., status: _Optional[str] = ..., email_confirmed: bool = ..., phone_confirmed: bool = ..., avatar: _Optional[_Union[SavedFile, _Mapping]] = ...) -> None: ...
+    version: int
+    not_modified: bool
+    def __init__(self, id: _Optional[int] = ..., username: _Optional[str] = ..., phone: _Optional[str] = ..., email: _Optional[str] = ..., first_name: _Optional[str] = ..., last_name: _Optional[str] = ..., middle_name: _Optional[str] = ..., status: _Optional[str] = ..., email_confirmed: bool = ..., phone_confirmed: bool = ..., avatar: _Optional[_Union[SavedFile, _Mapping]] = ..., version: _Optional[int] = ..., not_modified: bool = ...) -> None: ...
+
+class EventPermissionCategory(_message.Message):
+    __slots__ = ("code", "name")
+    CODE_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    code: str
+    name: str
+    def __init__(self, code: _Optional[str] = ..., name: _Optional[str] = ...) -> None: ...
+
+class EventPermission(_message.Message):
+    __slots__ = ("code", "name", "category")
+    CODE_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    CATEGORY_FIELD_NUMBER: _ClassVar[int]
+    code: str
+    name: str
+    category: EventPermissionCategory
+    def __init__(self, code: _Optional[str] = ..., name: _Optional[str] = ..., category: _Optional[_Union[EventPermissionCategory, _Mapping]] = ...) -> None: ...
+
+class UserEvent(_message.Message):
+    __slots__ = ("event_type", "included_users", "user", "last_seen", "permissions", "changed_fields")
+    EVENT_TYPE_FIELD_NUMBER: _ClassVar[int]
+    INCLUDED_USERS_FIELD_NUMBER: _ClassVar[int]
+    USER_FIELD_NUMBER: _ClassVar[int]
+    LAST_SEEN_FIELD_NUMBER: _ClassVar[int]
+    PERMISSIONS_FIELD_NUMBER: _ClassVar[int]
+    CHANGED_FIELDS_FIELD_NUMBER: _ClassVar[int]
+    event_type: str
+    included_users: _containers.RepeatedScalarFieldContainer[int]
+    user: UserResponse
+    last_seen: _timestamp_pb2.Timestamp
+    permissions: _containers.RepeatedCompositeFieldContainer[EventPermission]
+    changed_fields: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, event_type: _Optional[str] = ..., included_users: _Optional[_Iterable[int]] = ..., user: _Optional[_Union[UserResponse, _Mapping]] = ..., last_seen: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ..., permissions: _Optional[_Iterable[_Union[EventPermission, _Mapping]]] = ..., changed_fields: _Optional[_Iterable[str]] = ...) -> None: ...
 
 class GetUserByIdRequest(_message.Message):
-    __slots__ = ("id",)
+    __slots__ = ("id", "fields", "known_version")
     ID_FIELD_NUMBER: _ClassVar[int]
+    FIELDS_FIELD_NUMBER: _ClassVar[int]
+    KNOWN_VERSION_FIELD_NUMBER: _ClassVar[int]
     id: int
-    def __init__(self, id: _Optional[int] = ...) -> None: ...
+    fields: _field_mask_pb2.FieldMask
+    known_version: int
+    def __init__(self, id: _Optional[int] = ..., fields: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., known_version: _Optional[int] = ...) -> None: ...
 
 class GetUserByUsernameRequest(_message.Message):
-    __slots__ = ("username",)
+    __slots__ = ("username", "fields", "known_version")
     USERNAME_FIELD_NUMBER: _ClassVar[int]
+    FIELDS_FIELD_NUMBER: _ClassVar[int]
+    KNOWN_VERSION_FIELD_NUMBER: _ClassVar[int]
     username: str
-    def __init__(self, username: _Optional[str] = ...) -> None: ...
+    fields: _field_mask_pb2.FieldMask
+    known_version: int
+    def __init__(self, username: _Optional[str] = ..., fields: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., known_version: _Optional[int] = ...) -> None: ...
 
 class GetUserByEmailRequest(_message.Message):
-    __slots__ = ("email",)
+    __slots__ = ("email", "fields", "known_version")
     EMAIL_FIELD_NUMBER: _ClassVar[int]
+    FIELDS_FIELD_NUMBER: _ClassVar[int]
+    KNOWN_VERSION_FIELD_NUMBER: _ClassVar[int]
     email: str
-    def __init__(self, email: _Optional[str] = ...) -> None: ...
+    fields: _field_mask_pb2.FieldMask
+    known_version: int
+    def __init__(self, email: _Optional[str] = ..., fields: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., known_version: _Optional[int] = ...) -> None: ...
 
 class GetUserByTokenRequest(_message.Message):
     __slots__ = ("token",)
@@ -68,13 +120,40 @@ class GetUserByTokenRequest(_message.Message):
     def __init__(self, token: _Optional[str] = ...) -> None: ...
 
 class GetUsersByIdsRequest(_message.Message):
-    __slots__ = ("ids",)
+    __slots__ = ("ids", "fields", "known_versions")
+    class KnownVersionsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: int
+        value: int
+        def __init__(self, key: _Optional[int] = ..., value: _Optional[int] = ...) -> None: ...
     IDS_FIELD_NUMBER: _ClassVar[int]
+    FIELDS_FIELD_NUMBER: _ClassVar[int]
+    KNOWN_VERSIONS_FIELD_NUMBER: _ClassVar[int]
     ids: _containers.RepeatedScalarFieldContainer[int]
-    def __init__(self, ids: _Optional[_Iterable[int]] = ...) -> None: ...
+    fields: _field_mask_pb2.FieldMask
+    known_versions: _containers.ScalarMap[int, int]
+    def __init__(self, ids: _Optional[_Iterable[int]] = ..., fields: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., known_versions: _Optional[_Mapping[int, int]] = ...) -> None: ...
 
 class UsersArrayResponse(_message.Message):
     __slots__ = ("users",)
     USERS_FIELD_NUMBER: _ClassVar[int]
     users: _containers.RepeatedCompositeFieldContainer[UserResponse]
     def __init__(self, users: _Optional[_Iterable[_Union[UserResponse, _Mapping]]] = ...) -> None: ...
+
+class WatchUsersRequest(_message.Message):
+    __slots__ = ("ids", "last_event_id")
+    IDS_FIELD_NUMBER: _ClassVar[int]
+    LAST_EVENT_ID_FIELD_NUMBER: _ClassVar[int]
+    ids: _containers.RepeatedScalarFieldContainer[int]
+    last_event_id: str
+    def __init__(self, ids: _Optional[_Iterable[int]] = ..., last_event_id: _Optional[str] = ...) -> None: ...
+
+class UserChangeResponse(_message.Message):
+    __slots__ = ("event_id", "user")
+    EVENT_ID_FIELD_NUMBER: _ClassVar[int]
+    USER_FIELD_NUMBER: _ClassVar[int]
+    event_id: str
+    user: UserResponse
+    def __init__(self, event_id: _Optional[str] = ..., user: _Optional[_Union[UserResponse, _Mapping]] = ...) -> None: ...
@@ -24,6 +24,16 @@ class UsersStub(object):
             request_serializer=users__pb2.GetUsersByIdsRequest.SerializeToString,
             response_deserializer=users__pb2.UsersArrayResponse.FromString,
         )
+        self.StreamUsersByIds = channel.unary_stream(
+            "/usersprotobuf.Users/StreamUsersByIds",
+            request_serializer=users__pb2.GetUsersByIdsRequest.SerializeToString,
+            response_deserializer=users__pb2.UserResponse.FromString,
+        )
+        self.WatchUsers = channel.unary_stream(
+            "/usersprotobuf.Users/WatchUsers",
+            request_serializer=users__pb2.WatchUsersRequest.SerializeToString,
+            response_deserializer=users__pb2.UserChangeResponse.FromString,
+        )
         self.GetUserByUsername = channel.unary_unary(
             "/usersprotobuf.Users/GetUserByUsername",
             request_serializer=users__pb2.GetUserByUsernameRequest.SerializeToString,
@@ -61,6 +71,18 @@ class UsersServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def StreamUsersByIds(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def WatchUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def GetUserByUsername(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -98,6 +120,16 @@ def add_UsersServicer_to_server(servicer, server):
             request_deserializer=users__pb2.GetUsersByIdsRequest.FromString,
             response_serializer=users__pb2.UsersArrayResponse.SerializeToString,
         ),
+        "StreamUsersByIds": grpc.unary_stream_rpc_method_handler(
+            servicer.StreamUsersByIds,
+            request_deserializer=users__pb2.GetUsersByIdsRequest.FromString,
+            response_serializer=users__pb2.UserResponse.SerializeToString,
+        ),
+        "WatchUsers": grpc.unary_stream_rpc_method_handler(
+            servicer.WatchUsers,
+            request_deserializer=users__pb2.WatchUsersRequest.FromString,
+            response_serializer=users__pb2.UserChangeResponse.SerializeToString,
+        ),
         "GetUserByUsername": grpc.unary_unary_rpc_method_handler(
             servicer.GetUserByUsername,
             request_deserializer=users__pb2.GetUserByUsernameRequest.FromString,
@@ -185,6 +217,64 @@ class Users(object):
             metadata,
         )
 
+    @staticmethod
+    def StreamUsersByIds(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/usersprotobuf.Users/StreamUsersByIds",
+            users__pb2.GetUsersByIdsRequest.SerializeToString,
+            users__pb2.UserResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def WatchUsers(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/usersprotobuf.Users/WatchUsers",
+            users__pb2.WatchUsersRequest.SerializeToString,
+            users__pb2.UserChangeResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def GetUserByUsername(
         request,
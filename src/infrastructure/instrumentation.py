@@ -0,0 +1,245 @@
+import inspect
+import random
+import reprlib
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from datetime import date, datetime
+from enum import Enum
+from functools import wraps
+from logging import DEBUG, Logger, getLogger
+from typing import Any, Callable, Collection, TypeVar
+
+from prometheus_client import Histogram
+
+from infrastructure.metrics import PORT_CALL_SECONDS, PORT_CALLS, PORT_ERRORS
+from infrastructure.settings import settings
+
+PortT = TypeVar("PortT")
+
+logger = getLogger("uvicorn.error")
+
+REDACTED = "***"
+SENSITIVE_ARGUMENTS = frozenset({"code", "password", "session", "token"})
+SCALAR_TYPES = (str, bytes, int, float, bool, date, datetime, Enum, type(None))
+SUMMARY_ITEMS = 3
+
+_scalar_repr = reprlib.Repr()
+_scalar_repr.maxstring = 64
+_scalar_repr.maxother = 64
+
+
+def summarize(value: Any) -> str:
+    if isinstance(value, SCALAR_TYPES):
+        return _scalar_repr.repr(value)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [summarize(item) for item in list(value)[:SUMMARY_ITEMS]]
+        if len(value) > SUMMARY_ITEMS:
+            items.append(f"... {len(value)} items")
+
+        return f"[{', '.join(items)}]"
+
+    if isinstance(value, dict):
+        return f"{{{len(value)} items}}"
+
+    get_id = getattr(value, "get_id", None)
+    if callable(get_id):
+        return f"{value.__class__.__name__}(id={get_id()})"
+
+    get_user = getattr(value, "get_user", None)
+    if callable(get_user):
+        return f"{value.__class__.__name__}(user={summarize(get_user())})"
+
+    return value.__class__.__name__
+
+
+class _Summary:
+    __slots__ = ("_value",)
+
+    def __init__(self, value: Any):
+        self._value = value
+
+    def __str__(self) -> str:
+        return summarize(self._value)
+
+
+class _Arguments:
+    __slots__ = ("_names", "_args", "_kwargs", "_redact")
+
+    def __init__(self, names: list[str], args: tuple, kwargs: dict[str, Any], redact: Collection[str]):
+        self._names = names
+        self._args = args
+        self._kwargs = kwargs
+        self._redact = redact
+
+    def _format(self, name: str, value: Any) -> str:
+        return f"{name}={REDACTED if name in self._redact else summarize(value)}"
+
+    def __str__(self) -> str:
+        arguments = [self._format(name, value) for name, value in zip(self._names, self._args)]
+        arguments.extend(self._format(name, value) for name, value in self._kwargs.items())
+        return ", ".join(arguments)
+
+
+class InstrumentedPort:
+
+    def __init__(
+        self,
+        port: Any,
+        name: str,
+        logger: Logger,
+        level: int,
+        sample_rate: float,
+        redact: Collection[str],
+        redact_results: Collection[str],
+    ):
+        self._port = port
+        self._name = name
+        self._logger = logger
+        self._level = level
+        self._sample_rate = sample_rate
+        self._redact = redact
+        self._redact_results = redact_results
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(self._port, attribute)
+        if attribute.startswith("_") or not callable(value):
+            return value
+
+        wrapped = self._wrap(attribute, value)
+        setattr(self, attribute, wrapped)
+        return wrapped
+
+    def _sampled(self) -> bool:
+        if not self._logger.isEnabledFor(self._level):
+            return False
+
+        return self._sample_rate >= 1 or random.random() < self._sample_rate
+
+    def _wrap(self, attribute: str, method: Callable) -> Callable:
+        name = f"{self._name}.{attribute}"
+        try:
+            names = [
+                parameter.name
+                for parameter in inspect.signature(method).parameters.values()
+                if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+            ]
+        except (TypeError, ValueError):
+            names = []
+
+        result_summary = (lambda result: REDACTED) if attribute in self._redact_results else _Summary
+        calls = PORT_CALLS.labels(self._name, attribute)
+        latency = PORT_CALL_SECONDS.labels(self._name, attribute)
+
+        if inspect.iscoroutinefunction(method):
+
+            @wraps(method)
+            async def call_async(*args, **kwargs):
+                sampled = self._sampled()
+                if sampled:
+                    self._logger.log(self._level, "%s(%s)", name, _Arguments(names, args, kwargs, self._redact))
+
+                calls.inc()
+                started_at = time.perf_counter()
+                try:
+                    result = await method(*args, **kwargs)
+                except Exception as e:
+                    self._failed(attribute, e)
+                    raise
+
+                elapsed = time.perf_counter() - started_at
+                latency.observe(elapsed)
+                if sampled:
+                    self._logger.log(self._level, "%s -> %s in %.2fms", name, result_summary(result), elapsed * 1000)
+
+                return result
+
+            return call_async
+
+        @wraps(method)
+        def call(*args, **kwargs):
+            sampled = self._sampled()
+            if sampled:
+                self._logger.log(self._level, "%s(%s)", name, _Arguments(names, args, kwargs, self._redact))
+
+            calls.inc()
+            started_at = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                self._failed(attribute, e)
+                raise
+
+            if isinstance(result, AsyncIterator):
+                return self._stream(attribute, result, latency, sampled, started_at)
+
+            elapsed = time.perf_counter() - started_at
+            latency.observe(elapsed)
+            if sampled:
+                self._logger.log(self._level, "%s -> %s in %.2fms", name, result_summary(result), elapsed * 1000)
+
+            return result
+
+        return call
+
+    def _failed(self, attribute: str, error: Exception) -> None:
+        PORT_ERRORS.labels(self._name, attribute, error.__class__.__name__).inc()
+        self._logger.exception(error)
+
+    async def _stream(
+        self,
+        attribute: str,
+        items: AsyncIterator,
+        latency: Histogram,
+        sampled: bool,
+        started_at: float,
+    ) -> AsyncIterator:
+        streamed_count = 0
+        try:
+            async with aclosing(items):  # pyright: ignore[reportArgumentType]
+                async for item in items:
+                    streamed_count += 1
+                    yield item
+        except Exception as e:
+            self._failed(attribute, e)
+            raise
+
+        elapsed = time.perf_counter() - started_at
+        latency.observe(elapsed)
+        if sampled:
+            self._logger.log(
+                self._level,
+                "%s.%s streamed %d items in %.2fms",
+                self._name,
+                attribute,
+                streamed_count,
+                elapsed * 1000,
+            )
+
+
+def instrument(
+    port: PortT,
+    name: str | None = None,
+    *,
+    level: int = DEBUG,
+    sample_rate: float | None = None,
+    redact: Collection[str] = SENSITIVE_ARGUMENTS,
+    redact_results: Collection[str] = (),
+) -> PortT:
+    """Log calls to every public method of the port and record their metrics.
+
+    Arguments and results are summarized and formatted only when a record is emitted,
+    so a disabled level costs a single `isEnabledFor` check per call. Call counts,
+    errors and latencies are recorded for every call under the `name` port label,
+    and failures are always logged regardless of the level and the sample rate.
+    """
+    return InstrumentedPort(  # pyright: ignore[reportReturnType]
+        port,
+        name or port.__class__.__name__,
+        logger,
+        level,
+        settings.log_sample_rate if sample_rate is None else sample_rate,
+        redact,
+        redact_results,
+    )
@@ -1,54 +1,85 @@
+import math
 import random
 import string
+import time
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from logging import getLogger
+from typing import AsyncGenerator
 from zoneinfo import ZoneInfo
 
 from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.notifications.ports import CodesStoragePort
+from domain.permissions.models import Permission
 from domain.sessions.models import AuthenticationSession, AuthSessionOperations, Session
 from domain.sessions.ports import SessionsStoragePort
-from domain.users.models import User
+from domain.users.exceptions import UserChangesSubscriberLagged
+from domain.users.models import User, UserChange, UserProjection, UserVersion
+from domain.users.ports import UserChangesPort, UserEventsPort, UsersPort
 from infrastructure.memory_storage.exceptions import (
     IncorrectAuthenticationSession,
     IncorrectVerificationCode,
     VerificationAttemptsExpired,
+    VerificationCodeRecentlySent,
+    VerificationCodesLimitExceeded,
 )
 from infrastructure.settings import settings
 
-logger = getLogger("uvicorn.error")
-
-
-class CodesStorageLoggingAdapter(CodesStoragePort):
-
-    def __init__(self, adapter: CodesStoragePort):
-        self._adapter = adapter
-
-    async def generate_verification_code(self, email_or_phone: str) -> str:
-        logger.debug(f"generating verification code for: {email_or_phone=}")
-        try:
-            code = await self._adapter.generate_verification_code(email_or_phone)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"fetched code: {code=}")
-        return code
-
-    async def validate_verification_code(self, email_or_phone: str, code: str) -> None:
-        logger.debug(f"validating verification code: {email_or_phone=} {code=}")
-        try:
-            await self._adapter.validate_verification_code(email_or_phone, code)
-        except Exception as e:
-            logger.exception(e)
-            raise
+from .broadcaster import UsersChangesBroadcaster, parse_event_id
+from .versions import UsersVersionsStorage
+
+RESERVE_VERIFICATION_SEND_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cooldown_ms = tonumber(ARGV[2])
+local window_ms = tonumber(ARGV[3])
+local cooldown_ttl = redis.call('PTTL', KEYS[1])
+if cooldown_ttl > 0 then
+    return {1, cooldown_ttl}
+end
+for i = 2, #KEYS do
+    local limit = tonumber(ARGV[3 + i])
+    if limit > 0 then
+        redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now - window_ms)
+        if redis.call('ZCARD', KEYS[i]) >= limit then
+            local oldest = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+            return {i, tonumber(oldest[2]) + window_ms - now}
+        end
+    end
+end
+if cooldown_ms > 0 then
+    redis.call('SET', KEYS[1], 1, 'PX', cooldown_ms)
+end
+for i = 2, #KEYS do
+    if tonumber(ARGV[3 + i]) > 0 then
+        redis.call('ZADD', KEYS[i], now, ARGV[4])
+        redis.call('PEXPIRE', KEYS[i], window_ms)
+    end
+end
+return {0, 0}
+"""
+
+RELEASE_VERIFICATION_SEND_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'code') ~= ARGV[1] then
+    return 0
+end
+local member = redis.call('HGET', KEYS[1], 'member')
+local ip_sends_key = redis.call('HGET', KEYS[1], 'ip_sends_key')
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('ZREM', KEYS[3], member)
+if ip_sends_key and ip_sends_key ~= '' then
+    redis.call('ZREM', ip_sends_key, member)
+end
+return 1
+"""
 
 
 class CodesStorageAdapter(CodesStoragePort):
 
     def __init__(self, db: Redis):
         self._db = db
+        self._reserve_send = db.register_script(RESERVE_VERIFICATION_SEND_SCRIPT)
+        self._release_send = db.register_script(RELEASE_VERIFICATION_SEND_SCRIPT)
 
     def _get_verification_key(self, email_or_phone: str) -> str:
         return f"verification:{email_or_phone}"
@@ -56,6 +87,50 @@ class CodesStorageAdapter(CodesStoragePort):
     def _get_verification_attempts_key(self, email_or_phone: str) -> str:
         return f"verification:{email_or_phone}:attempts"
 
+    def _get_verification_cooldown_key(self, email_or_phone: str) -> str:
+        return f"verification:{email_or_phone}:cooldown"
+
+    def _get_verification_sends_key(self, email_or_phone: str) -> str:
+        return f"verification:{email_or_phone}:sends"
+
+    def _get_ip_verification_sends_key(self, client_ip: str) -> str:
+        return f"verification:ip:{client_ip}:sends"
+
+    def _get_verification_reservation_key(self, email_or_phone: str) -> str:
+        return f"verification:{email_or_phone}:reservation"
+
+    def _get_send_limits_keys(self, email_or_phone: str, client_ip: str | None) -> list[str]:
+        keys = [
+            self._get_verification_cooldown_key(email_or_phone),
+            self._get_verification_sends_key(email_or_phone),
+        ]
+        if client_ip:
+            keys.append(self._get_ip_verification_sends_key(client_ip))
+
+        return keys
+
+    async def _reserve_verification_send(self, email_or_phone: str, client_ip: str | None) -> str:
+        now_ms = int(time.time() * 1000)
+        member = f"{now_ms}:{random.getrandbits(32)}"
+        status, retry_after_ms = await self._reserve_send(
+            keys=self._get_send_limits_keys(email_or_phone, client_ip),
+            args=[
+                now_ms,
+                settings.verification_resend_cooldown_seconds * 1000,
+                settings.verification_sends_window_seconds * 1000,
+                member,
+                settings.verification_sends_per_identifier,
+                settings.verification_sends_per_ip,
+            ],
+        )
+        retry_after = math.ceil(int(retry_after_ms) / 1000)
+        if status == 1:
+            raise VerificationCodeRecentlySent(f"verification code was already sent, retry in {retry_after} seconds")
+        if status:
+            raise VerificationCodesLimitExceeded(f"too many verification codes, retry in {retry_after} seconds")
+
+        return member
+
     def _generate_code(self, n: int = 6) -> str:
         return "".join([str(random.randint(0, 9)) for _ in range(n)])
 
@@ -70,14 +145,29 @@ class CodesStorageAdapter(CodesStoragePort):
         if attempts and int(attempts) > settings.verification_attempts_count:
             raise VerificationAttemptsExpired
 
-    async def generate_verification_code(self, email_or_phone: str) -> str:
-        verification_key = self._get_verification_key(email_or_phone)
+    async def generate_verification_code(self, email_or_phone: str, client_ip: str | None = None) -> str:
+        member = await self._reserve_verification_send(email_or_phone, client_ip)
         code = self._generate_code()
-        await self._db.setex(verification_key, settings.verification_exp_seconds, code)
-        attempts_key = self._get_verification_attempts_key(email_or_phone)
-        await self._db.setex(attempts_key, settings.verification_exp_seconds, 0)
+        # remembers what to undo if the code is never delivered, see release_verification_code
+        reservation_key = self._get_verification_reservation_key(email_or_phone)
+        ip_sends_key = self._get_ip_verification_sends_key(client_ip) if client_ip else ""
+        reservation_ttl = max(settings.verification_resend_cooldown_seconds, settings.verification_sends_window_seconds)
+        async with self._db.pipeline(transaction=True) as pipe:
+            pipe.setex(self._get_verification_key(email_or_phone), settings.verification_exp_seconds, code)
+            pipe.setex(self._get_verification_attempts_key(email_or_phone), settings.verification_exp_seconds, 0)
+            pipe.hset(reservation_key, mapping={"code": code, "member": member, "ip_sends_key": ip_sends_key})
+            pipe.expire(reservation_key, reservation_ttl)
+            await pipe.execute()
+
         return code
 
+    async def release_verification_code(self, email_or_phone: str, code: str) -> None:
+        reservation_key = self._get_verification_reservation_key(email_or_phone)
+        keys = self._get_send_limits_keys(email_or_phone, None)
+        # the IP sends key is read from the reservation since the notifications worker doesn't know the client
+        # address, and the script does nothing if a newer code has been reserved since
+        await self._release_send(keys=[reservation_key, *keys], args=[code])
+
     async def validate_verification_code(self, email_or_phone: str, code: str) -> None:
         await self._validate_attempts(email_or_phone)
         key = self._get_verification_key(email_or_phone)
@@ -86,77 +176,6 @@ class CodesStorageAdapter(CodesStoragePort):
             raise IncorrectVerificationCode
 
 
-class SessionsStorageLoggingAdapter(SessionsStoragePort):
-
-    def __init__(self, adapter: SessionsStoragePort):
-        self._adapter = adapter
-
-    async def has_session(self, session: Session) -> bool:
-        logger.debug(f"validating has session: {session=}")
-        try:
-            has = await self._adapter.has_session(session)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"has session: {has}")
-        return has
-
-    async def save(self, session: Session) -> Session:
-        logger.debug(f"saving session: {session=}")
-        try:
-            saved_session = await self._adapter.save(session)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"saved session: {saved_session}")
-        return saved_session
-
-    async def delete(self, session: Session) -> None:
-        logger.debug(f"deleting session: {session=}")
-        try:
-            await self._adapter.delete(session)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"session deleted")
-
-    async def delete_all(self, user: User) -> None:
-        logger.debug(f"deleting all sessions for: {user=}")
-        try:
-            await self._adapter.delete_all(user)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"deleted all sessions")
-
-    async def verify_auth_session(self, email_or_phone: str, operation: AuthSessionOperations, session: str) -> None:
-        logger.debug(f"verifying auth session: {email_or_phone=} {operation=} {session=}")
-        try:
-            await self._adapter.verify_auth_session(email_or_phone, operation, session)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"veryfied auth session")
-
-    async def generate_auth_session(
-        self, email_or_phone: str, operation: AuthSessionOperations
-    ) -> AuthenticationSession:
-        logger.debug(f"generating auth session for: {email_or_phone=} {operation=}")
-        try:
-            session = await self._adapter.generate_auth_session(email_or_phone, operation)
-        except Exception as e:
-            logger.exception(e)
-            raise
-
-        logger.debug(f"generated auth session: {session=}")
-        return session
-
-
 class SessionsStorageAdapter(SessionsStoragePort):
 
     def __init__(self, redis_db: Redis):
@@ -202,3 +221,114 @@ class SessionsStorageAdapter(SessionsStoragePort):
         await self._db.setex(session_key, settings.auth_session_exp_seconds, session_value)
         exp = datetime.now(ZoneInfo("UTC")) + timedelta(seconds=settings.auth_session_exp_seconds)
         return AuthenticationSession(session=session_value, exp=exp)
+
+
+class UsersVersionsAdapter(UsersPort):
+
+    def __init__(self, adapter: UsersPort, versions_storage: UsersVersionsStorage, session: AsyncSession):
+        self._adapter = adapter
+        self._versions_storage = versions_storage
+        self._session = session
+
+    async def get_by_phone_or_username(self, phone_or_username: str) -> User | None:
+        return await self._adapter.get_by_phone_or_username(phone_or_username)
+
+    async def get_by_email_or_phone(self, email_or_phone: str) -> User | None:
+        return await self._adapter.get_by_email_or_phone(email_or_phone)
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        return await self._adapter.get_by_id(user_id)
+
+    async def get_by_username(self, username: str) -> User | None:
+        return await self._adapter.get_by_username(username)
+
+    async def get_by_email(self, email: str) -> User | None:
+        return await self._adapter.get_by_email(email)
+
+    async def get_by_ids(self, ids: list[int]) -> list[User]:
+        return await self._adapter.get_by_ids(ids)
+
+    async def get_projections_by_ids(self, ids: list[int], fields: list[str]) -> list[UserProjection]:
+        return await self._adapter.get_projections_by_ids(ids, fields)
+
+    def stream_by_ids(self, ids: list[int]) -> AsyncGenerator[User, None]:
+        return self._adapter.stream_by_ids(ids)
+
+    def stream_projections_by_ids(self, ids: list[int], fields: list[str]) -> AsyncGenerator[UserProjection, None]:
+        return self._adapter.stream_projections_by_ids(ids, fields)
+
+    async def get_by_phone(self, phone: str) -> User | None:
+        return await self._adapter.get_by_phone(phone)
+
+    async def get_versions_by_ids(self, ids: list[int]) -> list[UserVersion]:
+        return await self._adapter.get_versions_by_ids(ids)
+
+    async def get_version_by_username(self, username: str) -> UserVersion | None:
+        return await self._adapter.get_version_by_username(username)
+
+    async def get_version_by_email(self, email: str) -> UserVersion | None:
+        return await self._adapter.get_version_by_email(email)
+
+    def stream_search_users(self, query: str, page: int = 1, per_page: int = 100) -> AsyncGenerator[User, None]:
+        return self._adapter.stream_search_users(query, page, per_page)
+
+    def stream_all(self, after_id: int = 0, chunk_size: int = 1000) -> AsyncGenerator[User, None]:
+        return self._adapter.stream_all(after_id, chunk_size)
+
+    async def count_search_users(self, query: str) -> int:
+        return await self._adapter.count_search_users(query)
+
+    async def get_permissions_by_ids(self, ids: list[int]) -> dict[int, list[Permission]]:
+        return await self._adapter.get_permissions_by_ids(ids)
+
+    async def save(self, user: User) -> User:
+        saved_user = await self._adapter.save(user)
+        self._versions_storage.bump_after_commit(
+            self._session, UserVersion(saved_user.get_id(), saved_user.get_version())
+        )
+        return saved_user
+
+
+class UserEventsRedisAdapter(UserEventsPort):
+
+    def __init__(self, broadcaster: UsersChangesBroadcaster, adapter: UserEventsPort | None = None):
+        self._adapter = adapter
+        self._broadcaster = broadcaster
+
+    async def send_user_created(self, user: User) -> None:
+        if self._adapter:
+            await self._adapter.send_user_created(user)
+
+    async def send_user_changed(self, user: User) -> None:
+        if self._adapter:
+            await self._adapter.send_user_changed(user)
+
+        await self._broadcaster.publish(user)
+
+
+class UserChangesAdapter(UserChangesPort):
+
+    def __init__(self, broadcaster: UsersChangesBroadcaster):
+        self._broadcaster = broadcaster
+
+    async def subscribe(self, ids: list[int], after: str | None = None) -> AsyncGenerator[UserChange, None]:
+        if after:
+            parse_event_id(after)
+
+        async with self._broadcaster.subscribe(ids) as queue:
+            last_id = after
+            if after:
+                async with aclosing(self._broadcaster.replay(ids, after)) as changes:
+                    async for change in changes:
+                        last_id = change.get_event_id()
+                        yield change
+
+            while True:
+                change = await queue.get()
+                if change is None:
+                    raise UserChangesSubscriberLagged(f"subscriber lagged behind the changes feed after {last_id}")
+
+                if last_id and parse_event_id(change.get_event_id()) <= parse_event_id(last_id):
+                    continue
+
+                yield change
@@ -1,7 +1,11 @@
+from prometheus_client import REGISTRY
 from redis.asyncio import ConnectionPool, Redis
 
+from infrastructure.metrics import RedisPoolCollector
 from infrastructure.settings import settings
 
 pool = ConnectionPool.from_url(settings.redis_url)
 
 redis_db = Redis(connection_pool=pool)
+
+REGISTRY.register(RedisPoolCollector(pool))
@@ -0,0 +1,163 @@
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import AsyncGenerator, AsyncIterator
+
+from redis.asyncio.client import Redis
+
+from domain.users.exceptions import IncorrectUserChangeId, UserChangesHistoryExpired
+from domain.users.models import User, UserChange
+from infrastructure.rabbit_publisher.dtos import EventUser, SystemEvent
+from infrastructure.rabbit_publisher.factories import UserEventFactory
+from infrastructure.rabbit_publisher.serializers import USER_CHANGED_EVENT, JsonUserEventSerializer
+from infrastructure.settings import settings
+
+from .base import redis_db
+
+logger = getLogger("uvicorn.error")
+
+USERS_CHANGES_STREAM = "users:changes"
+
+
+def decode_event_id(event_id: str | bytes) -> str:
+    return event_id if isinstance(event_id, str) else event_id.decode()
+
+
+def parse_event_id(event_id: str | bytes) -> tuple[int, int]:
+    timestamp, _, sequence = decode_event_id(event_id).partition("-")
+    try:
+        return int(timestamp), int(sequence or 0)
+    except ValueError:
+        raise IncorrectUserChangeId(f"incorrect change id: {event_id!r}")
+
+
+class UsersChangesBroadcaster:
+
+    def __init__(
+        self,
+        db: Redis,
+        stream: str = USERS_CHANGES_STREAM,
+        max_length: int = 10000,
+        queue_size: int = 100,
+        block_ms: int = 5000,
+        replay_chunk_size: int = 100,
+    ):
+        self._db = db
+        self._stream = stream
+        self._max_length = max_length
+        self._queue_size = queue_size
+        self._block_ms = block_ms
+        self._replay_chunk_size = replay_chunk_size
+        self._subscribers: dict[int, set[asyncio.Queue[UserChange | None]]] = defaultdict(set)
+        self._lagged: set[asyncio.Queue[UserChange | None]] = set()
+        self._listener: asyncio.Task | None = None
+        self._listening = asyncio.Event()
+        self._serializer = JsonUserEventSerializer()
+
+    async def publish(self, user: User) -> str:
+        data = self._serializer.serialize(user, USER_CHANGED_EVENT)
+        event_id = await self._db.xadd(self._stream, {"data": data}, maxlen=self._max_length, approximate=True)
+        return decode_event_id(event_id)
+
+    @asynccontextmanager
+    async def subscribe(self, ids: list[int]) -> AsyncIterator[asyncio.Queue[UserChange | None]]:
+        # the queue is unbounded so the lag marker always fits, _dispatch caps it at queue_size changes
+        queue: asyncio.Queue[UserChange | None] = asyncio.Queue()
+        user_ids = set(ids)
+        for user_id in user_ids:
+            self._subscribers[user_id].add(queue)
+
+        self._start_listener()
+        try:
+            await self._listening.wait()
+            yield queue
+        finally:
+            self._unsubscribe(user_ids, queue)
+
+    async def replay(self, ids: list[int], after: str) -> AsyncGenerator[UserChange, None]:
+        await self._validate_history(after)
+        user_ids = set(ids)
+        last_id = after
+        while True:
+            entries = await self._db.xrange(self._stream, min=f"({last_id}", count=self._replay_chunk_size)
+            for entry_id, fields in entries:
+                last_id = decode_event_id(entry_id)
+                change = self._change_from_entry(last_id, fields)
+                if change.get_user().get_id() in user_ids:
+                    yield change
+
+            if len(entries) < self._replay_chunk_size:
+                return
+
+    async def _validate_history(self, after: str) -> None:
+        oldest = await self._db.xrange(self._stream, count=1)
+        if oldest and parse_event_id(oldest[0][0]) > parse_event_id(after):
+            raise UserChangesHistoryExpired(f"changes after {after} are no longer available")
+
+    def _unsubscribe(self, user_ids: set[int], queue: asyncio.Queue[UserChange | None]) -> None:
+        self._lagged.discard(queue)
+        for user_id in user_ids:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                continue
+
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+        if not self._subscribers and self._listener:
+            self._listener.cancel()
+            self._listener = None
+            self._listening.clear()
+
+    def _start_listener(self) -> None:
+        if self._listener and not self._listener.done():
+            return
+
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _get_last_event_id(self) -> str:
+        latest = await self._db.xrevrange(self._stream, count=1)
+        return decode_event_id(latest[0][0]) if latest else "0-0"
+
+    async def _listen(self) -> None:
+        last_id: str | None = None
+        while True:
+            try:
+                if last_id is None:
+                    last_id = await self._get_last_event_id()
+                    self._listening.set()
+                    logger.debug(f"listening users changes stream: {self._stream} from {last_id}")
+
+                response = await self._db.xread({self._stream: last_id}, block=self._block_ms)
+                for _, entries in response:
+                    for entry_id, fields in entries:
+                        last_id = decode_event_id(entry_id)
+                        self._dispatch(self._change_from_entry(last_id, fields))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                await asyncio.sleep(1)
+
+    def _change_from_entry(self, event_id: str, fields: dict[bytes, bytes]) -> UserChange:
+        event = SystemEvent.model_validate_json(fields[b"data"])
+        user = UserEventFactory.model_from_event(EventUser.model_validate_json(event.data))
+        return UserChange(event_id, user)
+
+    def _dispatch(self, change: UserChange) -> None:
+        for queue in self._subscribers.get(change.get_user().get_id(), ()):
+            if queue in self._lagged:
+                continue
+
+            if queue.qsize() >= self._queue_size:
+                logger.warning(f"users changes subscriber lagged behind by {queue.qsize()} changes")
+                self._lagged.add(queue)
+                queue.put_nowait(None)
+                continue
+
+            queue.put_nowait(change)
+
+
+users_changes_broadcaster = UsersChangesBroadcaster(redis_db, max_length=settings.users_changes_stream_max_length)
@@ -10,4 +10,10 @@ class VerificationAttemptsExpired(BaseRedisException): ...
 class IncorrectVerificationCode(BaseRedisException): ...
 
 
+class VerificationCodeRecentlySent(BaseRedisException): ...
+
+
+class VerificationCodesLimitExceeded(BaseRedisException): ...
+
+
 class IncorrectAuthenticationSession(BaseRedisException): ...
@@ -0,0 +1,74 @@
+import time
+
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.users.models import UserVersion
+from infrastructure.database.hooks import run_after_commit
+
+from .base import redis_db
+
+USER_VERSION_KEY_PREFIX = "users:versions:"
+
+# per-user keys mirror users.version from the database and only move forward, so a late write of an
+# older version can't roll them back. The global key is a change counter for queries over all users,
+# it starts from the current time so it keeps growing even if redis was flushed.
+SAVE_VERSIONS_SCRIPT = """
+for i = 2, #ARGV do
+    if tonumber(ARGV[i]) > tonumber(redis.call('GET', KEYS[i - 1]) or '0') then
+        redis.call('SET', KEYS[i - 1], ARGV[i])
+    end
+end
+if ARGV[1] ~= '' then
+    redis.call('SET', KEYS[#KEYS], ARGV[1], 'NX')
+    redis.call('INCR', KEYS[#KEYS])
+end
+"""
+
+
+class UsersVersionsStorage:
+
+    def __init__(self, db: Redis):
+        self._db = db
+        self._save_versions_script = db.register_script(SAVE_VERSIONS_SCRIPT)
+
+    def get_user_version_key(self, user_id: int) -> str:
+        return f"{USER_VERSION_KEY_PREFIX}{user_id}"
+
+    def _get_global_version_key(self) -> str:
+        return "users:versions"
+
+    async def _save_versions(self, versions: tuple[UserVersion, ...], global_start: str) -> None:
+        await self._save_versions_script(
+            keys=[*(self.get_user_version_key(v.get_user_id()) for v in versions), self._get_global_version_key()],
+            args=[global_start, *(v.get_version() for v in versions)],
+        )
+
+    async def bump(self, *versions: UserVersion) -> None:
+        await self._save_versions(versions, str(time.time_ns() // 1000))
+
+    def bump_after_commit(self, session: AsyncSession, version: UserVersion) -> None:
+        run_after_commit(session, lambda: self.bump(version))
+
+    async def remember(self, *versions: UserVersion) -> None:
+        # restores keys lost with a redis flush from versions read from the database
+        await self._save_versions(versions, "")
+
+    async def get_versions(self, ids: list[int]) -> list[int]:
+        if not ids:
+            return []
+
+        versions = await self._db.mget([self.get_user_version_key(user_id) for user_id in ids])
+        return [int(version) if version else 0 for version in versions]
+
+    async def get_versions_and_global(self, ids: list[int]) -> tuple[list[int], int]:
+        keys = [self.get_user_version_key(user_id) for user_id in ids]
+        *versions, global_version = await self._db.mget([*keys, self._get_global_version_key()])
+        return [int(version) if version else 0 for version in versions], int(global_version) if global_version else 0
+
+    async def get_global_version(self) -> int:
+        version = await self._db.get(self._get_global_version_key())
+        return int(version) if version else 0
+
+
+users_versions_storage = UsersVersionsStorage(redis_db)
@@ -0,0 +1,121 @@
+from typing import Any, Iterable
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy.pool import QueuePool
+
+GRPC_SERVER_HANDLING_SECONDS = Histogram(
+    "grpc_server_handling_seconds",
+    "gRPC server method handling latency",
+    ["grpc_method", "grpc_code"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10),
+)
+GRPC_SERVER_IN_FLIGHT = Gauge(
+    "grpc_server_in_flight_requests",
+    "gRPC server requests currently being handled",
+    ["grpc_method"],
+)
+
+EVENTS_QUEUE_SIZE = Gauge("users_events_queue_size", "User events waiting to be published")
+EVENTS_PUBLISHED = Counter("users_events_published_total", "User events confirmed by the broker")
+EVENTS_COALESCED = Counter(
+    "users_events_coalesced_total", "user_changed events superseded by a newer snapshot of the same user"
+)
+EVENTS_DROPPED = Counter("users_events_dropped_total", "User events dropped before publishing", ["reason"])
+EVENTS_PUBLISH_SECONDS = Histogram(
+    "users_events_publish_seconds",
+    "Latency of publishing a batch of user events with confirms",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+NOTIFICATIONS_QUEUE_SIZE = Gauge("users_notifications_queue_size", "Notifications waiting to be sent", ["channel"])
+NOTIFICATIONS_SEND_SECONDS = Histogram(
+    "users_notifications_send_seconds",
+    "Latency of a single notification send attempt",
+    ["channel", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+NOTIFICATIONS_FAILED = Counter(
+    "users_notifications_failed_total", "Notifications dropped after exhausting retries", ["channel"]
+)
+NOTIFICATIONS_REJECTED = Counter(
+    "users_notifications_rejected_total", "Notifications rejected because the queue was full", ["channel"]
+)
+
+PORT_CALLS = Counter("users_port_calls_total", "Calls to a port implementation", ["port", "method"])
+PORT_ERRORS = Counter(
+    "users_port_errors_total", "Calls to a port implementation that raised", ["port", "method", "error"]
+)
+PORT_CALL_SECONDS = Histogram(
+    "users_port_call_seconds",
+    "Latency of a port call, or of the whole stream for streaming methods",
+    ["port", "method"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+RABBITMQ_PUBLISH_SECONDS = Histogram(
+    "users_rabbitmq_publish_seconds",
+    "Latency of publishing to the rabbitmq exchange",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RABBITMQ_PUBLISH_ERRORS = Counter(
+    "users_rabbitmq_publish_errors_total", "Failed publishes to the rabbitmq exchange", ["operation"]
+)
+RABBITMQ_RECONNECTS = Counter("users_rabbitmq_reconnects_total", "Connections opened to rabbitmq")
+
+
+class SqlAlchemyPoolCollector(Collector):
+
+    def __init__(self, engine: Any):
+        self._engine = engine
+
+    def collect(self) -> Iterable[Metric]:
+        pool = self._engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+
+        yield GaugeMetricFamily("users_db_pool_size", "Configured size of the database connection pool", pool.size())
+        connections = GaugeMetricFamily(
+            "users_db_pool_connections", "Database connections in the pool by state", labels=["state"]
+        )
+        connections.add_metric(["checked_in"], pool.checkedin())
+        connections.add_metric(["checked_out"], pool.checkedout())
+        connections.add_metric(["overflow"], max(pool.overflow(), 0))
+        yield connections
+
+
+class RedisPoolCollector(Collector):
+
+    def __init__(self, pool: Any):
+        self._pool = pool
+
+    def collect(self) -> Iterable[Metric]:
+        yield GaugeMetricFamily(
+            "users_redis_pool_max_connections", "Maximum size of the redis connection pool", self._pool.max_connections
+        )
+        connections = GaugeMetricFamily(
+            "users_redis_pool_connections", "Redis connections in the pool by state", labels=["state"]
+        )
+        connections.add_metric(["available"], len(getattr(self._pool, "_available_connections", ())))
+        connections.add_metric(["in_use"], len(getattr(self._pool, "_in_use_connections", ())))
+        yield connections
+
+
+class RabbitConnectionCollector(Collector):
+
+    def __init__(self, connection: Any):
+        self._connection = connection
+
+    def collect(self) -> Iterable[Metric]:
+        yield GaugeMetricFamily(
+            "users_rabbitmq_connected",
+            "Whether the rabbitmq publisher connection is open",
+            int(self._connection.is_connected()),
+        )
+        yield GaugeMetricFamily(
+            "users_rabbitmq_channels",
+            "Channels opened in the rabbitmq publisher pool",
+            self._connection.channels_count(),
+        )
@@ -0,0 +1,26 @@
+"""Added outbox content type
+
+Revision ID: 2f6a8b1c5d37
+Revises: 9c41d7e3b2a8
+Create Date: 2026-10-19 13:41:52.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6a8b1c5d37'
+down_revision = '9c41d7e3b2a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'outbox', sa.Column('content_type', sa.String(), server_default='application/json', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('outbox', 'content_type')
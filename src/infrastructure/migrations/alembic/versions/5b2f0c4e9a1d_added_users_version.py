@@ -0,0 +1,32 @@
+"""Added users version
+
+Revision ID: 5b2f0c4e9a1d
+Revises: e81f9efa794b
+Create Date: 2026-10-19 10:20:41.512230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2f0c4e9a1d'
+down_revision = 'e81f9efa794b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_users_id_version', 'users', ['id'], unique=False, postgresql_include=['version'])
+    op.create_index(
+        'ix_users_username_version', 'users', ['username'], unique=False, postgresql_include=['id', 'version']
+    )
+    op.create_index('ix_users_email_version', 'users', ['email'], unique=False, postgresql_include=['id', 'version'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_version', table_name='users')
+    op.drop_index('ix_users_username_version', table_name='users')
+    op.drop_index('ix_users_id_version', table_name='users')
+    op.drop_column('users', 'version')
@@ -0,0 +1,26 @@
+"""Added outbox user id
+
+Revision ID: 7d3e5a9f1b64
+Revises: 2f6a8b1c5d37
+Create Date: 2026-10-19 15:12:08.227491
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e5a9f1b64'
+down_revision = '2f6a8b1c5d37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('outbox', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.create_index('ix_outbox_user_id', 'outbox', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_user_id', table_name='outbox')
+    op.drop_column('outbox', 'user_id')
@@ -1,49 +1,100 @@
-from logging import getLogger
+import aio_pika
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.users.models import User
 from domain.users.ports import UserEventsPort
+from infrastructure.database.hooks import run_after_commit
+from infrastructure.database.models import OutboxEvent
 
-from .factories import UserEventFactory
+from .background import BackgroundPublisher
+from .coalescer import UserChangesCoalescer
 from .publisher import RabbitConnection
+from .serializers import USER_CREATED_EVENT, UserEventSerializer
 
-logger = getLogger("uvicorn.error")
+
+class UserEventsAdapter(UserEventsPort):
+
+    def __init__(self, conn: RabbitConnection, serializer: UserEventSerializer):
+        self._connection = conn
+        self._serializer = serializer
+
+    async def send_user_created(self, user: User) -> None:
+        message = self._serializer.serialize(user, USER_CREATED_EVENT)
+        await self._connection.send_message(message, self._serializer.content_type)
+
+    async def send_user_changed(self, user: User) -> None:
+        for _, message in self._serializer.serialize_changed(user):
+            await self._connection.send_message(message, self._serializer.content_type)
+
+
+class UserEventsQueueAdapter(UserEventsPort):
+
+    def __init__(self, publisher: BackgroundPublisher, serializer: UserEventSerializer):
+        self._publisher = publisher
+        self._serializer = serializer
+
+    def _enqueue(self, body: bytes) -> None:
+        self._publisher.enqueue(aio_pika.Message(body=body, content_type=self._serializer.content_type))
+
+    async def send_user_created(self, user: User) -> None:
+        self._enqueue(self._serializer.serialize(user, USER_CREATED_EVENT))
+
+    async def send_user_changed(self, user: User) -> None:
+        for _, body in self._serializer.serialize_changed(user):
+            self._enqueue(body)
 
 
-class UserEventsLoggingAdapter(UserEventsPort):
+class UserEventsCoalescingAdapter(UserEventsPort):
 
-    def __init__(self, adapter: UserEventsPort):
+    def __init__(self, adapter: UserEventsPort, coalescer: UserChangesCoalescer):
         self._adapter = adapter
+        self._coalescer = coalescer
 
     async def send_user_created(self, user: User) -> None:
-        logger.debug(f"sending user created event: {user=}")
-        try:
-            await self._adapter.send_user_created(user)
-        except Exception as e:
-            logger.exception(e)
-            raise e
+        await self._adapter.send_user_created(user)
+
+    async def send_user_changed(self, user: User) -> None:
+        self._coalescer.submit(user, self._adapter.send_user_changed)
+
 
-        logger.debug(f"user created event sended")
+class UserEventsAfterCommitAdapter(UserEventsPort):
+
+    def __init__(self, adapter: UserEventsPort, session: AsyncSession):
+        self._adapter = adapter
+        self._session = session
+
+    async def send_user_created(self, user: User) -> None:
+        run_after_commit(self._session, lambda: self._adapter.send_user_created(user))
 
     async def send_user_changed(self, user: User) -> None:
-        logger.debug(f"sending user changed event: {user=}")
-        try:
-            await self._adapter.send_user_changed(user)
-        except Exception as e:
-            logger.exception(e)
-            raise e
+        run_after_commit(self._session, lambda: self._adapter.send_user_changed(user))
 
-        logger.debug(f"user changed event sended")
 
+class UserEventsOutboxAdapter(UserEventsPort):
 
-class UserEventsAdapter(UserEventsPort):
+    def __init__(self, session: AsyncSession, serializer: UserEventSerializer, adapter: UserEventsPort | None = None):
+        self._session = session
+        self._serializer = serializer
+        self._adapter = adapter
 
-    def __init__(self, conn: RabbitConnection):
-        self._connection = conn
+    def _add_event(self, user: User, event_type: str, payload: bytes) -> None:
+        self._session.add(
+            OutboxEvent(
+                event_type=event_type,
+                user_id=user.get_id(),
+                payload=payload,
+                content_type=self._serializer.content_type,
+            )
+        )
 
     async def send_user_created(self, user: User) -> None:
-        event = UserEventFactory.event_from_model(user, "user_created")
-        await self._connection.send_message(event.model_dump_json().encode())
+        self._add_event(user, USER_CREATED_EVENT, self._serializer.serialize(user, USER_CREATED_EVENT))
+        if self._adapter:
+            await self._adapter.send_user_created(user)
 
     async def send_user_changed(self, user: User) -> None:
-        event = UserEventFactory.event_from_model(user, "user_changed")
-        await self._connection.send_message(event.model_dump_json().encode())
+        for event_type, payload in self._serializer.serialize_changed(user):
+            self._add_event(user, event_type, payload)
+
+        if self._adapter:
+            await self._adapter.send_user_changed(user)
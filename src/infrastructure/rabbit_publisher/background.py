@@ -0,0 +1,119 @@
+import asyncio
+import time
+from logging import getLogger
+
+import aio_pika
+
+from infrastructure.metrics import (
+    EVENTS_DROPPED,
+    EVENTS_PUBLISH_SECONDS,
+    EVENTS_PUBLISHED,
+    EVENTS_QUEUE_SIZE,
+)
+from infrastructure.settings import settings
+
+from .publisher import RabbitConnection, connection
+
+logger = getLogger("uvicorn.error")
+
+
+class BackgroundPublisher:
+
+    def __init__(
+        self,
+        conn: RabbitConnection,
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        linger_seconds: float = 0.01,
+        max_retries: int = 3,
+    ):
+        self._connection = conn
+        self._queue: asyncio.Queue[aio_pika.Message] = asyncio.Queue(queue_size)
+        self._batch_size = batch_size
+        self._linger_seconds = linger_seconds
+        self._max_retries = max_retries
+        self._worker: asyncio.Task | None = None
+        EVENTS_QUEUE_SIZE.set_function(self._queue.qsize)
+
+    def enqueue(self, message: aio_pika.Message) -> bool:
+        self._start_worker()
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            EVENTS_DROPPED.labels("queue_full").inc()
+            logger.warning(f"events queue is full, dropping event: {message=}")
+            return False
+
+        return True
+
+    async def stop(self, timeout: float = 10) -> None:
+        if not self._worker:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"events queue was not drained in {timeout}s: {self._queue.qsize()} events left")
+
+        self._worker.cancel()
+        self._worker = None
+
+    def _start_worker(self) -> None:
+        if self._worker and not self._worker.done():
+            return
+
+        self._worker = asyncio.create_task(self._run())
+
+    def _drain_into(self, batch: list[aio_pika.Message]) -> None:
+        while len(batch) < self._batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _collect_batch(self) -> list[aio_pika.Message]:
+        batch = [await self._queue.get()]
+        self._drain_into(batch)
+        if len(batch) < self._batch_size and self._linger_seconds:
+            await asyncio.sleep(self._linger_seconds)
+            self._drain_into(batch)
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._publish(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _publish(self, batch: list[aio_pika.Message]) -> None:
+        pending = batch
+        for attempt in range(self._max_retries):
+            if attempt:
+                await asyncio.sleep(min(0.1 * 2 ** (attempt - 1), 5))
+
+            started_at = time.perf_counter()
+            try:
+                failed = await self._connection.publish_batch(pending)
+            except Exception as e:
+                logger.exception(e)
+                continue
+
+            EVENTS_PUBLISH_SECONDS.observe(time.perf_counter() - started_at)
+            EVENTS_PUBLISHED.inc(len(pending) - len(failed))
+            if not failed:
+                return
+
+            pending = failed
+
+        EVENTS_DROPPED.labels("publish_failed").inc(len(pending))
+        logger.error(f"dropping {len(pending)} events after {self._max_retries} failed publish attempts")
+
+
+background_publisher = BackgroundPublisher(
+    connection,
+    settings.publisher_queue_size,
+    settings.publisher_batch_size,
+    settings.publisher_linger_seconds,
+    settings.publisher_max_retries,
+)
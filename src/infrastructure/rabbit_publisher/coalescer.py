@@ -0,0 +1,51 @@
+import asyncio
+from logging import getLogger
+from typing import Awaitable, Callable
+
+from domain.users.models import User
+from infrastructure.metrics import EVENTS_COALESCED
+from infrastructure.settings import settings
+
+logger = getLogger("uvicorn.error")
+
+
+class UserChangesCoalescer:
+
+    def __init__(self, window: float = 1):
+        self._window = window
+        self._pending: dict[int, tuple[User, Callable[[User], Awaitable[None]]]] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+
+    def submit(self, user: User, send: Callable[[User], Awaitable[None]]) -> None:
+        user_id = user.get_id()
+        if pending := self._pending.get(user_id):
+            user.set_changed_fields(pending[0].get_changed_fields() | user.get_changed_fields())
+            EVENTS_COALESCED.inc()
+
+        self._pending[user_id] = (user, send)
+        if user_id not in self._timers:
+            self._timers[user_id] = asyncio.create_task(self._flush_later(user_id))
+
+    async def flush(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+
+        self._timers.clear()
+        while self._pending:
+            await self._send(self._pending.popitem()[1])
+
+    async def _flush_later(self, user_id: int) -> None:
+        await asyncio.sleep(self._window)
+        self._timers.pop(user_id, None)
+        if pending := self._pending.pop(user_id, None):
+            await self._send(pending)
+
+    async def _send(self, pending: tuple[User, Callable[[User], Awaitable[None]]]) -> None:
+        user, send = pending
+        try:
+            await send(user)
+        except Exception as e:
+            logger.exception(e)
+
+
+user_changes_coalescer = UserChangesCoalescer(settings.publisher_coalesce_window_seconds)
@@ -0,0 +1,7 @@
+from infrastructure.exceptions import BaseInfrastructureException
+
+
+class BasePublisherException(BaseInfrastructureException): ...
+
+
+class EventsNotConfirmed(BasePublisherException): ...
@@ -1,3 +1,7 @@
+from datetime import datetime, timezone
+
+from domain.files.models import SavedFile
+from domain.permissions.models import Permission, PermissionCategory
 from domain.users.models import User
 from infrastructure.rabbit_publisher.dtos import (
     EventPermission,
@@ -57,3 +61,45 @@ class UserEventFactory:
         )
         system_event = SystemEvent(included_users=[], event_type=event_type, data=event_user.model_dump_json())
         return system_event
+
+    @staticmethod
+    def model_from_event(event_user: EventUser) -> User:
+        if event_avatar := event_user.avatar:
+            avatar = SavedFile(
+                id_=0,
+                original_url=event_avatar.originalUrl,
+                original_filename=event_avatar.originalFilename,
+                converted_url=event_avatar.convertedUrl,
+                converted_filename=event_avatar.convertedFilename,
+            )
+        else:
+            avatar = None
+
+        if event_user.permissions is not None:
+            permissions = [
+                Permission(
+                    code=p.code,
+                    name=p.name,
+                    category=PermissionCategory(code=p.category.code, name=p.category.name) if p.category else None,
+                )
+                for p in event_user.permissions
+            ]
+        else:
+            permissions = None
+
+        return User(
+            id_=event_user.id,
+            username=event_user.username,
+            password="",
+            first_name=event_user.first_name,
+            last_name=event_user.last_name,
+            email_confirmed=event_user.email_confirmed,
+            phone_confirmed=event_user.phone_confirmed,
+            last_seen=event_user.last_seen or datetime.now(timezone.utc),
+            middle_name=event_user.middle_name,
+            avatar=avatar,
+            phone=event_user.phone,
+            email=event_user.email,
+            status=event_user.status,
+            permissions=permissions,
+        )
@@ -1,8 +1,18 @@
+import asyncio
 import logging
+import time
 
 import aio_pika
-from aio_pika.abc import AbstractConnection
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractRobustConnection
+from aio_pika.pool import Pool
+from prometheus_client import REGISTRY
 
+from infrastructure.metrics import (
+    RABBITMQ_PUBLISH_ERRORS,
+    RABBITMQ_PUBLISH_SECONDS,
+    RABBITMQ_RECONNECTS,
+    RabbitConnectionCollector,
+)
 from infrastructure.settings import settings
 
 logger = logging.getLogger("uvicorn.error")
@@ -10,31 +20,112 @@ logger = logging.getLogger("uvicorn.error")
 
 class RabbitConnection:
 
-    def __init__(self, host: str, exchange_name: str):
+    def __init__(self, host: str, exchange_name: str, channel_pool_size: int = 4):
         self._host = host
         self._exchange_name = exchange_name
-        self._connection: AbstractConnection | None = None
+        self._channel_pool_size = channel_pool_size
+        self._connection: AbstractRobustConnection | None = None
+        self._channels: Pool[AbstractChannel] | None = None
+        self._exchanges: dict[AbstractChannel, AbstractExchange] = {}
+        self._opened_channels = 0
+        self._connect_lock = asyncio.Lock()
+
+    def is_connected(self) -> bool:
+        return bool(self._connection and not self._connection.is_closed and self._channels)
 
     async def connect(self) -> None:
-        logger.debug(f"Connecting to rabbitmq host: {self._host}")
-        self._connection = await aio_pika.connect_robust(self._host)
+        async with self._connect_lock:
+            if self.is_connected():
+                return
 
-    async def send_message(self, message: bytes):
-        if not self._connection or self._connection.is_closed:
-            logger.warning(f"Reconnecting rabbitmq connection {self._connection=}")
-            await self.connect()
+            logger.debug(f"Connecting to rabbitmq host: {self._host}")
+            self._connection = await aio_pika.connect_robust(self._host)
+            self._channels = Pool(self._create_channel, max_size=self._channel_pool_size)
+            self._exchanges = {}
+            self._opened_channels = 0
+            RABBITMQ_RECONNECTS.inc()
+
+    async def close(self) -> None:
+        if self._channels:
+            await self._channels.close()
+
+        if self._connection:
+            await self._connection.close()
+
+        self._channels = None
+        self._connection = None
+        self._exchanges = {}
+        self._opened_channels = 0
 
+    def channels_count(self) -> int:
+        return self._opened_channels
+
+    async def _create_channel(self) -> AbstractChannel:
         assert self._connection
-        async with self._connection:
-            channel = await self._connection.channel()
-            logger.debug(f"Fetched rabbitmq connection channel {channel=}")
+        channel = await self._connection.channel(publisher_confirms=True)
+        self._opened_channels += 1
+        logger.debug(f"Opened rabbitmq channel {channel=}")
+        return channel
+
+    async def _get_exchange(self, channel: AbstractChannel) -> AbstractExchange:
+        exchange = self._exchanges.get(channel)
+        if not exchange:
             exchange = await channel.declare_exchange(self._exchange_name, aio_pika.ExchangeType.FANOUT, durable=True)
             logger.debug(f"Declared rabbitmq exchange {exchange=} exchange_name={self._exchange_name}")
-            logger.debug(f"Sending event to rabbitmq: {message=}")
-            await exchange.publish(
-                aio_pika.Message(body=message, content_type="application/json"), routing_key="", timeout=2
+            self._exchanges[channel] = exchange
+
+        return exchange
+
+    async def publish_batch(self, messages: list[aio_pika.Message]) -> list[aio_pika.Message]:
+        # returns the messages that were not confirmed, so callers retry only them
+        if not self.is_connected():
+            logger.warning(f"Reconnecting rabbitmq connection {self._connection=}")
+            await self.connect()
+
+        assert self._channels
+        async with self._channels.acquire() as channel:
+            exchange = await self._get_exchange(channel)
+            logger.debug(f"Sending events batch to rabbitmq: count={len(messages)}")
+            started_at = time.perf_counter()
+            results = await asyncio.gather(
+                *(exchange.publish(message, routing_key="", timeout=2) for message in messages),
+                return_exceptions=True,
             )
+            RABBITMQ_PUBLISH_SECONDS.labels("batch").observe(time.perf_counter() - started_at)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                RABBITMQ_PUBLISH_ERRORS.labels("batch").inc()
+                logger.warning(f"{len(errors)} of {len(messages)} events were not confirmed by rabbitmq: {errors[0]!r}")
+
+            logger.debug(f"Sended events batch to rabbitmq: count={len(messages) - len(errors)}")
+            return [message for message, result in zip(messages, results) if isinstance(result, BaseException)]
+
+    async def send_message(self, message: bytes, content_type: str = "application/json"):
+        if not self.is_connected():
+            logger.warning(f"Reconnecting rabbitmq connection {self._connection=}")
+            await self.connect()
+
+        assert self._channels
+        async with self._channels.acquire() as channel:
+            exchange = await self._get_exchange(channel)
+            logger.debug(f"Sending event to rabbitmq: {message=}")
+            started_at = time.perf_counter()
+            try:
+                await exchange.publish(
+                    aio_pika.Message(body=message, content_type=content_type), routing_key="", timeout=2
+                )
+            except Exception:
+                RABBITMQ_PUBLISH_ERRORS.labels("single").inc()
+                raise
+
+            RABBITMQ_PUBLISH_SECONDS.labels("single").observe(time.perf_counter() - started_at)
             logger.debug(f"Sended event to rabbitmq: {message=}")
 
 
-connection = RabbitConnection(settings.publisher_rabbit_host, settings.publisher_rabbit_exchange_name)
+connection = RabbitConnection(
+    settings.publisher_rabbit_host,
+    settings.publisher_rabbit_exchange_name,
+    settings.publisher_channel_pool_size,
+)
+
+REGISTRY.register(RabbitConnectionCollector(connection))
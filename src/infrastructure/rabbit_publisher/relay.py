@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+
+import aio_pika
+from prometheus_client import start_http_server
+from sqlalchemy import Row, Select, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from infrastructure.database.base import session
+from infrastructure.database.models import OutboxEvent
+from infrastructure.metrics import EVENTS_COALESCED, EVENTS_PUBLISH_SECONDS, EVENTS_PUBLISHED
+from infrastructure.settings import settings
+
+from .publisher import RabbitConnection, connection
+from .serializers import USER_CHANGED_EVENT
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OutboxRelay:
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        conn: RabbitConnection,
+        batch_size: int = 500,
+        poll_interval: float = 0.5,
+        coalesce_window: float = 0,
+    ):
+        self._session_maker = session_maker
+        self._connection = conn
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._coalesce_window = coalesce_window
+
+    def _select_events(self) -> Select:
+        return select(
+            OutboxEvent.id,
+            OutboxEvent.event_type,
+            OutboxEvent.user_id,
+            OutboxEvent.payload,
+            OutboxEvent.content_type,
+        ).with_for_update(skip_locked=True)
+
+    async def _get_ready_events(self, s: AsyncSession) -> list[Row]:
+        stmt = self._select_events().order_by(OutboxEvent.id).limit(self._batch_size)
+        if self._coalesce_window:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._coalesce_window)
+            stmt = stmt.where(or_(OutboxEvent.event_type != USER_CHANGED_EVENT, OutboxEvent.created_at <= cutoff))
+
+        rows = list((await s.execute(stmt)).all())
+        changed_ids = {row.user_id for row in rows if row.event_type == USER_CHANGED_EVENT and row.user_id}
+        if self._coalesce_window and changed_ids:
+            pending_stmt = self._select_events().where(
+                OutboxEvent.event_type == USER_CHANGED_EVENT,
+                OutboxEvent.user_id.in_(changed_ids),
+                OutboxEvent.id.not_in([row.id for row in rows]),
+            )
+            rows.extend((await s.execute(pending_stmt)).all())
+
+        return rows
+
+    def _coalesce(self, rows: list[Row]) -> list[Row]:
+        latest_changes: dict[int, Row] = {}
+        events: list[Row] = []
+        for row in rows:
+            if row.event_type != USER_CHANGED_EVENT or not row.user_id:
+                events.append(row)
+            elif row.user_id not in latest_changes or latest_changes[row.user_id].id < row.id:
+                latest_changes[row.user_id] = row
+
+        return sorted([*events, *latest_changes.values()], key=lambda row: row.id)
+
+    async def relay_batch(self) -> int:
+        async with self._session_maker() as s:
+            rows = await self._get_ready_events(s)
+            if not rows:
+                return 0
+
+            events = self._coalesce(rows) if self._coalesce_window else rows
+            messages = [aio_pika.Message(body=row.payload, content_type=row.content_type) for row in events]
+            started_at = time.perf_counter()
+            failed = {id(message) for message in await self._connection.publish_batch(messages)}
+            EVENTS_PUBLISH_SECONDS.observe(time.perf_counter() - started_at)
+            failed_rows = [row for row, message in zip(events, messages) if id(message) in failed]
+            relayed_ids = self._get_relayed_ids(rows, failed_rows)
+            await s.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(relayed_ids)))
+            await s.commit()
+
+        EVENTS_PUBLISHED.inc(len(events) - len(failed_rows))
+        EVENTS_COALESCED.inc(len(rows) - len(events))
+        logger.debug(f"relayed {len(events) - len(failed_rows)} outbox events, coalesced {len(rows) - len(events)}")
+        if failed_rows:
+            logger.warning(f"{len(failed_rows)} outbox events were not confirmed and stay in the outbox")
+
+        return len(relayed_ids)
+
+    def _get_relayed_ids(self, rows: list[Row], failed_rows: list[Row]) -> list[int]:
+        kept_ids = {row.id for row in failed_rows}
+        if self._coalesce_window:
+            # changes folded into an unconfirmed user_changed stay too and get coalesced again on the next batch
+            kept_users = {row.user_id for row in failed_rows if row.event_type == USER_CHANGED_EVENT}
+            kept_ids.update(
+                row.id for row in rows if row.event_type == USER_CHANGED_EVENT and row.user_id in kept_users
+            )
+
+        return [row.id for row in rows if row.id not in kept_ids]
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                logger.exception(e)
+                relayed = 0
+
+            if relayed < self._batch_size:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+
+async def serve() -> None:
+    relay = OutboxRelay(
+        session,
+        connection,
+        settings.outbox_relay_batch_size,
+        settings.outbox_relay_poll_interval_seconds,
+        settings.publisher_coalesce_window_seconds,
+    )
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    logger.info("outbox relay started")
+    await relay.run(stop_event)
+    await connection.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.DEBUG if settings.run_mode == "dev" else logging.INFO)
+    if settings.outbox_relay_metrics_port:
+        start_http_server(settings.outbox_relay_metrics_port)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from abc import ABC, abstractmethod
+from typing import Any, Literal
+
+import orjson
+
+from domain.users.models import User
+from infrastructure.grpc_server.factories import UserProtoFactory
+from infrastructure.grpc_server.usersprotobuf import users_pb2
+
+JSON_CONTENT_TYPE = "application/json"
+
+PROTOBUF_CONTENT_TYPE = "application/x-protobuf"
+
+USER_CREATED_EVENT = "user_created"
+
+USER_CHANGED_EVENT = "user_changed"
+
+USER_CHANGED_DELTA_EVENT = "user_changed_delta"
+
+USER_SNAPSHOT_EVENT = "user_snapshot"
+
+USER_EVENT_FIELDS = (
+    "username",
+    "first_name",
+    "last_name",
+    "email_confirmed",
+    "phone_confirmed",
+    "last_seen",
+    "middle_name",
+    "avatar",
+    "phone",
+    "email",
+    "status",
+    "permissions",
+)
+
+UserChangedEvents = Literal["snapshot", "delta", "both"]
+
+
+class UserEventSerializer(ABC):
+    content_type: str
+
+    def __init__(self, changed_events: UserChangedEvents = "snapshot"):
+        self._changed_events = changed_events
+
+    @abstractmethod
+    def serialize(self, user: User, event_type: str) -> bytes: ...
+
+    @abstractmethod
+    def serialize_delta(self, user: User) -> bytes: ...
+
+    def serialize_changed(self, user: User) -> list[tuple[str, bytes]]:
+        events: list[tuple[str, bytes]] = []
+        if self._changed_events in ("snapshot", "both"):
+            events.append((USER_CHANGED_EVENT, self.serialize(user, USER_CHANGED_EVENT)))
+        if self._changed_events in ("delta", "both"):
+            events.append((USER_CHANGED_DELTA_EVENT, self.serialize_delta(user)))
+
+        return events
+
+    def _get_delta_fields(self, user: User) -> list[str]:
+        changed_fields = user.get_changed_fields()
+        return [field for field in USER_EVENT_FIELDS if field in changed_fields]
+
+
+class JsonUserEventSerializer(UserEventSerializer):
+    content_type = JSON_CONTENT_TYPE
+
+    def _user_to_dict(self, user: User) -> dict[str, Any]:
+        if avatar := user.get_avatar():
+            event_avatar = {
+                "originalUrl": avatar.get_original_url(),
+                "originalFilename": avatar.get_original_filename(),
+                "convertedUrl": avatar.get_converted_url(),
+                "convertedFilename": avatar.get_converted_filename(),
+            }
+        else:
+            event_avatar = None
+
+        permissions = []
+        for permission in user.get_permissions():
+            category = permission.get_category()
+            permissions.append(
+                {
+                    "code": permission.get_code(),
+                    "name": permission.get_name(),
+                    "category": {"code": category.get_code(), "name": category.get_name()} if category else None,
+                }
+            )
+
+        return {
+            "id": user.get_id(),
+            "username": user.get_username(),
+            "first_name": user.get_first_name(),
+            "last_name": user.get_last_name(),
+            "email_confirmed": user.get_email_confirmed(),
+            "phone_confirmed": user.get_phone_confirmed(),
+            "last_seen": user.get_last_seen(),
+            "middle_name": user.get_middle_name(),
+            "avatar": event_avatar,
+            "phone": user.get_phone(),
+            "email": user.get_email(),
+            "status": user.get_status(),
+            "permissions": permissions,
+        }
+
+    def _dump_event(self, event_type: str, data: dict[str, Any]) -> bytes:
+        encoded_data = orjson.dumps(data, option=orjson.OPT_UTC_Z)
+        return orjson.dumps({"included_users": [], "event_type": event_type, "data": encoded_data.decode()})
+
+    def serialize(self, user: User, event_type: str) -> bytes:
+        return self._dump_event(event_type, self._user_to_dict(user))
+
+    def serialize_delta(self, user: User) -> bytes:
+        user_data = self._user_to_dict(user)
+        fields = self._get_delta_fields(user)
+        data = {"id": user.get_id(), "version": user.get_version(), "changed_fields": fields}
+        data.update((field, user_data[field]) for field in fields)
+        return self._dump_event(USER_CHANGED_DELTA_EVENT, data)
+
+
+class ProtobufUserEventSerializer(UserEventSerializer):
+    content_type = PROTOBUF_CONTENT_TYPE
+
+    def _get_permissions(self, user: User) -> list[users_pb2.EventPermission]:
+        return [
+            users_pb2.EventPermission(
+                code=permission.get_code(),
+                name=permission.get_name(),
+                category=(
+                    users_pb2.EventPermissionCategory(code=category.get_code(), name=category.get_name())
+                    if (category := permission.get_category())
+                    else None
+                ),
+            )
+            for permission in user.get_permissions()
+        ]
+
+    def serialize(self, user: User, event_type: str) -> bytes:
+        event = users_pb2.UserEvent(
+            event_type=event_type,
+            user=UserProtoFactory.proto_from_domain(user),
+            permissions=self._get_permissions(user),
+        )
+        if last_seen := user.get_last_seen():
+            event.last_seen.FromDatetime(last_seen)
+
+        return event.SerializeToString()
+
+    def serialize_delta(self, user: User) -> bytes:
+        fields = self._get_delta_fields(user)
+        event = users_pb2.UserEvent(
+            event_type=USER_CHANGED_DELTA_EVENT,
+            user=UserProtoFactory.partial_proto_from_domain(user, [*fields, "version"]),
+            permissions=self._get_permissions(user) if "permissions" in fields else None,
+            changed_fields=fields,
+        )
+        if "last_seen" in fields and (last_seen := user.get_last_seen()):
+            event.last_seen.FromDatetime(last_seen)
+
+        return event.SerializeToString()
+
+
+def get_user_event_serializer(
+    encoding: Literal["json", "protobuf"], changed_events: UserChangedEvents = "snapshot"
+) -> UserEventSerializer:
+    if encoding == "protobuf":
+        return ProtobufUserEventSerializer(changed_events)
+
+    return JsonUserEventSerializer(changed_events)
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+
+import aio_pika
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from infrastructure.database.adapters import UsersAdapter
+from infrastructure.database.base import session
+from infrastructure.metrics import EVENTS_PUBLISHED
+from infrastructure.settings import settings
+
+from .exceptions import EventsNotConfirmed
+from .publisher import RabbitConnection, connection
+from .serializers import USER_SNAPSHOT_EVENT, UserEventSerializer, get_user_event_serializer
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class UsersSnapshotReplayer:
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        conn: RabbitConnection,
+        serializer: UserEventSerializer,
+        batch_size: int = 1000,
+        rate: float = 0,
+    ):
+        self._session_maker = session_maker
+        self._connection = conn
+        self._serializer = serializer
+        self._batch_size = batch_size
+        self._rate = rate
+
+    async def _throttle(self, started_at: float, published: int) -> None:
+        if not self._rate:
+            return
+
+        delay = published / self._rate - (time.perf_counter() - started_at)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _publish(self, batch: list[aio_pika.Message], last_id: int, published: int) -> None:
+        if failed := await self._connection.publish_batch(batch):
+            failed = await self._connection.publish_batch(failed)
+
+        EVENTS_PUBLISHED.inc(len(batch) - len(failed))
+        if failed:
+            raise EventsNotConfirmed(f"{len(failed)} snapshot events up to user {last_id} were not confirmed")
+
+        logger.info(f"published users snapshot: {published=} {last_id=}")
+
+    async def replay(self, after_id: int = 0) -> int:
+        published = 0
+        last_id = after_id
+        batch: list[aio_pika.Message] = []
+        in_flight: asyncio.Task | None = None
+        started_at = time.perf_counter()
+        try:
+            async with self._session_maker() as s:
+                async with aclosing(UsersAdapter(s).stream_all(after_id, self._batch_size)) as users:
+                    async for user in users:
+                        body = self._serializer.serialize(user, USER_SNAPSHOT_EVENT)
+                        batch.append(aio_pika.Message(body=body, content_type=self._serializer.content_type))
+                        last_id = user.get_id()
+                        if len(batch) < self._batch_size:
+                            continue
+
+                        if in_flight:
+                            await in_flight
+
+                        published += len(batch)
+                        in_flight = asyncio.create_task(self._publish(batch, last_id, published))
+                        batch = []
+                        await self._throttle(started_at, published)
+        finally:
+            # even if reading users failed, finish the batch in flight so its last_id is logged to resume from
+            if in_flight:
+                await in_flight
+
+        if batch:
+            published += len(batch)
+            await self._publish(batch, last_id, published)
+
+        return published
+
+
+async def replay(after_id: int, batch_size: int, rate: float) -> None:
+    replayer = UsersSnapshotReplayer(
+        session,
+        connection,
+        get_user_event_serializer(settings.publisher_event_encoding),
+        batch_size,
+        rate,
+    )
+    started_at = time.perf_counter()
+    try:
+        published = await replayer.replay(after_id)
+    finally:
+        await connection.close()
+
+    logger.info(f"users snapshot replayed: {published=} seconds={time.perf_counter() - started_at:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish a user_snapshot event for every user")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this user id")
+    parser.add_argument("--batch-size", type=int, default=1000, help="events per confirmed batch")
+    parser.add_argument("--rate", type=float, default=0, help="max events per second, 0 for unlimited")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(replay(args.after_id, args.batch_size, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class SmsMessage(BaseModel):
+    phone: str
+    text: str
+
+
+class SmsBatch(BaseModel):
+    messages: list[SmsMessage]
@@ -1,13 +1,15 @@
-import logging
-import smtplib
-import ssl
+import uuid
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 from domain.notifications.ports import NotificationSenderPort
 from infrastructure.settings import settings, templates_loader
 
-logger = logging.getLogger("uvicorn.error")
+from .smtp import SmtpConnectionPool, smtp_pool
+
+_CODE_MARKER = f"code-{uuid.uuid4().hex}"
+
+_RECIPIENT_MARKER = f"recipient-{uuid.uuid4().hex}@localhost"
 
 
 def _generate_email_message(from_: str, to: list[str], subject: str, message: str) -> MIMEMultipart:
@@ -20,48 +22,42 @@ def _generate_email_message(from_: str, to: list[str], subject: str, message: st
     return msg
 
 
-def _get_smtp_server(is_tls: bool = False) -> smtplib.SMTP:
-    if is_tls:
-        context = ssl.create_default_context()
-        return smtplib.SMTP_SSL(settings.smtp_host, int(settings.smtp_port), context=context)
+class CompiledEmailTemplate:
 
-    return smtplib.SMTP(settings.smtp_host, int(settings.smtp_port))
+    def __init__(self, template: str, from_: str, subject: str):
+        self._template = templates_loader.get_template(template)
+        self._from = from_
+        self._subject = subject
+        self._skeleton = self._build_skeleton()
 
+    def _build_skeleton(self) -> str | None:
+        body = self._template.render({"code": _CODE_MARKER})
+        if not body.isascii():
+            return None
 
-def send_email(from_: str, to: list[str], subject: str, message: str) -> None:
-    server = _get_smtp_server(settings.smtp_use_tls)
-    with server as s:
-        if settings.smtp_password and settings.smtp_user:
-            s.login(settings.smtp_user, settings.smtp_password)
+        skeleton = _generate_email_message(self._from, [_RECIPIENT_MARKER], self._subject, body).as_string()
+        if skeleton.count(_RECIPIENT_MARKER) != 1 or _CODE_MARKER not in skeleton:
+            return None
 
-        msg = _generate_email_message(from_, to, subject, message)
-        s.sendmail(from_, to, msg.as_string())
+        return skeleton
 
+    def _can_substitute(self, to: str, code: str) -> bool:
+        return code.isalnum() and to.isascii() and "\r" not in to and "\n" not in to
 
-class LoggingEmailSender(NotificationSenderPort):
+    def render(self, to: str, code: str) -> str:
+        if self._skeleton and self._can_substitute(to, code):
+            return self._skeleton.replace(_CODE_MARKER, code).replace(_RECIPIENT_MARKER, to)
 
-    def __init__(self, adapter: NotificationSenderPort):
-        self._adapter = adapter
-
-    async def send_code(self, identifier: str, code: str) -> None:
-        logger.debug(f"sending code message to email: {identifier=} {code=}")
-        logger.debug(
-            f"email smtp from: {settings.smtp_from}, smtp_host: {settings.smtp_host}, smtp_port: {settings.smtp_port}, smtp_tls: {settings.smtp_use_tls}"
-        )
-        try:
-            await self._adapter.send_code(identifier, code)
-        except Exception as e:
-            logger.exception(e)
-            raise
+        body = self._template.render({"code": code})
+        return _generate_email_message(self._from, [to], self._subject, body).as_string()
 
 
 class EmailSender(NotificationSenderPort):
 
-    def __init__(self, template: str = "email_verification.html"):
-        self._template = template
+    def __init__(self, pool: SmtpConnectionPool = smtp_pool, template: str = "email_verification.html"):
+        self._pool = pool
+        self._template = CompiledEmailTemplate(template, settings.smtp_from, "Email verification code")
 
     async def send_code(self, identifier: str, code: str) -> None:
-        template_obj = templates_loader.get_template(self._template)
-        loaded_template = template_obj.render({"code": code})
-        subject = "Email verification code"
-        send_email(settings.smtp_from, [identifier], subject, loaded_template)
+        message = self._template.render(identifier, code)
+        await self._pool.send(settings.smtp_from, [identifier], message)
@@ -0,0 +1,13 @@
+from infrastructure.exceptions import BaseInfrastructureException
+
+
+class BaseSenderException(BaseInfrastructureException): ...
+
+
+class SmsProviderError(BaseSenderException): ...
+
+
+class NotificationsQueueFull(BaseSenderException): ...
+
+
+class SmsProviderNotConfigured(BaseSenderException): ...
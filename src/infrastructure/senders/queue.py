@@ -0,0 +1,137 @@
+import asyncio
+import time
+from logging import getLogger
+
+from domain.notifications.ports import CodesStoragePort, NotificationSenderPort
+from infrastructure.instrumentation import instrument
+from infrastructure.memory_storage.adapters import CodesStorageAdapter
+from infrastructure.memory_storage.base import redis_db
+from infrastructure.metrics import (
+    NOTIFICATIONS_FAILED,
+    NOTIFICATIONS_QUEUE_SIZE,
+    NOTIFICATIONS_REJECTED,
+    NOTIFICATIONS_SEND_SECONDS,
+)
+from infrastructure.settings import settings
+
+from .email import EmailSender
+from .exceptions import NotificationsQueueFull
+from .sms import SmsSender, sms_provider
+
+logger = getLogger("uvicorn.error")
+
+
+class QueuedNotificationSender(NotificationSenderPort):
+
+    def __init__(
+        self,
+        sender: NotificationSenderPort,
+        channel: str,
+        workers: int = 4,
+        queue_size: int = 1000,
+        max_retries: int = 5,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30,
+        codes_storage: CodesStoragePort | None = None,
+    ):
+        self._sender = sender
+        self._channel = channel
+        self._workers_count = workers
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(queue_size)
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._codes_storage = codes_storage
+        self._workers: list[asyncio.Task] = []
+        NOTIFICATIONS_QUEUE_SIZE.labels(channel).set_function(self._queue.qsize)
+
+    async def send_code(self, identifier: str, code: str) -> None:
+        self._start_workers()
+        try:
+            self._queue.put_nowait((identifier, code))
+        except asyncio.QueueFull:
+            NOTIFICATIONS_REJECTED.labels(self._channel).inc()
+            raise NotificationsQueueFull(f"{self._channel} notifications queue is full")
+
+    async def stop(self, timeout: float = 10) -> None:
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._channel} notifications queue was not drained in {timeout}s")
+
+        for worker in self._workers:
+            worker.cancel()
+
+        self._workers = []
+
+    def _start_workers(self) -> None:
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self._workers_count:
+            self._workers.append(asyncio.create_task(self._run()))
+
+    async def _run(self) -> None:
+        while True:
+            identifier, code = await self._queue.get()
+            try:
+                await self._send(identifier, code)
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, identifier: str, code: str) -> None:
+        for attempt in range(self._max_retries):
+            if attempt:
+                await asyncio.sleep(min(self._backoff_seconds * 2 ** (attempt - 1), self._max_backoff_seconds))
+
+            started_at = time.perf_counter()
+            try:
+                await self._sender.send_code(identifier, code)
+            except Exception as e:
+                NOTIFICATIONS_SEND_SECONDS.labels(self._channel, "error").observe(time.perf_counter() - started_at)
+                logger.warning(f"{self._channel} notification attempt {attempt + 1}/{self._max_retries} failed: {e!r}")
+                continue
+
+            NOTIFICATIONS_SEND_SECONDS.labels(self._channel, "ok").observe(time.perf_counter() - started_at)
+            return
+
+        NOTIFICATIONS_FAILED.labels(self._channel).inc()
+        logger.error(f"{self._channel} notification was not sent after {self._max_retries} attempts: {identifier=}")
+        await self._release_code(identifier, code)
+
+    async def _release_code(self, identifier: str, code: str) -> None:
+        # the code never arrived, so the resend cooldown and window caps must not block a new request
+        if not self._codes_storage:
+            return
+
+        try:
+            await self._codes_storage.release_verification_code(identifier, code)
+        except Exception as e:
+            logger.exception(e)
+
+
+codes_storage = instrument(CodesStorageAdapter(redis_db), "codes_storage")
+
+email_notifications = QueuedNotificationSender(
+    instrument(EmailSender(), "email_sender"),
+    "email",
+    settings.notifications_workers,
+    settings.notifications_queue_size,
+    settings.notifications_max_retries,
+    settings.notifications_backoff_seconds,
+    codes_storage=codes_storage,
+)
+
+sms_notifications = QueuedNotificationSender(
+    instrument(
+        SmsSender(sms_provider, settings.sms_code_template, settings.sms_batch_size, settings.sms_linger_seconds),
+        "sms_sender",
+    ),
+    "sms",
+    settings.sms_workers,
+    settings.notifications_queue_size,
+    settings.notifications_max_retries,
+    settings.notifications_backoff_seconds,
+    codes_storage=codes_storage,
+)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+
+import aiohttp
+
+from domain.notifications.ports import NotificationSenderPort
+from infrastructure.settings import settings
+
+from .dtos import SmsBatch, SmsMessage
+from .exceptions import SmsProviderError, SmsProviderNotConfigured
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class SmsProvider(ABC):
+
+    @abstractmethod
+    async def send_batch(self, messages: list[SmsMessage]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class LocalSmsProvider(SmsProvider):
+
+    async def send_batch(self, messages: list[SmsMessage]) -> None:
+        for message in messages:
+            logger.debug(f"local sms provider: {message.phone=} {message.text=}")
+
+
+class HttpSmsProvider(SmsProvider):
+
+    def __init__(self, url: str, token: str | None = None, pool_size: int = 10, timeout_seconds: float = 10):
+        self._url = url
+        self._token = token
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if not self._session or self._session.closed:
+            headers = {"Authorization": f"Bearer {self._token}"} if self._token else None
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60),
+                timeout=self._timeout,
+                headers=headers,
+            )
+
+        return self._session
+
+    async def send_batch(self, messages: list[SmsMessage]) -> None:
+        payload = SmsBatch(messages=messages).model_dump_json()
+        async with self._get_session().post(
+            self._url, data=payload, headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status >= 400:
+                raise SmsProviderError(f"sms provider responded with {response.status}: {await response.text()}")
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+
+
+class SmsSender(NotificationSenderPort):
+
+    def __init__(
+        self,
+        provider: SmsProvider,
+        text_template: str = "Verification code: {code}",
+        batch_size: int = 50,
+        linger_seconds: float = 0.05,
+    ):
+        self._provider = provider
+        self._text_template = text_template
+        self._batch_size = batch_size
+        self._linger_seconds = linger_seconds
+        self._pending: list[tuple[SmsMessage, asyncio.Future[None]]] = []
+        self._flush_task: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def send_code(self, identifier: str, code: str) -> None:
+        sent = asyncio.get_running_loop().create_future()
+        self._pending.append((SmsMessage(phone=identifier, text=self._text_template.format(code=code)), sent))
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+        elif not self._flush_task:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        await sent
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._linger_seconds)
+        self._flush_task = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _send_batch(self, batch: list[tuple[SmsMessage, asyncio.Future[None]]]) -> None:
+        try:
+            await self._provider.send_batch([message for message, _ in batch])
+        except Exception as e:
+            for _, sent in batch:
+                if not sent.done():
+                    sent.set_exception(e)
+
+            return
+
+        for _, sent in batch:
+            if not sent.done():
+                sent.set_result(None)
+
+
+def get_sms_provider() -> SmsProvider:
+    if settings.sms_provider == "http":
+        assert settings.sms_provider_url, "sms provider url is required for the http provider"
+        return HttpSmsProvider(settings.sms_provider_url, settings.sms_provider_token, settings.sms_pool_size)
+
+    if settings.run_mode == "prod":
+        raise SmsProviderNotConfigured("the local sms provider doesn't deliver messages and can't run in prod")
+
+    return LocalSmsProvider()
+
+
+sms_provider = get_sms_provider()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import queue
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from infrastructure.settings import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class SmtpConnectionPool:
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_tls: bool = False,
+        user: str | None = None,
+        password: str | None = None,
+        size: int = 4,
+        keepalive_seconds: float = 30,
+        idle_timeout_seconds: float = 120,
+    ):
+        self._host = host
+        self._port = port
+        self._use_tls = use_tls
+        self._user = user
+        self._password = password
+        self._keepalive_seconds = keepalive_seconds
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._connections: queue.LifoQueue[tuple[smtplib.SMTP, float]] = queue.LifoQueue()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._use_tls:
+            connection = smtplib.SMTP_SSL(self._host, self._port, context=ssl.create_default_context())
+        else:
+            connection = smtplib.SMTP(self._host, self._port)
+
+        if self._user and self._password:
+            connection.login(self._user, self._password)
+
+        logger.debug(f"opened smtp connection to {self._host}:{self._port}")
+        return connection
+
+    def _close_connection(self, connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def _is_alive(self, connection: smtplib.SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self) -> tuple[smtplib.SMTP, bool]:
+        # returns the connection and whether it was reused from the pool
+        while True:
+            try:
+                connection, released_at = self._connections.get_nowait()
+            except queue.Empty:
+                return self._connect(), False
+
+            idle_seconds = time.monotonic() - released_at
+            if idle_seconds > self._idle_timeout_seconds:
+                self._close_connection(connection)
+                continue
+
+            if idle_seconds > self._keepalive_seconds and not self._is_alive(connection):
+                connection.close()
+                continue
+
+            return connection, True
+
+    def _release(self, connection: smtplib.SMTP) -> None:
+        self._connections.put((connection, time.monotonic()))
+
+    def _sendmail(self, connection: smtplib.SMTP, from_: str, to: list[str], message: str) -> None:
+        # SMTPException is an OSError, so the order matters: a refused recipient or a 5xx reply
+        # leaves the connection usable, while a disconnect or any other socket error doesn't
+        try:
+            connection.sendmail(from_, to, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            connection.close()
+            raise
+        except smtplib.SMTPException:
+            self._release(connection)
+            raise
+        except OSError:
+            connection.close()
+            raise
+
+        self._release(connection)
+
+    def _send(self, from_: str, to: list[str], message: str) -> None:
+        connection, reused = self._acquire()
+        try:
+            self._sendmail(connection, from_, to, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # only a pooled connection may have been dropped by the server while idle
+            if not reused:
+                raise
+
+            logger.warning(f"smtp connection to {self._host}:{self._port} was lost, reconnecting")
+            self._sendmail(self._connect(), from_, to, message)
+
+    async def send(self, from_: str, to: list[str], message: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send, from_, to, message)
+
+    def close(self) -> None:
+        while True:
+            try:
+                connection, _ = self._connections.get_nowait()
+            except queue.Empty:
+                break
+
+            self._close_connection(connection)
+
+
+smtp_pool = SmtpConnectionPool(
+    settings.smtp_host,
+    int(settings.smtp_port),
+    settings.smtp_use_tls,
+    settings.smtp_user,
+    settings.smtp_password,
+    settings.smtp_pool_size,
+    settings.smtp_keepalive_seconds,
+    settings.smtp_idle_timeout_seconds,
+)
@@ -19,16 +19,71 @@ class Settings(BaseSettings):
     smtp_port: str
     smtp_from: str
     sentry_link: str | None = None
+    log_sample_rate: float = 1.0
     smtp_user: str | None = None
     smtp_password: str | None = None
     smtp_use_tls: bool = False
+    smtp_pool_size: int = 4
+    smtp_keepalive_seconds: float = 30
+    smtp_idle_timeout_seconds: float = 120
+    notifications_workers: int = 4
+    notifications_queue_size: int = 1000
+    notifications_max_retries: int = 5
+    notifications_backoff_seconds: float = 0.5
+    notifications_shutdown_timeout_seconds: float = 10
+    # required so a deployment can't fall back to the local provider, which only logs messages
+    sms_provider: Literal["local", "http"]
+    sms_provider_url: str | None = None
+    sms_provider_token: str | None = None
+    sms_pool_size: int = 10
+    sms_batch_size: int = 50
+    sms_linger_seconds: float = 0.05
+    sms_workers: int = 100
+    sms_code_template: str = "Verification code: {code}"
     verification_exp_seconds: int = 10 * 60  # 10 minutes
     verification_attempts_count: int = 7
+    verification_resend_cooldown_seconds: int = 60
+    verification_sends_window_seconds: int = 60 * 60
+    verification_sends_per_identifier: int = 5
+    # 0 disables the cap: behind an ingress the client address is the ingress one unless uvicorn runs
+    # with --proxy-headers and --forwarded-allow-ips set to the ingress addresses
+    verification_sends_per_ip: int = 0
     auth_session_exp_seconds: int = 10 * 60
     publisher_rabbit_host: str
     publisher_rabbit_exchange_name: str
+    publisher_channel_pool_size: int = 4
+    publisher_queue_size: int = 10000
+    publisher_batch_size: int = 100
+    publisher_linger_seconds: float = 0.01
+    publisher_max_retries: int = 3
+    publisher_shutdown_timeout_seconds: float = 10
+    publisher_outbox_enabled: bool = False
+    publisher_coalesce_window_seconds: float = 1
+    publisher_event_encoding: Literal["json", "protobuf"] = "json"
+    publisher_user_changed_events: Literal["snapshot", "delta", "both"] = "snapshot"
+    outbox_relay_batch_size: int = 500
+    outbox_relay_poll_interval_seconds: float = 0.5
+    outbox_relay_metrics_port: int | None = None
     files_signature_secret: str
     avatar_service_url: str
+    http_cache_ttl_seconds: int = 5 * 60
+    database_stream_chunk_size: int = 100
+    users_changes_stream_max_length: int = 10000
+    grpc_host: str = "[::]"
+    grpc_port: int = 9090
+    grpc_embedded: bool = True
+    grpc_workers: int = 1
+    grpc_max_concurrent_rpcs: int | None = None
+    grpc_keepalive_time_ms: int = 60 * 1000
+    grpc_keepalive_timeout_ms: int = 20 * 1000
+    grpc_keepalive_permit_without_calls: bool = True
+    grpc_min_ping_interval_ms: int = 30 * 1000
+    grpc_max_receive_message_length: int = 4 * 1024 * 1024
+    grpc_max_send_message_length: int = 4 * 1024 * 1024
+    grpc_gzip_compression: bool = True
+    grpc_shutdown_grace_seconds: float = 10
+    grpc_metrics_port: int | None = None
+    grpc_user_responses_cache_ttl_seconds: int = 10 * 60
 
 
 settings = Settings()  # pyright: ignore[reportCallIssue]
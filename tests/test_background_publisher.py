@@ -0,0 +1,36 @@
+import aio_pika
+
+from infrastructure.rabbit_publisher.background import BackgroundPublisher
+
+
+class FlakyConnection:
+
+    def __init__(self, failures: dict[bytes, int]):
+        self.failures = failures
+        self.batches: list[list[bytes]] = []
+
+    async def publish_batch(self, messages: list[aio_pika.Message]) -> list[aio_pika.Message]:
+        self.batches.append([message.body for message in messages])
+        failed = [message for message in messages if self.failures.get(message.body, 0)]
+        for message in failed:
+            self.failures[message.body] -= 1
+
+        return failed
+
+
+async def test_only_unconfirmed_messages_are_retried():
+    connection = FlakyConnection({b"2": 1})
+    publisher = BackgroundPublisher(connection, max_retries=3)  # type: ignore[arg-type]
+
+    await publisher._publish([aio_pika.Message(body=body) for body in (b"1", b"2", b"3")])
+
+    assert connection.batches == [[b"1", b"2", b"3"], [b"2"]]
+
+
+async def test_unconfirmed_messages_are_dropped_after_max_retries():
+    connection = FlakyConnection({b"1": 10})
+    publisher = BackgroundPublisher(connection, max_retries=2)  # type: ignore[arg-type]
+
+    await publisher._publish([aio_pika.Message(body=b"1")])
+
+    assert connection.batches == [[b"1"], [b"1"]]
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from domain.users.models import User
+from infrastructure.rabbit_publisher.coalescer import UserChangesCoalescer
+from infrastructure.rabbit_publisher.relay import OutboxRelay
+from infrastructure.rabbit_publisher.serializers import USER_CHANGED_EVENT, USER_CREATED_EVENT
+
+
+def make_row(id_: int, event_type: str, user_id: int | None) -> SimpleNamespace:
+    return SimpleNamespace(id=id_, event_type=event_type, user_id=user_id)
+
+
+def make_relay(coalesce_window: float = 1) -> OutboxRelay:
+    return OutboxRelay(None, None, coalesce_window=coalesce_window)  # type: ignore[arg-type]
+
+
+def make_user(user_id: int = 1) -> User:
+    return User(user_id, f"user{user_id}", "password", "First", "Last", False, False, datetime(2024, 1, 1))
+
+
+def test_relay_keeps_only_the_latest_change_per_user():
+    rows = [
+        make_row(1, USER_CREATED_EVENT, 1),
+        make_row(2, USER_CHANGED_EVENT, 1),
+        make_row(3, USER_CHANGED_EVENT, 2),
+        make_row(4, USER_CHANGED_EVENT, 1),
+    ]
+
+    assert [row.id for row in make_relay()._coalesce(rows)] == [1, 3, 4]
+
+
+def test_relay_keeps_changes_folded_into_an_unconfirmed_event():
+    rows = [make_row(1, USER_CHANGED_EVENT, 1), make_row(2, USER_CHANGED_EVENT, 2), make_row(3, USER_CHANGED_EVENT, 1)]
+
+    assert make_relay()._get_relayed_ids(rows, [rows[2]]) == [2]
+    assert make_relay(coalesce_window=0)._get_relayed_ids(rows, [rows[2]]) == [1, 2]
+
+
+async def test_coalescer_sends_one_event_with_all_changed_fields():
+    sent: list[User] = []
+
+    async def send(user: User) -> None:
+        sent.append(user)
+
+    coalescer = UserChangesCoalescer(window=0.01)
+    first, second = make_user(), make_user()
+    first.set_changed_fields({"first_name"})
+    second.set_changed_fields({"status"})
+
+    coalescer.submit(first, send)
+    coalescer.submit(second, send)
+    await asyncio.sleep(0.05)
+
+    assert sent == [second]
+    assert second.get_changed_fields() == {"first_name", "status"}
+
+
+async def test_coalescer_flush_sends_pending_changes_immediately():
+    sent: list[User] = []
+
+    async def send(user: User) -> None:
+        sent.append(user)
+
+    coalescer = UserChangesCoalescer(window=60)
+    users = [make_user(1), make_user(2)]
+    for user in users:
+        coalescer.submit(user, send)
+
+    await coalescer.flush()
+
+    assert sorted(user.get_id() for user in sent) == [1, 2]
@@ -0,0 +1,43 @@
+import pytest
+from google.protobuf.field_mask_pb2 import FieldMask
+
+from domain.users.models import UserProjection
+from infrastructure.database.factories import UserFactory
+from infrastructure.database.models import User as UserModel
+from infrastructure.grpc_server.exceptions import IncorrectFieldMask
+from infrastructure.grpc_server.factories import UserProtoFactory
+from infrastructure.grpc_server.server import Users, get_mask_fields
+from infrastructure.grpc_server.usersprotobuf import users_pb2
+
+
+def test_mask_fields_are_top_level_and_sorted():
+    request = users_pb2.GetUserByIdRequest(id=1, fields=FieldMask(paths=["username", "avatar.original_url", "email"]))
+
+    assert get_mask_fields(request) == ["avatar", "email", "username"]
+    assert get_mask_fields(users_pb2.GetUserByIdRequest(id=1)) is None
+
+
+async def test_incorrect_mask_is_rejected_before_any_lookup():
+    # no request session or cache is available here, so any lookup would fail with another error
+    request = users_pb2.GetUserByIdRequest(id=1, known_version=1, fields=FieldMask(paths=["password"]))
+
+    with pytest.raises(IncorrectFieldMask):
+        await Users().GetUserById(request, None)
+
+
+def test_projection_contains_only_requested_fields():
+    user = UserModel(id=1, username="user", email="user@example.com", first_name="First", version=3)
+
+    projection = UserFactory.projection_from_orm(user, ["email", "version"])
+
+    assert projection.get_username() == "user"
+    assert projection.get_values() == {"email": "user@example.com", "version": 3}
+
+
+def test_projection_proto_leaves_unrequested_fields_unset():
+    response = UserProtoFactory.proto_from_projection(UserProjection(1, "user", {"email": "user@example.com"}))
+
+    assert response.id == 1
+    assert response.email == "user@example.com"
+    assert response.username == ""
+    assert response.version == 0
@@ -0,0 +1,22 @@
+from strawberry.dataloader import DataLoader
+
+from infrastructure.api.dependencies import CustomContext
+
+
+async def test_clear_loaders_drops_cached_permissions():
+    loaded: list[list[int]] = []
+
+    async def load_permissions(ids: list[int]) -> list[list[str]]:
+        loaded.append(ids)
+        return [[f"permission-{len(loaded)}"] for _ in ids]
+
+    context = CustomContext("token")
+    context.permissions_loader = DataLoader(load_fn=load_permissions)
+
+    assert await context.permissions_loader.load(1) == ["permission-1"]
+    assert await context.permissions_loader.load(1) == ["permission-1"]
+
+    context.clear_loaders()
+
+    assert await context.permissions_loader.load(1) == ["permission-2"]
+    assert loaded == [[1], [1]]
@@ -0,0 +1,134 @@
+import json
+
+import strawberry
+from starlette.requests import Request
+from starlette.responses import Response
+from strawberry.types import Info
+
+from domain.users.models import UserVersion
+from infrastructure.api.cache import CacheDependencies, HttpCache, count_cacheable_fields, etag_matches
+from infrastructure.api.dependencies import CustomContext
+from infrastructure.api.router import CachedGraphQLRouter
+from infrastructure.memory_storage.versions import UsersVersionsStorage
+
+
+@strawberry.type
+class Query:
+
+    @strawberry.field
+    def user(self, info: Info, id: int) -> str:
+        info.context.cache_dependencies.add_users([id])
+        return f"user {id}"
+
+
+def get_http_cache(redis_db) -> tuple[HttpCache, UsersVersionsStorage]:
+    versions_storage = UsersVersionsStorage(redis_db)
+    return HttpCache(redis_db, versions_storage, 60), versions_storage
+
+
+def get_dependencies(*ids: int) -> CacheDependencies:
+    dependencies = CacheDependencies()
+    dependencies.add_users(list(ids))
+    return dependencies
+
+
+def get_router(redis_db) -> tuple[CachedGraphQLRouter, UsersVersionsStorage]:
+    http_cache, versions_storage = get_http_cache(redis_db)
+    router = CachedGraphQLRouter(strawberry.Schema(Query), http_cache=http_cache)
+
+    async def get_cache_key(request: Request, context: CustomContext) -> tuple[str, int]:
+        return "key", 1
+
+    router._get_cache_key = get_cache_key  # type: ignore[method-assign]
+    # set by the FastAPI route before it calls run
+    router.temporal_response = Response()  # pyright: ignore[reportAttributeAccessIssue]
+    return router, versions_storage
+
+
+def get_request(if_none_match: str | None = None) -> Request:
+    headers = [(b"content-type", b"application/json")]
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+
+    body = json.dumps({"query": "{ user(id: 1) }"}).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/graphql", "headers": headers, "query_string": b""}
+    return Request(scope, receive)
+
+
+def test_count_cacheable_fields():
+    assert count_cacheable_fields("{ user(id: 1) { id } usersByIds(ids: [1]) { id } }") == 2
+    assert count_cacheable_fields("{ __typename user(id: 1) { id } }") == 1
+    assert count_cacheable_fields("{ user(id: 1) { id } me { id } }") == 0
+    assert count_cacheable_fields("mutation { updateMe { id } }") == 0
+    assert count_cacheable_fields("{ user(") == 0
+
+
+def test_etag_matches():
+    assert etag_matches('W/"a"', 'W/"a"')
+    assert etag_matches('"b", "a"', 'W/"a"')
+    assert etag_matches("*", 'W/"a"')
+    assert not etag_matches('W/"b"', 'W/"a"')
+
+
+async def test_saved_etag_is_served_until_a_dependency_changes(redis_db):
+    http_cache, versions_storage = get_http_cache(redis_db)
+    snapshot = await http_cache.get_snapshot()
+
+    etag = await http_cache.save("key", get_dependencies(1, 2), snapshot)
+
+    assert etag
+    assert await http_cache.get_etag("key") == etag
+
+    await versions_storage.bump(UserVersion(3, 2))
+    assert await http_cache.get_etag("key") == etag
+
+    await versions_storage.bump(UserVersion(2, 2))
+    assert await http_cache.get_etag("key") != etag
+
+
+async def test_etag_depends_on_the_principal_cache_key(redis_db):
+    http_cache, _ = get_http_cache(redis_db)
+    snapshot = await http_cache.get_snapshot()
+
+    assert await http_cache.save("first", get_dependencies(1), snapshot) != await http_cache.save(
+        "second", get_dependencies(1), snapshot
+    )
+
+
+async def test_write_during_the_query_is_not_tagged(redis_db):
+    http_cache, versions_storage = get_http_cache(redis_db)
+    snapshot = await http_cache.get_snapshot()
+
+    await versions_storage.bump(UserVersion(1, 2))
+
+    assert await http_cache.save("key", get_dependencies(1), snapshot) is None
+    assert await http_cache.get_etag("key") is None
+
+
+async def test_unknown_cache_key_has_no_etag(redis_db):
+    http_cache, _ = get_http_cache(redis_db)
+
+    assert await http_cache.get_etag("missing") is None
+
+
+async def test_router_answers_matching_etag_with_not_modified(redis_db):
+    router, versions_storage = get_router(redis_db)
+
+    response = await router.run(get_request(), CustomContext("token"), None)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = await router.run(get_request(etag), CustomContext("token"), None)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.body
+
+    await versions_storage.bump(UserVersion(1, 2))
+    response = await router.run(get_request(etag), CustomContext("token"), None)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,59 @@
+import logging
+from datetime import datetime
+
+from domain.users.models import User
+from infrastructure.instrumentation import REDACTED, instrument, summarize
+from infrastructure.metrics import PORT_CALLS
+
+
+class CodesPort:
+
+    async def generate_verification_code(self, email_or_phone: str) -> str:
+        return "654321"
+
+    async def send_code(self, identifier: str, code: str) -> None:
+        pass
+
+    def login(self, username: str, password: str) -> str:
+        return "token"
+
+
+def make_user() -> User:
+    return User(1, "user", "hashed-password", "First", "Last", False, False, datetime(2024, 1, 1))
+
+
+def get_logs(caplog) -> str:
+    return "\n".join(record.getMessage() for record in caplog.records)
+
+
+async def test_sensitive_arguments_and_results_are_redacted(caplog):
+    caplog.set_level(logging.DEBUG, "uvicorn.error")
+    port = instrument(CodesPort(), "codes", redact_results=("generate_verification_code",), sample_rate=1)
+
+    await port.send_code("a@b.c", "123456")
+    await port.generate_verification_code("a@b.c")
+    port.login("user", password="secret")
+
+    logs = get_logs(caplog)
+    assert f"codes.send_code(identifier='a@b.c', code={REDACTED})" in logs
+    assert f"codes.generate_verification_code -> {REDACTED}" in logs
+    assert f"password={REDACTED}" in logs
+    for secret in ("123456", "654321", "secret"):
+        assert secret not in logs
+
+
+async def test_unsampled_calls_are_counted_but_not_logged(caplog):
+    caplog.set_level(logging.DEBUG, "uvicorn.error")
+    port = instrument(CodesPort(), "unsampled_codes", sample_rate=0)
+    calls = PORT_CALLS.labels("unsampled_codes", "send_code")
+    before = calls._value.get()
+
+    await port.send_code("a@b.c", "123456")
+
+    assert calls._value.get() == before + 1
+    assert not caplog.records
+
+
+def test_domain_objects_are_summarized_by_id():
+    assert summarize(make_user()) == "User(id=1)"
+    assert summarize([make_user()] * 5) == "[User(id=1), User(id=1), User(id=1), ... 5 items]"
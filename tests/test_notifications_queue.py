@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from infrastructure.senders.exceptions import NotificationsQueueFull
+from infrastructure.senders.queue import QueuedNotificationSender
+
+
+class FailingSender:
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+
+    async def send_code(self, identifier: str, code: str) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("provider unavailable")
+
+
+class CodesStorage:
+
+    def __init__(self):
+        self.released: list[tuple[str, str]] = []
+
+    async def release_verification_code(self, email_or_phone: str, code: str) -> None:
+        self.released.append((email_or_phone, code))
+
+
+async def test_full_queue_rejects_instead_of_waiting():
+    sender = QueuedNotificationSender(FailingSender(0), "test", workers=0, queue_size=1)  # type: ignore[arg-type]
+    await sender.send_code("a@b.c", "123456")
+
+    with pytest.raises(NotificationsQueueFull):
+        await asyncio.wait_for(sender.send_code("a@b.c", "123456"), 1)
+
+
+async def test_failed_attempts_are_retried_and_logged(caplog):
+    failing = FailingSender(2)
+    sender = QueuedNotificationSender(failing, "test", max_retries=3, backoff_seconds=0)  # type: ignore[arg-type]
+
+    await sender._send("a@b.c", "123456")
+
+    assert failing.attempts == 3
+    assert [record.message for record in caplog.records if "attempt" in record.message] == [
+        "test notification attempt 1/3 failed: ConnectionError('provider unavailable')",
+        "test notification attempt 2/3 failed: ConnectionError('provider unavailable')",
+    ]
+
+
+async def test_no_backoff_after_the_last_attempt():
+    failing = FailingSender(1)
+    sender = QueuedNotificationSender(failing, "test", max_retries=1, backoff_seconds=60)  # type: ignore[arg-type]
+
+    await asyncio.wait_for(sender._send("a@b.c", "123456"), 1)
+
+    assert failing.attempts == 1
+
+
+async def test_undelivered_code_is_released():
+    codes_storage = CodesStorage()
+    sender = QueuedNotificationSender(
+        FailingSender(2), "test", max_retries=2, backoff_seconds=0, codes_storage=codes_storage  # type: ignore[arg-type]
+    )
+
+    await sender._send("a@b.c", "123456")
+
+    assert codes_storage.released == [("a@b.c", "123456")]
+
+
+async def test_delivered_code_is_kept():
+    codes_storage = CodesStorage()
+    sender = QueuedNotificationSender(
+        FailingSender(1), "test", max_retries=2, backoff_seconds=0, codes_storage=codes_storage  # type: ignore[arg-type]
+    )
+
+    await sender._send("a@b.c", "123456")
+
+    assert codes_storage.released == []
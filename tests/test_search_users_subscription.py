@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from domain.users.models import User
+from infrastructure.api.dependencies import CustomContext
+from infrastructure.api.graphql import base
+from infrastructure.api.graphql.base import Subscription
+
+
+class FakeSearchUsersHandler:
+
+    def __init__(self, pages: dict[int, list[User]]):
+        self.pages = pages
+        self.requested_pages: list[int] = []
+        self.read: list[int] = []
+
+    async def execute(self, query: str, page: int, per_page: int, token: str):
+        self.requested_pages.append(page)
+        for user in self.pages.get(page, []):
+            self.read.append(user.get_id())
+            yield user
+
+
+def make_user(id_: int) -> User:
+    return User(id_, f"user{id_}", "password", "First", "Last", False, False, datetime(2024, 1, 1), version=1)
+
+
+@pytest.fixture
+def handler(monkeypatch) -> FakeSearchUsersHandler:
+    handler = FakeSearchUsersHandler({1: [make_user(1), make_user(2)]})
+
+    @asynccontextmanager
+    async def db_session():
+        yield None
+
+    monkeypatch.setattr(base, "db_session", db_session)
+    monkeypatch.setattr(base, "use_users_adapter", lambda s: None)
+    monkeypatch.setattr(base, "use_files_adapter", lambda s: None)
+    monkeypatch.setattr(base, "use_tokens_adapter", lambda: None)
+    monkeypatch.setattr(base, "use_search_users_handler", lambda *args: handler)
+    return handler
+
+
+def search_users(page: int = 1):
+    fields = Subscription.__strawberry_definition__.fields  # pyright: ignore[reportAttributeAccessIssue]
+    field = next(field for field in fields if field.python_name == "search_users")
+    info = SimpleNamespace(context=CustomContext("token"))
+    return field.base_resolver.wrapped_func(None, info, "user", page, 100)
+
+
+async def test_first_user_is_yielded_before_the_page_is_read(handler):
+    users = search_users()
+
+    first = await anext(users)
+
+    assert first.id == 1
+    assert handler.read == [1]
+    assert [user.id async for user in users] == [2]
+
+
+async def test_empty_page_falls_back_to_the_first_one(handler):
+    users = [user.id async for user in search_users(page=3)]
+
+    assert users == [1, 2]
+    assert handler.requested_pages == [3, 1]
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from infrastructure.senders.dtos import SmsMessage
+from infrastructure.senders.exceptions import SmsProviderError, SmsProviderNotConfigured
+from infrastructure.senders.sms import LocalSmsProvider, SmsProvider, SmsSender, get_sms_provider
+from infrastructure.settings import settings
+
+
+class RecordingSmsProvider(SmsProvider):
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.batches: list[list[SmsMessage]] = []
+
+    async def send_batch(self, messages: list[SmsMessage]) -> None:
+        self.batches.append(messages)
+        if self.error:
+            raise self.error
+
+
+async def test_codes_are_sent_in_batches():
+    provider = RecordingSmsProvider()
+    sender = SmsSender(provider, "code {code}", batch_size=2, linger_seconds=0.01)
+
+    await asyncio.gather(*(sender.send_code(f"+7900000000{i}", f"{i}" * 6) for i in range(3)))
+
+    assert [[message.phone for message in batch] for batch in provider.batches] == [
+        ["+79000000000", "+79000000001"],
+        ["+79000000002"],
+    ]
+    assert provider.batches[0][1].text == "code 111111"
+
+
+async def test_batch_failure_reaches_every_caller():
+    sender = SmsSender(RecordingSmsProvider(SmsProviderError("unavailable")), batch_size=2, linger_seconds=0.01)
+
+    results = await asyncio.gather(
+        sender.send_code("+79000000000", "000000"), sender.send_code("+79000000001", "111111"), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [SmsProviderError, SmsProviderError]
+
+
+def test_local_provider_is_refused_in_prod(monkeypatch):
+    monkeypatch.setattr(settings, "sms_provider", "local")
+    monkeypatch.setattr(settings, "run_mode", "prod")
+
+    with pytest.raises(SmsProviderNotConfigured):
+        get_sms_provider()
+
+    monkeypatch.setattr(settings, "run_mode", "dev")
+    assert isinstance(get_sms_provider(), LocalSmsProvider)
@@ -0,0 +1,69 @@
+import smtplib
+
+import pytest
+
+from infrastructure.senders.smtp import SmtpConnectionPool
+
+
+class FakeSmtp:
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.sent: list[list[str]] = []
+        self.closed = False
+
+    def sendmail(self, from_: str, to: list[str], message: str) -> None:
+        if self.error:
+            raise self.error
+
+        self.sent.append(to)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def make_pool(*connections: FakeSmtp) -> tuple[SmtpConnectionPool, list[FakeSmtp]]:
+    pool = SmtpConnectionPool("localhost", 1025)
+    opened: list[FakeSmtp] = []
+
+    def connect() -> FakeSmtp:
+        connection = connections[len(opened)]
+        opened.append(connection)
+        return connection
+
+    pool._connect = connect  # type: ignore[method-assign]
+    return pool, opened
+
+
+def test_refused_recipient_keeps_the_connection_and_is_not_resent():
+    connection = FakeSmtp(smtplib.SMTPRecipientsRefused({"a@b.c": (550, b"no such user")}))
+    pool, opened = make_pool(connection, FakeSmtp())
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool._send("from@b.c", ["a@b.c"], "message")
+
+    assert opened == [connection]
+    assert not connection.closed
+    assert pool._connections.qsize() == 1
+
+
+def test_dropped_pooled_connection_is_replaced_and_resent():
+    stale, fresh = FakeSmtp(smtplib.SMTPServerDisconnected()), FakeSmtp()
+    pool, _ = make_pool(fresh)
+    pool._release(stale)  # type: ignore[arg-type]
+
+    pool._send("from@b.c", ["a@b.c"], "message")
+
+    assert stale.closed
+    assert fresh.sent == [["a@b.c"]]
+
+
+def test_new_connection_is_not_resent_after_a_disconnect():
+    connection = FakeSmtp(ConnectionResetError())
+    pool, opened = make_pool(connection, FakeSmtp())
+
+    with pytest.raises(ConnectionResetError):
+        pool._send("from@b.c", ["a@b.c"], "message")
+
+    assert opened == [connection]
+    assert connection.closed
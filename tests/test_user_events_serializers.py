@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import orjson
+
+from domain.users.models import User
+from infrastructure.grpc_server.usersprotobuf import users_pb2
+from infrastructure.rabbit_publisher.serializers import (
+    USER_CHANGED_DELTA_EVENT,
+    USER_CHANGED_EVENT,
+    JsonUserEventSerializer,
+    ProtobufUserEventSerializer,
+)
+
+
+def make_changed_user() -> User:
+    user = User(1, "user", "password", "First", "Last", False, False, datetime(2024, 1, 1), email="a@b.c", version=4)
+    user.set_changed_fields({"first_name", "status", "password"})
+    return user
+
+
+def test_json_delta_contains_only_changed_public_fields():
+    event = orjson.loads(JsonUserEventSerializer().serialize_delta(make_changed_user()))
+
+    assert event["event_type"] == USER_CHANGED_DELTA_EVENT
+    assert orjson.loads(event["data"]) == {
+        "id": 1,
+        "version": 4,
+        "changed_fields": ["first_name", "status"],
+        "first_name": "First",
+        "status": None,
+    }
+
+
+def test_protobuf_delta_contains_only_changed_public_fields():
+    event = users_pb2.UserEvent.FromString(ProtobufUserEventSerializer().serialize_delta(make_changed_user()))
+
+    assert event.event_type == USER_CHANGED_DELTA_EVENT
+    assert list(event.changed_fields) == ["first_name", "status"]
+    assert event.user.id == 1
+    assert event.user.version == 4
+    assert event.user.first_name == "First"
+    assert event.user.username == ""
+    assert event.user.email == ""
+
+
+def test_changed_events_follow_the_configured_mode():
+    user = make_changed_user()
+
+    assert [event for event, _ in JsonUserEventSerializer("snapshot").serialize_changed(user)] == [USER_CHANGED_EVENT]
+    assert [event for event, _ in JsonUserEventSerializer("delta").serialize_changed(user)] == [
+        USER_CHANGED_DELTA_EVENT
+    ]
+    assert [event for event, _ in ProtobufUserEventSerializer("both").serialize_changed(user)] == [
+        USER_CHANGED_EVENT,
+        USER_CHANGED_DELTA_EVENT,
+    ]
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from domain.users.exceptions import IncorrectUserChangeId, UserChangesSubscriberLagged
+from domain.users.models import User, UserChange
+from infrastructure.memory_storage.adapters import UserChangesAdapter
+from infrastructure.memory_storage.broadcaster import UsersChangesBroadcaster
+
+
+def make_change(event_id: str, user_id: int = 1) -> UserChange:
+    user = User(user_id, f"user{user_id}", "password", "First", "Last", False, False, datetime(2024, 1, 1))
+    return UserChange(event_id, user)
+
+
+async def test_dispatch_marks_lagged_subscriber_instead_of_dropping_changes(redis_db):
+    broadcaster = UsersChangesBroadcaster(redis_db, queue_size=2, block_ms=10)
+    changes = [make_change(f"1-{i}") for i in range(4)]
+
+    async with broadcaster.subscribe([1]) as queue:
+        for change in changes:
+            broadcaster._dispatch(change)
+
+        assert [queue.get_nowait() for _ in range(queue.qsize())] == [changes[0], changes[1], None]
+
+
+async def test_subscribe_raises_after_delivering_queued_changes_when_lagged(redis_db):
+    broadcaster = UsersChangesBroadcaster(redis_db, queue_size=2, block_ms=10)
+    changes = [make_change(f"1-{i}") for i in range(3)]
+    stream = UserChangesAdapter(broadcaster).subscribe([1])
+
+    first = asyncio.create_task(anext(stream))
+    while not broadcaster._subscribers:
+        await asyncio.sleep(0.01)
+
+    for change in changes:
+        broadcaster._dispatch(change)
+
+    assert await first is changes[0]
+    assert await anext(stream) is changes[1]
+    with pytest.raises(UserChangesSubscriberLagged):
+        await anext(stream)
+
+    assert not broadcaster._subscribers
+
+
+@pytest.mark.parametrize("after", ["latest", "1-x"])
+async def test_subscribe_rejects_incorrect_last_event_id(redis_db, after):
+    stream = UserChangesAdapter(UsersChangesBroadcaster(redis_db, block_ms=10)).subscribe([1], after)
+
+    with pytest.raises(IncorrectUserChangeId):
+        await anext(stream)
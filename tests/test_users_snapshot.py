@@ -0,0 +1,50 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import aio_pika
+import pytest
+
+from domain.users.models import User
+from infrastructure.rabbit_publisher import snapshot
+from infrastructure.rabbit_publisher.serializers import JsonUserEventSerializer
+from infrastructure.rabbit_publisher.snapshot import UsersSnapshotReplayer
+
+
+class RecordingConnection:
+
+    def __init__(self):
+        self.batches: list[int] = []
+
+    async def publish_batch(self, messages: list[aio_pika.Message]) -> list[aio_pika.Message]:
+        self.batches.append(len(messages))
+        return []
+
+
+class BrokenUsersAdapter:
+
+    def __init__(self, session):
+        pass
+
+    async def stream_all(self, after_id: int = 0, chunk_size: int = 1000):
+        for user_id in (1, 2):
+            yield User(user_id, f"user{user_id}", "password", "First", "Last", False, False, datetime(2024, 1, 1))
+
+        raise ConnectionError("database connection lost")
+
+
+@asynccontextmanager
+async def session_maker():
+    yield None
+
+
+async def test_batch_in_flight_is_published_when_reading_users_fails(monkeypatch):
+    monkeypatch.setattr(snapshot, "UsersAdapter", BrokenUsersAdapter)
+    connection = RecordingConnection()
+    replayer = UsersSnapshotReplayer(
+        session_maker, connection, JsonUserEventSerializer(), batch_size=1  # type: ignore[arg-type]
+    )
+
+    with pytest.raises(ConnectionError):
+        await replayer.replay()
+
+    assert connection.batches == [1, 1]
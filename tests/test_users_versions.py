@@ -0,0 +1,40 @@
+from domain.users.models import UserVersion
+from infrastructure.memory_storage.versions import UsersVersionsStorage
+
+
+async def test_bump_mirrors_database_versions(redis_db):
+    versions_storage = UsersVersionsStorage(redis_db)
+
+    await versions_storage.bump(UserVersion(1, 3), UserVersion(2, 5))
+
+    assert await versions_storage.get_versions([1, 2, 3]) == [3, 5, 0]
+
+
+async def test_versions_never_move_backwards(redis_db):
+    versions_storage = UsersVersionsStorage(redis_db)
+
+    await versions_storage.bump(UserVersion(1, 4))
+    await versions_storage.bump(UserVersion(1, 3))
+    await versions_storage.remember(UserVersion(1, 2))
+
+    assert await versions_storage.get_versions([1]) == [4]
+
+
+async def test_remember_restores_lost_versions_without_bumping_global(redis_db):
+    versions_storage = UsersVersionsStorage(redis_db)
+
+    await versions_storage.remember(UserVersion(1, 7))
+
+    assert await versions_storage.get_versions_and_global([1]) == ([7], 0)
+
+
+async def test_global_version_keeps_growing_after_flush(redis_db):
+    versions_storage = UsersVersionsStorage(redis_db)
+    await versions_storage.bump(UserVersion(1, 2))
+    await versions_storage.bump(UserVersion(1, 3))
+    before_flush = await versions_storage.get_global_version()
+
+    await redis_db.flushall()
+    await versions_storage.bump(UserVersion(1, 4))
+
+    assert await versions_storage.get_global_version() > before_flush
@@ -0,0 +1,109 @@
+import pytest
+
+from domain.notifications.handlers import SendVerificationCodeHandler
+from infrastructure.memory_storage.adapters import CodesStorageAdapter
+from infrastructure.memory_storage.exceptions import VerificationCodeRecentlySent, VerificationCodesLimitExceeded
+from infrastructure.senders.exceptions import NotificationsQueueFull
+from infrastructure.settings import settings
+
+
+class QueueSender:
+
+    def __init__(self, full: bool):
+        self.full = full
+        self.sent: list[tuple[str, str]] = []
+
+    async def send_code(self, identifier: str, code: str) -> None:
+        if self.full:
+            raise NotificationsQueueFull("queue is full")
+
+        self.sent.append((identifier, code))
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "verification_resend_cooldown_seconds", 60)
+    monkeypatch.setattr(settings, "verification_sends_window_seconds", 3600)
+    monkeypatch.setattr(settings, "verification_sends_per_identifier", 2)
+    monkeypatch.setattr(settings, "verification_sends_per_ip", 0)
+
+
+async def test_resend_is_rejected_during_cooldown(redis_db, limits):
+    codes_storage = CodesStorageAdapter(redis_db)
+    code = await codes_storage.generate_verification_code("a@b.c")
+
+    with pytest.raises(VerificationCodeRecentlySent):
+        await codes_storage.generate_verification_code("a@b.c")
+
+    await codes_storage.validate_verification_code("a@b.c", code)
+    await codes_storage.generate_verification_code("other@b.c")
+
+
+async def test_sends_per_identifier_are_capped_in_the_window(redis_db, limits):
+    codes_storage = CodesStorageAdapter(redis_db)
+    for _ in range(2):
+        await codes_storage.generate_verification_code("a@b.c")
+        await redis_db.delete("verification:a@b.c:cooldown")
+
+    with pytest.raises(VerificationCodesLimitExceeded):
+        await codes_storage.generate_verification_code("a@b.c")
+
+
+async def test_rejected_send_does_not_count_against_the_limits(redis_db, limits):
+    codes_storage = CodesStorageAdapter(redis_db)
+    await codes_storage.generate_verification_code("a@b.c")
+    with pytest.raises(VerificationCodeRecentlySent):
+        await codes_storage.generate_verification_code("a@b.c")
+
+    assert await redis_db.zcard("verification:a@b.c:sends") == 1
+
+
+async def test_ip_cap_is_disabled_by_default(redis_db, limits):
+    codes_storage = CodesStorageAdapter(redis_db)
+    for identifier in ("a@b.c", "b@b.c", "c@b.c"):
+        await codes_storage.generate_verification_code(identifier, "10.0.0.1")
+
+    assert not await redis_db.exists("verification:ip:10.0.0.1:sends")
+
+
+async def test_ip_cap_when_enabled(redis_db, limits, monkeypatch):
+    monkeypatch.setattr(settings, "verification_sends_per_ip", 2)
+    codes_storage = CodesStorageAdapter(redis_db)
+    for identifier in ("a@b.c", "b@b.c"):
+        await codes_storage.generate_verification_code(identifier, "10.0.0.1")
+
+    with pytest.raises(VerificationCodesLimitExceeded):
+        await codes_storage.generate_verification_code("c@b.c", "10.0.0.1")
+
+
+async def test_send_is_released_when_the_queue_is_full(redis_db, limits, monkeypatch):
+    monkeypatch.setattr(settings, "verification_sends_per_ip", 2)
+    sender = QueueSender(full=True)
+    codes_storage = CodesStorageAdapter(redis_db)
+    handler = SendVerificationCodeHandler(sender, sender, None, codes_storage)  # type: ignore[arg-type]
+
+    with pytest.raises(NotificationsQueueFull):
+        await handler.execute("a@b.c", client_ip="10.0.0.1")
+
+    assert await redis_db.zcard("verification:a@b.c:sends") == 0
+    assert await redis_db.zcard("verification:ip:10.0.0.1:sends") == 0
+
+    sender.full = False
+    await handler.execute("a@b.c", client_ip="10.0.0.1")
+
+    assert [identifier for identifier, _ in sender.sent] == ["a@b.c"]
+    assert await redis_db.zcard("verification:a@b.c:sends") == 1
+
+
+async def test_release_keeps_a_newer_reservation(redis_db, limits, monkeypatch):
+    codes_storage = CodesStorageAdapter(redis_db)
+    codes = iter(("111111", "222222"))
+    monkeypatch.setattr(codes_storage, "_generate_code", lambda: next(codes))
+    await codes_storage.generate_verification_code("a@b.c")
+    await redis_db.delete("verification:a@b.c:cooldown")
+    await codes_storage.generate_verification_code("a@b.c")
+
+    await codes_storage.release_verification_code("a@b.c", "111111")
+
+    assert await redis_db.exists("verification:a@b.c:cooldown")
+    assert await redis_db.zcard("verification:a@b.c:sends") == 2